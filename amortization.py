@@ -0,0 +1,143 @@
+"""
+Amortization Module
+Month-by-month EMI schedules, lazily per loan or chunked across a loan book
+"""
+
+import numpy as np
+
+from calculations import calculate_emi
+
+SCHEDULE_FIELDS = ('payment', 'interest', 'principal', 'balance')
+CSV_HEADER = 'loan_id,month,' + ','.join(SCHEDULE_FIELDS)
+
+# Rows formatted per string operation when writing CSV
+_CSV_BATCH_ROWS = 100000
+_CSV_ROW = '%d,%d,%.2f,%.2f,%.2f,%.2f\n'
+
+
+def iter_schedule(principal, annual_rate, months):
+    """Yield one row per month for a single loan
+
+    The last installment is adjusted so the outstanding balance ends at
+    exactly zero.
+    """
+    months = int(months)
+    emi = calculate_emi(principal, annual_rate, months).emi
+    r = annual_rate / 100 / 12
+    balance = principal
+    for month in range(1, months + 1):
+        interest = balance * r
+        repaid = balance if month == months else emi - interest
+        balance -= repaid
+        yield {
+            'month': month,
+            'payment': interest + repaid,
+            'interest': interest,
+            'principal': repaid,
+            'balance': balance
+        }
+
+
+def emi_array(principals, annual_rates, months):
+    """EMI for arrays of loans; a zero rate repays principal evenly"""
+    r = np.asarray(annual_rates, dtype=np.float64) / 1200
+    growth = (1 + r) ** months
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(r == 0, principals / months, principals * r * growth / (growth - 1))
+
+
+class AmortizationEngine:
+    """Schedules for a loan book, built and written `chunk_rows` loans at a time
+
+    Each chunk is a set of (loans, months) arrays covering the longest
+    tenure in the chunk; months after a loan's tenure are zero. Balances use
+    the closed form P g^k - EMI (g^k - 1) / r, so no month depends on a
+    Python-level loop over the previous one.
+    """
+
+    def __init__(self, chunk_rows=10000, dtype=np.float64):
+        self.chunk_rows = chunk_rows
+        self.dtype = dtype
+
+    def _inputs(self, principals, annual_rates, months):
+        principals, annual_rates, months = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(principals, dtype=np.float64)),
+            np.asarray(annual_rates, dtype=np.float64),
+            np.asarray(months, dtype=np.int64)
+        )
+        if (months <= 0).any():
+            raise ValueError("Tenure must be positive")
+        return principals, annual_rates, months
+
+    def schedule_block(self, principals, annual_rates, months, width=None):
+        """(loans, width) arrays of payment, interest, principal and balance"""
+        principals, annual_rates, months = self._inputs(principals, annual_rates, months)
+        width = int(months.max()) if width is None else width
+        p, n = principals[:, None], months[:, None]
+        r = (annual_rates / 1200)[:, None]
+        emi = emi_array(principals, annual_rates, months)[:, None]
+
+        k = np.arange(width + 1)[None, :]  # balance after k payments, k = 0..width
+        growth = (1 + r) ** k
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annuity = np.where(r == 0, k, (growth - 1) / r)
+        balance = p * growth - emi * annuity
+        balance = np.where(k >= n, 0.0, balance)
+
+        opening = balance[:, :-1]
+        interest = opening * r
+        repaid = opening - balance[:, 1:]
+        active = k[:, 1:] <= n
+        interest = np.where(active, interest, 0.0)
+        return {
+            'payment': (interest + repaid).astype(self.dtype, copy=False),
+            'interest': interest.astype(self.dtype, copy=False),
+            'principal': repaid.astype(self.dtype, copy=False),
+            'balance': balance[:, 1:].astype(self.dtype, copy=False)
+        }
+
+    def chunks(self, principals, annual_rates, months):
+        """Yield (first loan index, tenures, block) for each chunk of loans"""
+        principals, annual_rates, months = self._inputs(principals, annual_rates, months)
+        for start in range(0, len(principals), self.chunk_rows):
+            stop = start + self.chunk_rows
+            block = self.schedule_block(principals[start:stop], annual_rates[start:stop], months[start:stop])
+            yield start, months[start:stop], block
+
+    def write_csv(self, path, principals, annual_rates, months):
+        """Write one row per loan and month; returns the number of rows"""
+        written = 0
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            output.write(CSV_HEADER + '\n')
+            for start, tenures, block in self.chunks(principals, annual_rates, months):
+                loan, month = np.nonzero(np.arange(block['balance'].shape[1])[None, :] < tenures[:, None])
+                # One %-format call per batch of rows instead of one per row
+                for first in range(0, len(loan), _CSV_BATCH_ROWS):
+                    rows, months_paid = loan[first:first + _CSV_BATCH_ROWS], month[first:first + _CSV_BATCH_ROWS]
+                    table = np.column_stack([rows + start, months_paid + 1] +
+                                            [block[name][rows, months_paid] for name in SCHEDULE_FIELDS])
+                    output.write((_CSV_ROW * len(table)) % tuple(table.ravel().tolist()))
+                written += len(loan)
+        return written
+
+    def write_binary(self, path, principals, annual_rates, months):
+        """Write a .npy array of shape (loans, months, 4), filled chunk by chunk
+
+        The file is memory-mapped while writing, so only one chunk is held
+        in memory; load it back with np.load(path, mmap_mode='r').
+        """
+        principals, annual_rates, months = self._inputs(principals, annual_rates, months)
+        width = int(months.max())
+        output = np.lib.format.open_memmap(
+            path, mode='w+', dtype=self.dtype, shape=(len(principals), width, len(SCHEDULE_FIELDS))
+        )
+        for start in range(0, len(principals), self.chunk_rows):
+            stop = start + self.chunk_rows
+            block = self.schedule_block(principals[start:stop], annual_rates[start:stop],
+                                        months[start:stop], width)
+            for index, name in enumerate(SCHEDULE_FIELDS):
+                output[start:stop, :, index] = block[name]
+        output.flush()
+        shape = output.shape
+        del output
+        return shape
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the float and integer-paise backends on bulk jobs
+Writes the timings to bench_output.txt
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from paise_backend import (
+    FLOAT_BACKEND, PAISE_BACKEND, emi_totals, recurring_deposit_maturity, to_paise, to_rate_units
+)
+from ppf_calculator import PPFCalculator
+from public_funds import PublicFundsCalculator
+from rd_engine import rd_maturity_factor
+
+
+def timed(function, repeat=3):
+    """Best wall time of a few runs and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(rows=1000000, loans=100000):
+    rng = np.random.default_rng(17)
+    deposits = rng.uniform(500, 150000, rows).round(2)
+    amounts = rng.uniform(1000, 5000000, rows).round(2)
+    years = rng.integers(1, 30, rows)
+    installments = rng.uniform(100, 10000, rows).round(2)
+    principals = rng.uniform(50000, 5000000, loans).round(2)
+    loan_months = rng.integers(12, 241, loans)
+    loan_rates = rng.uniform(7, 14, loans).round(2)
+
+    ppf = PPFCalculator()
+    funds = PublicFundsCalculator()
+
+    def float_emi():
+        r = loan_rates / 1200
+        growth = (1 + r) ** loan_months
+        emi = principals * r * growth / (growth - 1)
+        return emi * loan_months - principals
+
+    jobs = [
+        (f'PPF maturity ({rows:,} accounts)',
+         lambda: ppf.calculate_ppf_maturity_batch(deposits, 15, backend=FLOAT_BACKEND)['maturity_amount'],
+         lambda: ppf.calculate_ppf_maturity_batch(deposits, 15, backend=PAISE_BACKEND)['maturity_amount']),
+        (f'Scheme comparison ({rows:,} investors)',
+         lambda: funds.compare_all_schemes_batch(amounts, years, backend=FLOAT_BACKEND)['NSC']['maturity_amount'],
+         lambda: funds.compare_all_schemes_batch(amounts, years, backend=PAISE_BACKEND)['NSC']['maturity_amount']),
+        (f'Post Office RD ({rows:,} accounts)',
+         lambda: installments * rd_maturity_factor(6.7, 60),
+         lambda: recurring_deposit_maturity(to_paise(installments), 60, to_rate_units(6.7)) / 100),
+        (f'Loan interest ({loans:,} loans)',
+         float_emi,
+         lambda: emi_totals(to_paise(principals), loan_months, to_rate_units(loan_rates))[2] / 100)
+    ]
+
+    lines = [f"{'Job':<40}{'float (s)':>12}{'paise (s)':>12}{'ratio':>8}{'max diff (₹)':>15}"]
+    for name, float_job, paise_job in jobs:
+        float_time, float_result = timed(float_job)
+        paise_time, paise_result = timed(paise_job)
+        difference = np.nanmax(np.abs(paise_result - float_result))
+        lines.append(f"{name:<40}{float_time:>12.3f}{paise_time:>12.3f}"
+                     f"{paise_time / float_time:>8.1f}{difference:>15.2f}")
+    return lines
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    report = "\n".join(run(rows, max(rows // 10, 1)))
+    print(report)
+    with open('bench_output.txt', 'w', encoding='utf-8') as output:
+        output.write(report + "\n")
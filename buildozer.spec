@@ -7,7 +7,7 @@ source.dir = .
 source.include_exts = py,png,jpg,kv,atlas
 
 version = 1.0
-requirements = python3,kivy,kivymd
+requirements = python3,kivy,kivymd,numpy
 
 android.permissions = INTERNET,ACCESS_NETWORK_STATE
 android.api = 31
@@ -0,0 +1,298 @@
+"""
+Calculations Module
+Headless EMI, deposit, loan, GST, comparison and currency maths used by the apps
+"""
+
+from dataclasses import dataclass, field
+
+# Typical annual rates used by the loan comparison screen
+LOAN_TYPE_RATES = {
+    'Home Loan': 8.5,
+    'Personal Loan': 12.0,
+    'Car Loan': 9.5,
+    'Education Loan': 10.0
+}
+
+# Annual rates (%) assumed by the investment comparison screen
+COMPARISON_RATES = {
+    'Fixed Deposit': 6.0,
+    'Recurring Deposit': 6.5,
+    'PPF': 7.5,
+    'Mutual Fund SIP': 12.0
+}
+
+# Indicative exchange rates (in a real app, use an API)
+CURRENCY_RATES = {
+    'USD': {'INR': 83.0, 'EUR': 0.85, 'GBP': 0.73, 'JPY': 110.0},
+    'INR': {'USD': 0.012, 'EUR': 0.010, 'GBP': 0.009, 'JPY': 1.32},
+    'EUR': {'USD': 1.18, 'INR': 98.0, 'GBP': 0.86, 'JPY': 129.0},
+    'GBP': {'USD': 1.37, 'INR': 114.0, 'EUR': 1.16, 'JPY': 150.0}
+}
+
+
+@dataclass(frozen=True)
+class EmiResult:
+    """Equated monthly installment of a loan"""
+    principal: float
+    annual_rate: float
+    months: float
+    emi: float
+    total_amount: float
+    total_interest: float
+
+    @property
+    def interest_percentage(self):
+        return self.total_interest / self.principal * 100
+
+
+@dataclass(frozen=True)
+class DepositResult:
+    """Maturity of an RD (deposit per month) or an FD (one deposit)"""
+    deposit: float
+    annual_rate: float
+    tenure: float
+    total_invested: float
+    maturity_amount: float
+    interest_earned: float
+
+    @property
+    def return_rate(self):
+        return self.interest_earned / self.total_invested * 100
+
+
+@dataclass(frozen=True)
+class GstResult:
+    """Split of an amount into base and GST, half CGST and half SGST"""
+    base_amount: float
+    gst_rate: float
+    gst_amount: float
+    total_amount: float
+
+    @property
+    def cgst(self):
+        return self.gst_amount / 2
+
+    @property
+    def sgst(self):
+        return self.gst_amount / 2
+
+
+@dataclass(frozen=True)
+class InvestmentComparison:
+    """Maturity of one amount across the comparison options, with monthly series"""
+    amount: float
+    years: float
+    maturities: dict = field(default_factory=dict)  # option -> maturity amount
+    series: dict = field(default_factory=dict)      # option -> value after each month
+    invested: dict = field(default_factory=dict)    # option -> amount invested by each month
+    cash_flows: dict = field(default_factory=dict)  # option -> [(years from start, amount paid in)]
+
+    @property
+    def best_option(self):
+        return max(self.maturities, key=self.maturities.get)
+
+    @property
+    def highest_return(self):
+        return max(self.maturities.values())
+
+    @property
+    def annualized_returns(self):
+        """XIRR (%) per option, which accounts for when the money goes in
+
+        Options without recorded cash flows have no XIRR (NaN).
+        """
+        from xirr import XirrEngine  # numpy is only needed for this view
+
+        options = list(self.maturities)
+        if not options:
+            return {}
+        width = max((len(flows) for flows in self.cash_flows.values()), default=0) + 1
+        years, amounts = [], []
+        for option in options:
+            rows = [(when, -paid) for when, paid in self.cash_flows.get(option, ())]
+            rows += [(self.years, self.maturities[option])]
+            rows += [(0.0, 0.0)] * (width - len(rows))
+            years.append([when for when, _ in rows])
+            amounts.append([amount for _, amount in rows])
+        result = XirrEngine().solve(years, amounts)
+        return dict(zip(options, result['xirr'].tolist()))
+
+
+@dataclass(frozen=True)
+class CurrencyConversion:
+    amount: float
+    from_currency: str
+    to_currency: str
+    rate: float
+    converted: float
+
+
+def _monthly_rate(annual_rate: float) -> float:
+    return annual_rate / 100 / 12
+
+
+def _paise_kernels(backend):
+    """The paise_backend module if `backend` asks for integer paise, else None"""
+    if backend is None:
+        return None
+    import paise_backend  # numpy is only needed for paise results
+    if backend == paise_backend.FLOAT_BACKEND:
+        return None
+    if backend != paise_backend.PAISE_BACKEND:
+        raise ValueError(f"Unknown backend: {backend}")
+    return paise_backend
+
+
+def _whole_months(months) -> int:
+    if months != int(months):
+        raise ValueError("Paise schedules need a whole number of months")
+    return int(months)
+
+
+def calculate_emi(principal: float, annual_rate: float, months: float, backend=None) -> EmiResult:
+    """EMI on a reducing balance; a zero rate repays principal evenly
+
+    With backend=PAISE_BACKEND the EMI is rounded up to the paisa, each
+    month's interest is rounded to the paisa and the last EMI balances.
+    """
+    if months <= 0:
+        raise ValueError("Tenure must be positive")
+    paise = _paise_kernels(backend)
+    if paise is not None:
+        months = _whole_months(months)
+        emi, _, interest = paise.emi_totals(paise.to_paise(principal), months, paise.to_rate_units(annual_rate))
+        total_interest = paise.from_paise(interest).item()
+        return EmiResult(principal, annual_rate, months, paise.from_paise(emi).item(),
+                         principal + total_interest, total_interest)
+    r = _monthly_rate(annual_rate)
+    if r == 0:
+        emi = principal / months
+    else:
+        emi = principal * r * (1 + r)**months / ((1 + r)**months - 1)
+    total_amount = emi * months
+    return EmiResult(principal, annual_rate, months, emi, total_amount, total_amount - principal)
+
+
+def calculate_loan(principal: float, annual_rate: float, years: float, backend=None) -> EmiResult:
+    """EMI for a tenure given in years"""
+    return calculate_emi(principal, annual_rate, years * 12, backend)
+
+
+def compare_loans(principal: float, years: float, loan_types=None) -> dict:
+    """EmiResult per loan type for the same amount and tenure"""
+    loan_types = LOAN_TYPE_RATES if loan_types is None else loan_types
+    return {loan_type: calculate_loan(principal, rate, years) for loan_type, rate in loan_types.items()}
+
+
+def calculate_rd(monthly_deposit: float, annual_rate: float, months: int, backend=None) -> DepositResult:
+    """Recurring deposit with monthly compounding, deposits at the start of each month"""
+    if months <= 0:
+        raise ValueError("Tenure must be positive")
+    paise = _paise_kernels(backend)
+    if paise is not None:
+        months = _whole_months(months)
+        deposit = paise.to_paise(monthly_deposit)
+        maturity = paise.from_paise(paise.monthly_deposit_maturity(
+            deposit, months, paise.to_rate_units(annual_rate))).item()
+        total_invested = paise.from_paise(deposit * months).item()
+        return DepositResult(monthly_deposit, annual_rate, months, total_invested, maturity,
+                             maturity - total_invested)
+    r = _monthly_rate(annual_rate)
+    if r == 0:
+        maturity = monthly_deposit * months
+    else:
+        maturity = monthly_deposit * (((1 + r)**months - 1) / r) * (1 + r)
+    total_invested = monthly_deposit * months
+    return DepositResult(monthly_deposit, annual_rate, months, total_invested, maturity,
+                         maturity - total_invested)
+
+
+def calculate_fd(principal: float, annual_rate: float, years: float, backend=None) -> DepositResult:
+    """Fixed deposit compounded yearly
+
+    With backend=PAISE_BACKEND each yearly credit, and the credit for any
+    part year at maturity, is rounded to the paisa.
+    """
+    paise = _paise_kernels(backend)
+    if paise is not None:
+        whole = int(years)
+        balance = paise.compound_maturity(paise.to_paise(principal), whole, paise.to_rate_units(annual_rate),
+                                          1, paise.ROUND_TO_PAISA)
+        balance += paise.to_paise(paise.from_paise(balance) * ((1 + annual_rate / 100)**(years - whole) - 1))
+        maturity = paise.from_paise(balance).item()
+        invested = paise.from_paise(paise.to_paise(principal)).item()
+        return DepositResult(principal, annual_rate, years, invested, maturity, maturity - invested)
+    maturity = principal * (1 + annual_rate / 100)**years
+    return DepositResult(principal, annual_rate, years, principal, maturity, maturity - principal)
+
+
+def add_gst(amount: float, gst_rate: float) -> GstResult:
+    """GST on top of a base amount"""
+    gst_amount = amount * gst_rate / 100
+    return GstResult(amount, gst_rate, gst_amount, amount + gst_amount)
+
+
+def remove_gst(total_amount: float, gst_rate: float) -> GstResult:
+    """GST contained in an inclusive amount"""
+    base_amount = total_amount / (1 + gst_rate / 100)
+    return GstResult(base_amount, gst_rate, total_amount - base_amount, total_amount)
+
+
+def compare_investments(amount: float, years: float, rates=None, step_up: float = 0.0) -> InvestmentComparison:
+    """One amount as a lump sum (FD, PPF) or spread monthly (RD, SIP)
+
+    RD and SIP instalments start at amount / months and rise by `step_up` %
+    every year. FD and PPF compound yearly, RD and SIP monthly.
+    """
+    from sip_projection import Fund, SipProjectionEngine  # numpy is only needed here
+
+    rates = COMPARISON_RATES if rates is None else rates
+    months = int(round(years * 12))
+    if months <= 0:
+        raise ValueError("Tenure must be positive")
+    monthly = amount / months
+    options = ['Fixed Deposit', 'Recurring Deposit', 'Mutual Fund SIP', 'PPF']
+    compounding = {'Fixed Deposit': 1, 'Recurring Deposit': 12, 'Mutual Fund SIP': 12, 'PPF': 1}
+    lump = [option in ('Fixed Deposit', 'PPF') for option in options]
+
+    # One row per option, each fully invested in its own fund
+    engine = SipProjectionEngine([Fund(option, rates[option], compounding[option]) for option in options])
+    projection = engine.project(
+        [0.0 if is_lump else monthly for is_lump in lump], months,
+        allocations=[[float(row == column) for column in range(len(options))] for row in range(len(options))],
+        step_up=[0.0 if is_lump else step_up for is_lump in lump],
+        lump_sums=[amount if is_lump else 0.0 for is_lump in lump],
+        deposit_at_start=[option == 'Recurring Deposit' for option in options]
+    )
+
+    values, invested, contributions = projection['value'], projection['invested'], projection['contribution']
+    # RD instalments are paid at the start of each month, SIP ones at its end
+    offsets = {'Fixed Deposit': 0, 'Recurring Deposit': 0, 'Mutual Fund SIP': 1, 'PPF': 0}
+    return InvestmentComparison(
+        amount, years,
+        maturities={option: float(values[row, -1]) for row, option in enumerate(options)},
+        series={option: values[row].tolist() for row, option in enumerate(options)},
+        invested={option: invested[row].tolist() for row, option in enumerate(options)},
+        cash_flows={
+            option: [((month + offsets[option]) / 12, paid)
+                     for month, paid in enumerate(contributions[row].tolist()) if paid]
+            for row, option in enumerate(options)
+        }
+    )
+
+
+def exchange_rate(from_currency: str, to_currency: str, rates=None):
+    """Rate for one unit of from_currency, or None if the pair is not supported"""
+    rates = CURRENCY_RATES if rates is None else rates
+    from_currency, to_currency = from_currency.upper(), to_currency.upper()
+    if from_currency == to_currency:
+        return 1.0
+    return rates.get(from_currency, {}).get(to_currency)
+
+
+def convert_currency(amount: float, from_currency: str, to_currency: str, rates=None) -> CurrencyConversion:
+    """Convert at the indicative rate; raises ValueError for unsupported pairs"""
+    rate = exchange_rate(from_currency, to_currency, rates)
+    if rate is None:
+        raise ValueError("Currency pair not supported")
+    return CurrencyConversion(amount, from_currency.upper(), to_currency.upper(), rate, amount * rate)
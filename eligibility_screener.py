@@ -0,0 +1,128 @@
+"""
+Eligibility Screener Module
+Streaming scheme-eligibility screening of customer CSV extracts
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from public_funds import SCHEME_BITS, eligibility_mask
+
+# Smallest byte range worth handing to a separate worker
+_MIN_RANGE_BYTES = 1 << 20
+
+_TRUE_VALUES = {'1', 'y', 'yes', 'true', 't'}
+_FEMALE_VALUES = {'female', 'f'}
+
+
+def decode_mask(mask):
+    """Scheme labels set in one eligibility mask"""
+    return [label for label, bit in SCHEME_BITS.items() if int(mask) & bit]
+
+
+def _parse_rows(rows, columns):
+    """Turn parsed CSV rows into the arrays eligibility_mask needs"""
+    ids = [row[columns['customer_id']] for row in rows]
+    age = np.array([row[columns['age']] for row in rows], dtype=np.float64)
+    female = np.array([row[columns['gender']].strip().lower() in _FEMALE_VALUES for row in rows])
+    if 'resident' in columns:
+        resident = np.array([row[columns['resident']].strip().lower() in _TRUE_VALUES for row in rows])
+    else:
+        resident = True
+    if 'holdings' in columns:
+        holdings = np.array([row[columns['holdings']] or 0 for row in rows], dtype=np.uint8)
+    else:
+        holdings = 0
+    return ids, eligibility_mask(age, female, resident, holdings)
+
+
+def _screen_range(path, start, end, columns, chunk_rows, output_path):
+    """Screen the rows starting in bytes [start, end) into a part file"""
+    counts = np.zeros(len(SCHEME_BITS), dtype=np.int64)
+    customers = 0
+    bits = np.array(list(SCHEME_BITS.values()), dtype=np.uint8)
+
+    with open(path, 'rb') as source, open(output_path, 'w', newline='') as output:
+        writer = csv.writer(output)
+        # A line belongs to the range its first byte falls in
+        source.seek(start - 1)
+        source.readline()
+        while source.tell() < end:
+            lines = []
+            while len(lines) < chunk_rows and source.tell() < end:
+                line = source.readline()
+                if not line:
+                    break
+                if line.strip():
+                    lines.append(line.decode('utf-8'))
+            if not lines:
+                break
+            ids, masks = _parse_rows(list(csv.reader(lines)), columns)
+            writer.writerows(zip(ids, masks.tolist()))
+            counts += ((masks[:, None] & bits) != 0).sum(axis=0)
+            customers += len(ids)
+
+    return customers, counts
+
+
+def _screen_range_args(args):
+    return _screen_range(*args)
+
+
+class EligibilityScreener:
+    """Screen customer extracts against the scheme rules in constant memory
+
+    Input CSV columns: customer_id, age, gender and optionally resident
+    (yes/no) and holdings (existing schemes as a SCHEME_BITS mask). Output
+    CSV: customer_id, eligibility (SCHEME_BITS mask), in input order.
+    """
+
+    def __init__(self, chunk_rows=100000, max_workers=None):
+        self.chunk_rows = chunk_rows
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def screen_file(self, input_path, output_path):
+        """Screen a whole file and return customer and per-scheme eligible counts"""
+        with open(input_path, 'rb') as source:
+            header = source.readline()
+            data_start = source.tell()
+            size = source.seek(0, os.SEEK_END)
+
+        names = next(csv.reader([header.decode('utf-8-sig')]))
+        columns = {name.strip().lower(): i for i, name in enumerate(names)}
+        missing = {'customer_id', 'age', 'gender'} - set(columns)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        # Equal byte ranges, one part file each, joined in order at the end
+        workers = max(1, min(self.max_workers, (size - data_start) // _MIN_RANGE_BYTES + 1))
+        bounds = np.linspace(data_start, size, workers + 1).astype(np.int64).tolist()
+        parts_dir = tempfile.mkdtemp(prefix='screen_')
+        try:
+            parts = [os.path.join(parts_dir, f'part{i}.csv') for i in range(workers)]
+            jobs = [(input_path, bounds[i], bounds[i + 1], columns, self.chunk_rows, parts[i])
+                    for i in range(workers)]
+            if workers == 1:
+                results = [_screen_range_args(jobs[0])]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_screen_range_args, jobs))
+
+            with open(output_path, 'w', newline='') as output:
+                output.write('customer_id,eligibility\n')
+                for part in parts:
+                    with open(part) as chunk:
+                        shutil.copyfileobj(chunk, output)
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+
+        counts = sum(counts for _, counts in results)
+        return {
+            'customers': sum(customers for customers, _ in results),
+            'eligible': {label: int(counts[i]) for i, label in enumerate(SCHEME_BITS)}
+        }
@@ -0,0 +1,170 @@
+"""
+Floating Rate Module
+Benchmark-linked loans re-priced at dated rate resets, across a loan book
+"""
+
+import numpy as np
+
+RESET_EMI = 'reset_emi'        # keep the remaining tenure, re-derive the EMI
+RESET_TENURE = 'reset_tenure'  # keep the EMI, re-derive the remaining tenure
+
+# Longest total tenure a tenure reset may stretch a loan to
+DEFAULT_MAX_MONTHS = 360
+
+
+def _month_index(dates):
+    """Dates (or datetime64) to months since 1970-01"""
+    return np.asarray(np.atleast_1d(dates), dtype='datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _emi(balance, r, months):
+    growth = (1 + r) ** months
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(r == 0, balance / months, balance * r * growth / (growth - 1))
+
+
+class BenchmarkSeries:
+    """Dated benchmark (e.g. repo) rate resets
+
+    A reset dated on the 1st applies from that month's EMI, otherwise from
+    the next month's.
+    """
+
+    def __init__(self, resets):
+        if not resets:
+            raise ValueError("Benchmark needs at least one rate")
+        resets = sorted(resets)
+        days = np.array([when for when, _ in resets], dtype='datetime64[D]')
+        self.months = ((days - 1).astype('datetime64[M]') + 1).astype(np.int64)
+        self.rates = np.array([rate for _, rate in resets], dtype=np.float64)
+
+    def rate_for_month(self, month):
+        """Benchmark rate in force for an EMI in `month` (months since 1970-01)"""
+        position = np.searchsorted(self.months, month, side='right') - 1
+        if position < 0:
+            raise ValueError("Benchmark has no rate before the first EMI")
+        return self.rates[position]
+
+
+class FloatingRateLoanEngine:
+    """Loan book re-priced at each benchmark reset, one vectorized step per reset
+
+    Between two resets every loan keeps its rate and EMI, so balances move
+    by the closed form B g^j - EMI (g^j - 1) / r for the j EMIs paid in
+    the segment; the only Python loop is over the reset dates.
+    """
+
+    def __init__(self, benchmark, policy=RESET_EMI, max_months=DEFAULT_MAX_MONTHS):
+        self.benchmark = benchmark
+        self.policy = policy
+        self.max_months = max_months
+
+    def run_book(self, principals, spreads, months, first_emi_dates, policies=None, max_months=None):
+        """Totals per loan for loans paying `spread` over the benchmark
+
+        `first_emi_dates` gives the month of each loan's first EMI and
+        `policies` (RESET_EMI / RESET_TENURE per loan) defaults to the
+        engine's policy. A tenure reset that would stretch a loan beyond
+        `max_months`, or an EMI that no longer covers the interest, falls
+        back to re-deriving the EMI over the longest allowed tenure.
+        """
+        policies = self.policy if policies is None else policies
+        max_months = self.max_months if max_months is None else max_months
+        principals, spreads, months, starts, reset_tenure, cap = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(principals, dtype=np.float64)),
+            np.asarray(spreads, dtype=np.float64),
+            np.asarray(months, dtype=np.int64),
+            _month_index(first_emi_dates),
+            np.asarray(policies) == RESET_TENURE,
+            np.asarray(max_months, dtype=np.int64)
+        )
+        if (months <= 0).any():
+            raise ValueError("Tenure must be positive")
+        cap = np.maximum(cap, months)
+
+        balance = principals.copy()
+        emi = np.zeros(balance.shape)
+        initial_emi = np.zeros(balance.shape)
+        rate = np.zeros(balance.shape)
+        remaining = months.copy()
+        paid = np.zeros(balance.shape, dtype=np.int64)
+        total_interest = np.zeros(balance.shape)
+        total_paid = np.zeros(balance.shape)
+        last_payment = np.zeros(balance.shape)
+        resets = np.zeros(balance.shape, dtype=np.int64)
+
+        # Segments run from reset to reset; the last stays open until every
+        # loan is repaid, since tenure resets may stretch loans past their term
+        first = starts.min()
+        open_end = max(starts.max(), self.benchmark.months.max()) + cap.max() + 1
+        bounds = np.concatenate(([first], self.benchmark.months[self.benchmark.months > first], [open_end]))
+
+        for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if a > starts.max() and not remaining.any():
+                break
+            new_rate = (self.benchmark.rate_for_month(a) + spreads) / 1200
+
+            # Loans whose first EMI falls in this segment are priced now
+            opening = np.flatnonzero((starts >= a) & (starts < b))
+            rate[opening] = new_rate[opening]
+            emi[opening] = initial_emi[opening] = _emi(principals[opening], rate[opening], months[opening])
+
+            # Running loans whose rate moved are re-priced per policy
+            moved = np.flatnonzero((starts < a) & (remaining > 0) & (new_rate != rate))
+            if len(moved):
+                self._reprice(moved, a - starts[moved], new_rate[moved], balance, emi, rate,
+                              remaining, reset_tenure, cap)
+                resets[moved] += 1
+
+            # EMIs paid within the segment
+            active = np.flatnonzero((starts < b) & (remaining > 0))
+            j = np.minimum(b - np.maximum(starts[active], a), remaining[active])
+            r, b0, e = rate[active], balance[active], emi[active]
+            growth = (1 + r) ** j
+            with np.errstate(divide='ignore', invalid='ignore'):
+                annuity = np.where(r == 0, j, (growth - 1) / r)
+            after = b0 * growth - e * annuity
+            finishing = j == remaining[active]
+            # The final EMI absorbs whatever the closed form leaves over
+            total_interest[active] += j * e - b0 + after
+            total_paid[active] += j * e + np.where(finishing, after, 0.0)
+            last_payment[active] = np.where(finishing, e + after, e)
+            balance[active] = np.where(finishing, 0.0, after)
+            remaining[active] -= j
+            paid[active] += j
+
+        return {
+            'initial_emi': initial_emi,
+            'final_emi': emi,
+            'last_payment': last_payment,
+            'total_interest': total_interest,
+            'total_paid': total_paid,
+            'months': paid,
+            'closing_month': (starts + paid - 1).astype('datetime64[M]'),
+            'resets': resets,
+            'final_rate': rate * 1200
+        }
+
+    def _reprice(self, rows, elapsed, new_rate, balance, emi, rate, remaining, reset_tenure, cap):
+        b, e, n = balance[rows], emi[rows], remaining[rows]
+        allowed = cap[rows] - elapsed
+
+        # Tenure reset: months needed to clear the balance at the same EMI
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = 1 - b * new_rate / e
+            needed = np.where(new_rate == 0, b / e, -np.log(ratio) / np.log1p(new_rate))
+        needed = np.ceil(needed - 1e-9)
+        feasible = (ratio > 0) & (needed <= allowed)
+        keep_emi = reset_tenure[rows] & feasible
+
+        # EMI reset (and the fallback for tenure resets that cannot hold)
+        tenure = np.where(reset_tenure[rows], allowed, n)
+        n = np.where(keep_emi, needed, tenure).astype(np.int64)
+        emi[rows] = np.where(keep_emi, e, _emi(b, new_rate, n))
+        remaining[rows] = n
+        rate[rows] = new_rate
+
+    def simulate_loan(self, principal, spread, months, first_emi_date, policy=None):
+        """run_book for a single loan, as a dict of plain values"""
+        result = self.run_book([principal], spread, months, [first_emi_date], policy)
+        return {name: values[0].item() for name, values in result.items()}
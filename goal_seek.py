@@ -0,0 +1,129 @@
+"""
+Goal Seek Module
+Vectorized solvers for required deposit, required tenure and implied rate
+"""
+
+import numpy as np
+
+from ppf_calculator import BATCH_OK, BATCH_BELOW_MIN_DEPOSIT, BATCH_ABOVE_MAX_DEPOSIT
+from public_funds import PublicFundsCalculator
+from rate_timeline import rate_at
+from scheme_registry import SCHEME_VALUE_FUNCTIONS
+
+# Further per-row error codes for goal queries
+GOAL_UNREACHABLE = 3
+GOAL_NOT_CONVERGED = 4
+
+
+class GoalSeekSolver:
+    """Batch goal seeking over every PublicFundsCalculator scheme"""
+
+    def __init__(self, calculator=None, max_iterations=60, tolerance=1e-9):
+        self.calculator = calculator or PublicFundsCalculator()
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+    def required_deposit(self, scheme, targets, years, rates=None):
+        """Deposit needed to reach each target (closed form, value is linear in it)"""
+        value = SCHEME_VALUE_FUNCTIONS[scheme]
+        targets, years, rates = self._broadcast(scheme, targets, years, rates)
+        unit_value = value(1.0, years, rates)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            required = targets / unit_value
+        error_code = self._limit_codes(scheme, required)
+
+        return {
+            'required_deposit': required,
+            'target_amount': targets,
+            'years': years,
+            'rate': rates,
+            'error_code': error_code
+        }
+
+    def required_tenure(self, scheme, targets, amounts, rates=None, max_years=50):
+        """Smallest whole number of years for each deposit to reach its target"""
+        value = SCHEME_VALUE_FUNCTIONS[scheme]
+        targets, amounts, rates = self._broadcast(scheme, targets, amounts, rates)
+        amounts = amounts.astype(np.float64)
+
+        # Value grows with tenure, so bisect on whole years for all rows at once
+        low = np.zeros(targets.shape, dtype=np.int64)
+        high = np.full(targets.shape, max_years, dtype=np.int64)
+        reachable = value(amounts, high, rates) >= targets
+        while np.any(low < high):
+            mid = (low + high) // 2
+            enough = value(amounts, mid, rates) >= targets
+            high = np.where(enough, mid, high)
+            low = np.where(enough, low, mid + 1)
+
+        error_code = self._limit_codes(scheme, amounts)
+        error_code[(error_code == BATCH_OK) & ~reachable] = GOAL_UNREACHABLE
+
+        return {
+            'required_years': high,
+            'maturity_amount': value(amounts, high, rates),
+            'target_amount': targets,
+            'amount': amounts,
+            'error_code': error_code
+        }
+
+    def implied_rate(self, scheme, targets, amounts, years, max_rate=50.0):
+        """Annual rate (%) at which each deposit grows to its target"""
+        value = SCHEME_VALUE_FUNCTIONS[scheme]
+        targets, amounts, years = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(targets, dtype=np.float64)),
+            np.asarray(amounts, dtype=np.float64),
+            np.asarray(years, dtype=np.int64)
+        )
+
+        low = np.zeros(targets.shape)
+        high = np.full(targets.shape, max_rate)
+        reachable = (value(amounts, years, low) <= targets) & (value(amounts, years, high) >= targets)
+
+        # Newton steps, falling back to bisection when a step leaves the bracket
+        rate = np.full(targets.shape, max_rate / 10)
+        step = 1e-6
+        converged = np.zeros(targets.shape, dtype=bool)
+        for _ in range(self.max_iterations):
+            gap = value(amounts, years, rate) - targets
+            converged = np.abs(gap) <= self.tolerance * np.maximum(targets, 1.0)
+            if np.all(converged | ~reachable):
+                break
+            low = np.where(gap < 0, rate, low)
+            high = np.where(gap > 0, rate, high)
+            slope = (value(amounts, years, rate + step) - targets - gap) / step
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = rate - gap / slope
+            inside = np.isfinite(newton) & (newton > low) & (newton < high)
+            rate = np.where(converged, rate, np.where(inside, newton, (low + high) / 2))
+
+        error_code = np.full(targets.shape, BATCH_OK, dtype=np.int8)
+        error_code[~converged] = GOAL_NOT_CONVERGED
+        error_code[~reachable] = GOAL_UNREACHABLE
+
+        return {
+            'implied_rate': np.where(reachable, rate, np.nan),
+            'target_amount': targets,
+            'amount': amounts,
+            'years': years,
+            'error_code': error_code
+        }
+
+    def _broadcast(self, scheme, targets, second, rates):
+        if rates is None:
+            rates = rate_at(self.calculator.rates[scheme])
+        return np.broadcast_arrays(
+            np.atleast_1d(np.asarray(targets, dtype=np.float64)),
+            np.asarray(second),
+            np.asarray(rates, dtype=np.float64)
+        )
+
+    def _limit_codes(self, scheme, amounts):
+        error_code = np.full(amounts.shape, BATCH_OK, dtype=np.int8)
+        details = self.calculator.scheme_details.get(scheme, {})
+        if details.get('min_deposit') is not None:
+            error_code[amounts < details['min_deposit']] = BATCH_BELOW_MIN_DEPOSIT
+        if details.get('max_deposit') is not None:
+            error_code[amounts > details['max_deposit']] = BATCH_ABOVE_MAX_DEPOSIT
+        return error_code
@@ -0,0 +1,106 @@
+"""
+Growth Factor Kernel Module
+Closed-form growth and annuity factors shared by the PPF and public funds calculators
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+# Deposit timing within each compounding year
+DEPOSIT_AT_START = 'start'
+DEPOSIT_AT_END = 'end'
+
+
+def annuity_factor_array(rates, deposit_years, years=None, timing=DEPOSIT_AT_START):
+    """Vectorized annuity factors for arrays of rates (percent) and tenures"""
+    rates, deposit_years = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(rates, dtype=np.float64)),
+        np.asarray(deposit_years, dtype=np.int64)
+    )
+    r = rates / 100
+    growth = 1 + r
+
+    # [((1+r)^n - 1) / r], times (1+r) when deposits are made at year start
+    factor = growth ** deposit_years
+    factor -= 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor /= r
+    if timing == DEPOSIT_AT_START:
+        factor *= growth
+    zero_rate = r == 0
+    factor[zero_rate] = deposit_years[zero_rate]
+
+    # Deposits stop before maturity and the balance keeps compounding
+    if years is not None:
+        factor *= growth ** (np.asarray(years, dtype=np.int64) - deposit_years)
+    return factor
+
+
+class GrowthFactorKernel:
+    """Closed-form growth factors with an LRU-bounded table of precomputed results"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._table = OrderedDict()
+
+    def growth_factor(self, rate, years):
+        """Growth of one rupee over `years` at an annual rate (percent)"""
+        return self._lookup(rate, years, years, 'lump')
+
+    def annuity_factor(self, rate, deposit_years, years=None, timing=DEPOSIT_AT_START):
+        """Value after `years` of one rupee deposited yearly for `deposit_years`"""
+        if years is None:
+            years = deposit_years
+        return self._lookup(rate, years, deposit_years, timing)
+
+    def stats(self):
+        """Return hit/miss statistics for the factor table"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._table),
+            'max_entries': self.max_entries,
+            'hit_rate': (self.hits / lookups) * 100 if lookups else 0.0
+        }
+
+    def clear(self):
+        """Drop all cached factors and reset statistics"""
+        self._table.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, rate, years, deposit_years, timing):
+        key = (rate, years, deposit_years, timing)
+        factor = self._table.get(key)
+        if factor is not None:
+            self.hits += 1
+            self._table.move_to_end(key)
+            return factor
+
+        self.misses += 1
+        factor = self._compute(rate / 100, years, deposit_years, timing)
+        self._table[key] = factor
+        if len(self._table) > self.max_entries:
+            self._table.popitem(last=False)
+        return factor
+
+    def _compute(self, r, years, deposit_years, timing):
+        if timing == 'lump':
+            return (1 + r) ** years
+
+        if r == 0:
+            factor = deposit_years
+        else:
+            factor = ((1 + r) ** deposit_years - 1) / r
+            if timing == DEPOSIT_AT_START:
+                factor *= (1 + r)
+
+        return factor * ((1 + r) ** (years - deposit_years))
+
+
+# Shared by all calculator instances so repeated what-if queries hit the same table
+default_kernel = GrowthFactorKernel()
@@ -11,6 +11,7 @@ from kivymd.uix.screenmanager import MDScreenManager
 from kivy.uix.scrollview import ScrollView
 import math
 import requests
+import calculations
 from datetime import datetime, date
 import json
 
@@ -305,67 +306,44 @@ class FinancialCalculatorApp(MDApp):
     # Calculation methods
     def calculate_emi(self, instance):
         try:
-            P = float(self.emi_principal.text)
-            r = float(self.emi_rate.text) / 100 / 12
-            n = int(self.emi_tenure.text)
+            result = calculations.calculate_emi(
+                float(self.emi_principal.text), float(self.emi_rate.text), int(self.emi_tenure.text)
+            )
             
-            emi = P * r * (1 + r)**n / ((1 + r)**n - 1)
-            total_amount = emi * n
-            interest = total_amount - P
-            
-            self.emi_result.text = f"EMI: ₹{emi:.2f}\nTotal Amount: ₹{total_amount:.2f}\nTotal Interest: ₹{interest:.2f}"
+            self.emi_result.text = f"EMI: ₹{result.emi:.2f}\nTotal Amount: ₹{result.total_amount:.2f}\nTotal Interest: ₹{result.total_interest:.2f}"
         except:
             self.emi_result.text = "Please enter valid values"
     
     def calculate_rd(self, instance):
         try:
-            P = float(self.rd_monthly.text)
-            r = float(self.rd_rate.text) / 100 / 12
-            n = int(self.rd_tenure.text)
-            
-            maturity = P * (((1 + r)**n - 1) / r) * (1 + r)
-            total_invested = P * n
-            interest = maturity - total_invested
+            result = calculations.calculate_rd(
+                float(self.rd_monthly.text), float(self.rd_rate.text), int(self.rd_tenure.text)
+            )
             
-            self.rd_result.text = f"Maturity Amount: ₹{maturity:.2f}\nTotal Invested: ₹{total_invested:.2f}\nInterest Earned: ₹{interest:.2f}"
+            self.rd_result.text = f"Maturity Amount: ₹{result.maturity_amount:.2f}\nTotal Invested: ₹{result.total_invested:.2f}\nInterest Earned: ₹{result.interest_earned:.2f}"
         except:
             self.rd_result.text = "Please enter valid values"
     
     def calculate_fd(self, instance):
         try:
-            P = float(self.fd_principal.text)
-            r = float(self.fd_rate.text) / 100
-            t = float(self.fd_tenure.text)
+            result = calculations.calculate_fd(
+                float(self.fd_principal.text), float(self.fd_rate.text), float(self.fd_tenure.text)
+            )
             
-            maturity = P * (1 + r)**t
-            interest = maturity - P
-            
-            self.fd_result.text = f"Maturity Amount: ₹{maturity:.2f}\nPrincipal: ₹{P:.2f}\nInterest Earned: ₹{interest:.2f}"
+            self.fd_result.text = f"Maturity Amount: ₹{result.maturity_amount:.2f}\nPrincipal: ₹{result.deposit:.2f}\nInterest Earned: ₹{result.interest_earned:.2f}"
         except:
             self.fd_result.text = "Please enter valid values"
     
     def compare_loans(self, instance):
         try:
             P = float(self.loan_amount.text)
-            years = float(self.loan_tenure.text)
-            n = years * 12
             
             # Different loan types with typical rates
-            loan_types = {
-                'Home Loan': 8.5,
-                'Personal Loan': 12.0,
-                'Car Loan': 9.5,
-                'Education Loan': 10.0
-            }
+            quotes = calculations.compare_loans(P, float(self.loan_tenure.text))
             
             results = []
-            for loan_type, rate in loan_types.items():
-                r = rate / 100 / 12
-                emi = P * r * (1 + r)**n / ((1 + r)**n - 1)
-                total_amount = emi * n
-                interest = total_amount - P
-                
-                results.append(f"{loan_type} ({rate}%):\nEMI: ₹{emi:.0f} | Total: ₹{total_amount:.0f}")
+            for loan_type, quote in quotes.items():
+                results.append(f"{loan_type} ({quote.annual_rate}%):\nEMI: ₹{quote.emi:.0f} | Total: ₹{quote.total_amount:.0f}")
             
             self.loan_result.text = f"Loan Comparison for ₹{P:.0f}:\n\n" + "\n\n".join(results)
         except:
@@ -375,19 +353,12 @@ class FinancialCalculatorApp(MDApp):
     
     def convert_currency(self, instance):
         try:
-            # Mock conversion rates (in real app, use API)
-            rates = {
-                'USD': {'INR': 83.0, 'EUR': 0.85, 'GBP': 0.73},
-                'INR': {'USD': 0.012, 'EUR': 0.010, 'GBP': 0.009},
-                'EUR': {'USD': 1.18, 'INR': 98.0, 'GBP': 0.86}
-            }
-            
             amount = float(self.curr_amount.text)
             from_curr = self.curr_from.text.upper()
             to_curr = self.curr_to.text.upper()
             
-            if from_curr in rates and to_curr in rates[from_curr]:
-                converted = amount * rates[from_curr][to_curr]
+            if calculations.exchange_rate(from_curr, to_curr) is not None:
+                converted = calculations.convert_currency(amount, from_curr, to_curr).converted
                 self.curr_result.text = f"{amount} {from_curr} = {converted:.2f} {to_curr}"
             else:
                 self.curr_result.text = "Currency pair not supported"
@@ -14,6 +14,7 @@ from kivy.uix.image import Image
 from kivy.metrics import dp
 import math
 import requests
+import calculations
 from datetime import datetime, date
 import json
 import webbrowser
@@ -396,14 +397,16 @@ class FinancialCalculatorApp(MDApp):
         
         self.comp_amount = MDTextField(hint_text="Investment Amount (₹)", input_filter="float")
         self.comp_tenure = MDTextField(hint_text="Tenure (years)", input_filter="float")
+        self.comp_step_up = MDTextField(hint_text="Yearly SIP/RD Step-up (%) - optional", input_filter="float")
         
         layout.add_widget(self.comp_amount)
         layout.add_widget(self.comp_tenure)
+        layout.add_widget(self.comp_step_up)
         
         calc_btn = MDRaisedButton(text="Compare Investments", on_release=self.compare_investments)
         layout.add_widget(calc_btn)
         
-        self.comp_result = MDLabel(text="", theme_text_color="Primary", size_hint_y=None, height="250dp")
+        self.comp_result = MDLabel(text="", theme_text_color="Primary", size_hint_y=None, height="300dp")
         layout.add_widget(self.comp_result)
         
         screen.add_widget(layout)
@@ -512,136 +515,86 @@ class FinancialCalculatorApp(MDApp):
     # Calculation methods
     def calculate_emi(self, instance):
         try:
-            P = float(self.emi_principal.text)
-            r = float(self.emi_rate.text) / 100 / 12
-            n = int(self.emi_tenure.text)
-            
-            if r == 0:
-                emi = P / n
-            else:
-                emi = P * r * (1 + r)**n / ((1 + r)**n - 1)
-            
-            total_amount = emi * n
-            interest = total_amount - P
+            result = calculations.calculate_emi(
+                float(self.emi_principal.text), float(self.emi_rate.text), int(self.emi_tenure.text)
+            )
             
-            self.emi_result.text = f"EMI Calculation Results:\n\n1. Principal Amount: ₹{P:.2f}\n2. Interest Rate: {float(self.emi_rate.text):.1f}% per annum\n3. Tenure: {int(self.emi_tenure.text)} months\n4. Monthly EMI: ₹{emi:.2f}\n5. Total Amount Payable: ₹{total_amount:.2f}\n6. Total Interest: ₹{interest:.2f}\n7. Interest Percentage: {(interest/P)*100:.1f}%"
+            self.emi_result.text = f"EMI Calculation Results:\n\n1. Principal Amount: ₹{result.principal:.2f}\n2. Interest Rate: {result.annual_rate:.1f}% per annum\n3. Tenure: {result.months} months\n4. Monthly EMI: ₹{result.emi:.2f}\n5. Total Amount Payable: ₹{result.total_amount:.2f}\n6. Total Interest: ₹{result.total_interest:.2f}\n7. Interest Percentage: {result.interest_percentage:.1f}%"
         except:
             self.emi_result.text = "Please enter valid values"
     
     def calculate_rd(self, instance):
         try:
-            P = float(self.rd_monthly.text)
-            r = float(self.rd_rate.text) / 100 / 12
-            n = int(self.rd_tenure.text)
-            
-            if r == 0:
-                maturity = P * n
-            else:
-                maturity = P * (((1 + r)**n - 1) / r) * (1 + r)
-            
-            total_invested = P * n
-            interest = maturity - total_invested
+            result = calculations.calculate_rd(
+                float(self.rd_monthly.text), float(self.rd_rate.text), int(self.rd_tenure.text)
+            )
             
-            self.rd_result.text = f"RD Calculation Results:\n\n1. Monthly Deposit: ₹{P:.2f}\n2. Interest Rate: {float(self.rd_rate.text):.1f}% per annum\n3. Tenure: {int(self.rd_tenure.text)} months\n4. Total Invested: ₹{total_invested:.2f}\n5. Interest Earned: ₹{interest:.2f}\n6. Maturity Amount: ₹{maturity:.2f}\n7. Return Rate: {(interest/total_invested)*100:.1f}%"
+            self.rd_result.text = f"RD Calculation Results:\n\n1. Monthly Deposit: ₹{result.deposit:.2f}\n2. Interest Rate: {result.annual_rate:.1f}% per annum\n3. Tenure: {result.tenure} months\n4. Total Invested: ₹{result.total_invested:.2f}\n5. Interest Earned: ₹{result.interest_earned:.2f}\n6. Maturity Amount: ₹{result.maturity_amount:.2f}\n7. Return Rate: {result.return_rate:.1f}%"
         except:
             self.rd_result.text = "Please enter valid values"
     
     def calculate_fd(self, instance):
         try:
-            P = float(self.fd_principal.text)
-            r = float(self.fd_rate.text) / 100
-            t = float(self.fd_tenure.text)
-            
-            maturity = P * (1 + r)**t
-            interest = maturity - P
+            result = calculations.calculate_fd(
+                float(self.fd_principal.text), float(self.fd_rate.text), float(self.fd_tenure.text)
+            )
             
-            self.fd_result.text = f"FD Calculation Results:\n\n1. Principal Amount: ₹{P:.2f}\n2. Interest Rate: {float(self.fd_rate.text):.1f}% per annum\n3. Tenure: {t} years\n4. Interest Earned: ₹{interest:.2f}\n5. Maturity Amount: ₹{maturity:.2f}\n6. Total Return: {(interest/P)*100:.1f}%"
+            self.fd_result.text = f"FD Calculation Results:\n\n1. Principal Amount: ₹{result.deposit:.2f}\n2. Interest Rate: {result.annual_rate:.1f}% per annum\n3. Tenure: {result.tenure} years\n4. Interest Earned: ₹{result.interest_earned:.2f}\n5. Maturity Amount: ₹{result.maturity_amount:.2f}\n6. Total Return: {result.return_rate:.1f}%"
         except:
             self.fd_result.text = "Please enter valid values"
     
     def calculate_loan(self, instance):
         try:
-            P = float(self.loan_amount.text)
-            r = float(self.loan_rate.text) / 100 / 12
-            n = float(self.loan_tenure.text) * 12
-            
-            if r == 0:
-                emi = P / n
-            else:
-                emi = P * r * (1 + r)**n / ((1 + r)**n - 1)
+            years = float(self.loan_tenure.text)
+            result = calculations.calculate_loan(float(self.loan_amount.text), float(self.loan_rate.text), years)
             
-            total_amount = emi * n
-            interest = total_amount - P
-            
-            self.loan_result.text = f"Loan Calculation Results:\n\n1. Loan Amount: ₹{P:.2f}\n2. Interest Rate: {float(self.loan_rate.text):.1f}% per annum\n3. Tenure: {float(self.loan_tenure.text):.0f} years\n4. Monthly EMI: ₹{emi:.2f}\n5. Total Interest: ₹{interest:.2f}\n6. Total Amount Payable: ₹{total_amount:.2f}\n7. Interest to Principal Ratio: {(interest/P)*100:.1f}%"
+            self.loan_result.text = f"Loan Calculation Results:\n\n1. Loan Amount: ₹{result.principal:.2f}\n2. Interest Rate: {result.annual_rate:.1f}% per annum\n3. Tenure: {years:.0f} years\n4. Monthly EMI: ₹{result.emi:.2f}\n5. Total Interest: ₹{result.total_interest:.2f}\n6. Total Amount Payable: ₹{result.total_amount:.2f}\n7. Interest to Principal Ratio: {result.interest_percentage:.1f}%"
         except:
             self.loan_result.text = "Please enter valid values"
     
     def add_gst(self, instance):
         try:
-            amount = float(self.gst_amount.text)
-            gst_rate = float(self.gst_rate.text)
-            
-            gst_amount = amount * gst_rate / 100
-            total_amount = amount + gst_amount
+            result = calculations.add_gst(float(self.gst_amount.text), float(self.gst_rate.text))
+            gst_rate = result.gst_rate
             
-            self.gst_result.text = f"GST Calculation (Adding GST):\n\n1. Base Amount: ₹{amount:.2f}\n2. GST Rate: {gst_rate}%\n3. CGST ({gst_rate/2}%): ₹{gst_amount/2:.2f}\n4. SGST ({gst_rate/2}%): ₹{gst_amount/2:.2f}\n5. Total GST Amount: ₹{gst_amount:.2f}\n6. Final Amount (Inc. GST): ₹{total_amount:.2f}"
+            self.gst_result.text = f"GST Calculation (Adding GST):\n\n1. Base Amount: ₹{result.base_amount:.2f}\n2. GST Rate: {gst_rate}%\n3. CGST ({gst_rate/2}%): ₹{result.cgst:.2f}\n4. SGST ({gst_rate/2}%): ₹{result.sgst:.2f}\n5. Total GST Amount: ₹{result.gst_amount:.2f}\n6. Final Amount (Inc. GST): ₹{result.total_amount:.2f}"
         except:
             self.gst_result.text = "Please enter valid values"
     
     def remove_gst(self, instance):
         try:
-            total_amount = float(self.gst_amount.text)
-            gst_rate = float(self.gst_rate.text)
+            result = calculations.remove_gst(float(self.gst_amount.text), float(self.gst_rate.text))
+            gst_rate = result.gst_rate
             
-            base_amount = total_amount / (1 + gst_rate/100)
-            gst_amount = total_amount - base_amount
-            
-            self.gst_result.text = f"GST Calculation (Removing GST):\n\n1. Total Amount (Inc. GST): ₹{total_amount:.2f}\n2. GST Rate: {gst_rate}%\n3. CGST ({gst_rate/2}%): ₹{gst_amount/2:.2f}\n4. SGST ({gst_rate/2}%): ₹{gst_amount/2:.2f}\n5. Total GST Amount: ₹{gst_amount:.2f}\n6. Base Amount (Exc. GST): ₹{base_amount:.2f}"
+            self.gst_result.text = f"GST Calculation (Removing GST):\n\n1. Total Amount (Inc. GST): ₹{result.total_amount:.2f}\n2. GST Rate: {gst_rate}%\n3. CGST ({gst_rate/2}%): ₹{result.cgst:.2f}\n4. SGST ({gst_rate/2}%): ₹{result.sgst:.2f}\n5. Total GST Amount: ₹{result.gst_amount:.2f}\n6. Base Amount (Exc. GST): ₹{result.base_amount:.2f}"
         except:
             self.gst_result.text = "Please enter valid values"
     
     def compare_investments(self, instance):
         try:
-            amount = float(self.comp_amount.text)
-            years = float(self.comp_tenure.text)
-            
-            # Different investment options
-            fd_return = amount * (1 + 0.06)**years
-            rd_months = years * 12
-            rd_monthly = amount / rd_months
-            rd_return = rd_monthly * (((1 + 0.065/12)**rd_months - 1) / (0.065/12)) * (1 + 0.065/12)
-            sip_monthly = amount / rd_months
-            sip_return = sip_monthly * (((1 + 0.12/12)**rd_months - 1) / (0.12/12))
-            ppf_return = amount * (1 + 0.075)**years
+            step_up = float(self.comp_step_up.text) if self.comp_step_up.text else 0.0
+            result = calculations.compare_investments(float(self.comp_amount.text), float(self.comp_tenure.text),
+                                                      step_up=step_up)
+            maturities = result.maturities
+            midway = {option: values[len(values) // 2 - 1] for option, values in result.series.items()}
+            xirr = result.annualized_returns
             
-            best_option = max([(fd_return, 'Fixed Deposit'), (rd_return, 'Recurring Deposit'), (sip_return, 'Mutual Fund SIP'), (ppf_return, 'PPF')], key=lambda x: x[0])[1]
-            self.comp_result.text = f"Investment Comparison for ₹{amount:.0f} over {years} years:\n\n1. Fixed Deposit (6%): ₹{fd_return:.2f}\n2. Recurring Deposit (6.5%): ₹{rd_return:.2f}\n3. PPF (7.5%): ₹{ppf_return:.2f}\n4. Mutual Fund SIP (12%): ₹{sip_return:.2f}\n\n5. Best Option: {best_option}\n6. Highest Return: ₹{max(fd_return, rd_return, sip_return, ppf_return):.2f}"
+            self.comp_result.text = f"Investment Comparison for ₹{result.amount:.0f} over {result.years} years:\n\n1. Fixed Deposit (6%): ₹{maturities['Fixed Deposit']:.2f}\n2. Recurring Deposit (6.5%): ₹{maturities['Recurring Deposit']:.2f}\n3. PPF (7.5%): ₹{maturities['PPF']:.2f}\n4. Mutual Fund SIP (12%): ₹{maturities['Mutual Fund SIP']:.2f}\n\n5. Best Option: {result.best_option}\n6. Highest Return: ₹{result.highest_return:.2f}\n7. Halfway Values: FD ₹{midway['Fixed Deposit']:.0f} | RD ₹{midway['Recurring Deposit']:.0f} | PPF ₹{midway['PPF']:.0f} | SIP ₹{midway['Mutual Fund SIP']:.0f}\n8. XIRR: FD {xirr['Fixed Deposit']:.2f}% | RD {xirr['Recurring Deposit']:.2f}% | PPF {xirr['PPF']:.2f}% | SIP {xirr['Mutual Fund SIP']:.2f}%"
         except:
             self.comp_result.text = "Please enter valid values"
     
     def convert_currency(self, instance):
         try:
-            rates = {
-                'USD': {'INR': 83.0, 'EUR': 0.85, 'GBP': 0.73, 'JPY': 110.0},
-                'INR': {'USD': 0.012, 'EUR': 0.010, 'GBP': 0.009, 'JPY': 1.32},
-                'EUR': {'USD': 1.18, 'INR': 98.0, 'GBP': 0.86, 'JPY': 129.0},
-                'GBP': {'USD': 1.37, 'INR': 114.0, 'EUR': 1.16, 'JPY': 150.0}
-            }
-            
             amount = float(self.curr_amount.text)
             from_curr = self.curr_from.text.upper()
             to_curr = self.curr_to.text.upper()
             
-            if from_curr == to_curr:
-                converted = amount
-            elif from_curr in rates and to_curr in rates[from_curr]:
-                converted = amount * rates[from_curr][to_curr]
-            else:
+            if calculations.exchange_rate(from_curr, to_curr) is None:
                 self.curr_result.text = "Currency pair not supported\n\nSupported: USD, INR, EUR, GBP"
                 return
+            result = calculations.convert_currency(amount, from_curr, to_curr)
             
-            self.curr_result.text = f"Currency Conversion Results:\n\n1. From Currency: {from_curr}\n2. To Currency: {to_curr}\n3. Amount to Convert: {amount:.2f} {from_curr}\n4. Exchange Rate: 1 {from_curr} = {rates[from_curr][to_curr] if from_curr != to_curr else 1:.4f} {to_curr}\n5. Converted Amount: {converted:.2f} {to_curr}\n6. Note: Rates are indicative"
+            self.curr_result.text = f"Currency Conversion Results:\n\n1. From Currency: {from_curr}\n2. To Currency: {to_curr}\n3. Amount to Convert: {amount:.2f} {from_curr}\n4. Exchange Rate: 1 {from_curr} = {result.rate:.4f} {to_curr}\n5. Converted Amount: {result.converted:.2f} {to_curr}\n6. Note: Rates are indicative"
         except:
             self.curr_result.text = "Please enter valid values"
     
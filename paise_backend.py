@@ -0,0 +1,271 @@
+"""
+Paise Backend Module
+Integer-paise arithmetic with per-credit rounding for bulk calculations
+"""
+
+import numpy as np
+
+FLOAT_BACKEND = 'float'   # closed-form floats, the fast path for single UI calculations
+PAISE_BACKEND = 'paise'   # int64 paise, rounded at every interest credit
+
+# Batch APIs reconcile against passbooks, so they default to exact paise
+BULK_BACKEND = PAISE_BACKEND
+
+PAISE_PER_RUPEE = 100
+RATE_SCALE = 10000  # rates are held as integer percent x 10^4 (7.1% -> 71000)
+
+# Interest credits are rounded to this many paise
+ROUND_TO_PAISA = 1
+ROUND_TO_RUPEE = 100
+
+# Small savings credits are rounded to the nearest rupee, bank-style
+# products (RD, payouts, FD, loans) to the paisa
+SCHEME_ROUNDING = {
+    'ppf': ROUND_TO_RUPEE,
+    'sukanya_samriddhi': ROUND_TO_RUPEE,
+    'nsc': ROUND_TO_RUPEE,
+    'kisan_vikas_patra': ROUND_TO_RUPEE,
+    'post_office_td': ROUND_TO_RUPEE,
+    'senior_citizen_savings': ROUND_TO_PAISA,
+    'post_office_mis': ROUND_TO_PAISA,
+    'post_office_rd': ROUND_TO_PAISA
+}
+
+
+def to_paise(amounts):
+    """Rupee amounts to int64 paise, rounding half away from zero"""
+    # Snap off binary noise first so 1.015 rounds like the decimal it was typed as
+    paise = np.round(np.asarray(amounts, dtype=np.float64) * PAISE_PER_RUPEE, 6)
+    return (np.sign(paise) * np.floor(np.abs(paise) + 0.5)).astype(np.int64)
+
+
+def from_paise(paise):
+    """int64 paise back to float rupees"""
+    return np.asarray(paise, dtype=np.int64) / PAISE_PER_RUPEE
+
+
+def to_rate_units(rates):
+    """Annual rates in percent to integer percent x 10^4"""
+    return np.round(np.asarray(rates, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+
+
+def round_div(numerator, denominator):
+    """Integer division rounding half away from zero"""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    magnitude = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+    return np.sign(numerator) * magnitude
+
+
+def interest_credit(balance, rate_units, periods_per_year=1, unit=ROUND_TO_PAISA):
+    """Interest for one period on a paise balance, rounded to `unit` paise"""
+    denominator = 100 * RATE_SCALE * periods_per_year * unit
+    return round_div(balance * rate_units, denominator) * unit
+
+
+def _inputs(amounts, periods, rates):
+    """int64 amounts and periods of one shape; a single rate stays a scalar"""
+    rates = np.asarray(rates, dtype=np.int64)
+    shape = np.broadcast_shapes(np.shape(np.atleast_1d(amounts)), np.shape(periods), rates.shape)
+    amounts = np.broadcast_to(np.asarray(amounts, dtype=np.int64), shape).copy()
+    periods = np.maximum(np.broadcast_to(np.asarray(periods, dtype=np.int64), shape), 0)
+    rates = rates[()] if rates.ndim == 0 else np.ascontiguousarray(np.broadcast_to(rates, shape))
+    return amounts, periods, rates
+
+
+def _rows_ending(periods, steps):
+    """Rows grouped by their number of periods: item k indexes rows with k periods
+
+    One stable sort up front lets the kernels step through time on whole
+    arrays and copy out each row's result when its own last period is done.
+    """
+    if periods.size == 0 or periods.min() == steps:
+        return [slice(0, 0)] * steps + [slice(None)]
+    # Period counts are small, so a 16-bit stable sort (a radix sort) suffices
+    order = np.argsort(periods.astype(np.uint16) if steps < 2 ** 16 else periods, kind='stable')
+    bounds = np.searchsorted(periods[order], np.arange(steps + 2))
+    return [order[bounds[k]:bounds[k + 1]] for k in range(steps + 1)]
+
+
+def _rows(values, rows):
+    return values if np.ndim(values) == 0 else values[rows]
+
+
+def _credit(balance, rates, denominator, unit, out):
+    """Interest on non-negative balances rounded half up to `unit` paise, into `out`"""
+    numerator = np.multiply(balance, rates, out=out)
+    numerator += denominator // 2  # denominators are even, so this is exact
+    numerator //= denominator
+    if unit != 1:
+        numerator *= unit
+    return numerator
+
+
+def annual_deposit_maturity(deposits, years, rates, deposit_years=None, unit=ROUND_TO_RUPEE):
+    """PPF/SSY style: deposit at the start of each year, interest credited yearly
+
+    Amounts are paise and rates rate units; returns the maturity in paise.
+    """
+    deposits, years, rates = _inputs(deposits, years, rates)
+    steps = int(years.max(initial=0))
+    ending = _rows_ending(years, steps)
+    stopping = None
+    if deposit_years is not None:
+        stopping = _rows_ending(np.minimum(np.broadcast_to(deposit_years, years.shape), years), steps)
+    denominator = 100 * RATE_SCALE * unit
+    balance = np.zeros(deposits.shape, dtype=np.int64)
+    maturity = np.zeros(deposits.shape, dtype=np.int64)
+    interest = np.empty(deposits.shape, dtype=np.int64)
+    for year in range(steps):
+        if stopping is not None:
+            deposits[stopping[year]] = 0
+        balance += deposits
+        balance += _credit(balance, rates, denominator, unit, interest)
+        rows = ending[year + 1]
+        maturity[rows] = balance[rows]
+    return maturity
+
+
+def compound_maturity(principal, periods, rates, periods_per_year=1, unit=ROUND_TO_RUPEE):
+    """Lump sum with interest credited and compounded every period"""
+    balance, periods, rates = _inputs(principal, periods, rates)
+    steps = int(periods.max(initial=0))
+    ending = _rows_ending(periods, steps)
+    denominator = 100 * RATE_SCALE * periods_per_year * unit
+    maturity = balance.copy()
+    interest = np.empty(balance.shape, dtype=np.int64)
+    for period in range(steps):
+        balance += _credit(balance, rates, denominator, unit, interest)
+        rows = ending[period + 1]
+        maturity[rows] = balance[rows]
+    return maturity
+
+
+def simple_payout(principal, periods, rates, periods_per_year=4, unit=ROUND_TO_PAISA):
+    """Interest paid out each period (SCSS, MIS); returns (per payout, total)"""
+    principal, periods, rates = _inputs(principal, periods, rates)
+    payout = interest_credit(principal, rates, periods_per_year, unit)
+    return payout, payout * periods
+
+
+def recurring_deposit_maturity(installments, months, rates, unit=ROUND_TO_PAISA):
+    """Monthly installments, interest on the monthly product credited quarterly
+
+    A quarter that opens at balance B accrues on B + I, B + 2I and B + 3I,
+    so each step of the loop is one whole quarter; a final part quarter of
+    m months accrues on mB + I m(m + 1)/2 and is credited at maturity.
+    """
+    installments, months, rates = _inputs(installments, months, rates)
+    quarters, rest = np.divmod(months, 3)
+    steps = int(quarters.max(initial=0))
+    ending = _rows_ending(quarters, steps)
+    denominator = 100 * RATE_SCALE * 12 * unit
+    twice, thrice = 2 * installments, 3 * installments
+    balance = np.zeros(installments.shape, dtype=np.int64)
+    maturity = np.zeros(installments.shape, dtype=np.int64)
+
+    def settle(rows):
+        opening, installment, m = balance[rows], installments[rows], rest[rows]
+        accrued = m * opening + installment * (m * (m + 1) // 2)
+        maturity[rows] = opening + m * installment + _credit(accrued, _rows(rates, rows), denominator, unit, accrued)
+
+    settle(ending[0])
+    interest = np.empty(installments.shape, dtype=np.int64)
+    for quarter in range(steps):
+        interest = np.add(balance, twice, out=interest)  # average balance of the quarter
+        balance += thrice
+        balance += _credit(interest, 3 * rates, denominator, unit, interest)
+        settle(ending[quarter + 1])
+    return maturity
+
+
+def monthly_deposit_maturity(installments, months, rates, unit=ROUND_TO_PAISA):
+    """Bank RD: installment at the start of each month, interest credited monthly"""
+    installments, months, rates = _inputs(installments, months, rates)
+    steps = int(months.max(initial=0))
+    ending = _rows_ending(months, steps)
+    denominator = 100 * RATE_SCALE * 12 * unit
+    balance = np.zeros(installments.shape, dtype=np.int64)
+    maturity = np.zeros(installments.shape, dtype=np.int64)
+    interest = np.empty(installments.shape, dtype=np.int64)
+    for month in range(steps):
+        balance += installments
+        balance += _credit(balance, rates, denominator, unit, interest)
+        rows = ending[month + 1]
+        maturity[rows] = balance[rows]
+    return maturity
+
+
+def emi_totals(principal, months, rates):
+    """EMI rounded to the paisa with monthly interest rounded on each installment
+
+    Returns the EMI, the final (balancing) installment and total interest,
+    all in paise.
+    """
+    principal, months, rates = _inputs(principal, months, rates)
+    r = rates / (100 * RATE_SCALE * 12)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (1 + r) ** months
+        emi = np.where(r == 0, principal / months, principal * r * growth / (growth - 1))
+    emi = np.ceil(emi).astype(np.int64)
+
+    steps = int(months.max(initial=0))
+    ending = _rows_ending(months, steps)
+    denominator = 100 * RATE_SCALE * 12
+    balance = principal
+    paid_interest = np.zeros(principal.shape, dtype=np.int64)
+    total_interest = np.zeros(principal.shape, dtype=np.int64)
+    final = np.zeros(principal.shape, dtype=np.int64)
+    interest = np.empty(principal.shape, dtype=np.int64)
+    for month in range(steps):
+        _credit(balance, rates, denominator, ROUND_TO_PAISA, interest)
+        paid_interest += interest
+        balance += interest
+        rows = ending[month + 1]
+        final[rows] = balance[rows]  # the last installment clears the balance
+        total_interest[rows] = paid_interest[rows]
+        # An installment never exceeds what is owed, so a paid-off loan stays at zero
+        balance -= emi
+        np.maximum(balance, 0, out=balance)
+    return emi, final, total_interest
+
+
+def _ppf_paise(deposits, years, rates):
+    return annual_deposit_maturity(deposits, years, rates, unit=SCHEME_ROUNDING['ppf'])
+
+
+def _ssy_paise(deposits, years, rates):
+    return annual_deposit_maturity(deposits, years, rates, np.minimum(years, 15),
+                                   unit=SCHEME_ROUNDING['sukanya_samriddhi'])
+
+
+def _lump_paise(scheme):
+    return lambda principal, years, rates: compound_maturity(principal, years, rates, 1, SCHEME_ROUNDING[scheme])
+
+
+def _payout_paise(scheme, periods_per_year):
+    def value(principal, years, rates):
+        principal, years, rates = _inputs(principal, years, rates)
+        _, total = simple_payout(principal, years * periods_per_year, rates, periods_per_year,
+                                 SCHEME_ROUNDING[scheme])
+        return principal + total
+    return value
+
+
+def _rd_paise(installments, years, rates):
+    return recurring_deposit_maturity(installments, np.asarray(years) * 12, rates,
+                                      SCHEME_ROUNDING['post_office_rd'])
+
+
+# Paise counterparts of scheme_registry.SCHEME_VALUE_FUNCTIONS:
+# f(amount paise, whole years, rate units) -> maturity paise
+PAISE_VALUE_FUNCTIONS = {
+    'ppf': _ppf_paise,
+    'sukanya_samriddhi': _ssy_paise,
+    'nsc': _lump_paise('nsc'),
+    'kisan_vikas_patra': _lump_paise('kisan_vikas_patra'),
+    'post_office_td': _lump_paise('post_office_td'),
+    'senior_citizen_savings': _payout_paise('senior_citizen_savings', 4),
+    'post_office_mis': _payout_paise('post_office_mis', 12),
+    'post_office_rd': _rd_paise
+}
+
@@ -0,0 +1,159 @@
+"""
+Parameter Sweep Module
+Amount x tenure x rate grids for scheme, alternative and loan comparisons
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import RawArray
+
+import numpy as np
+
+from growth_kernel import annuity_factor_array
+from public_funds import PublicFundsCalculator
+from rate_timeline import rate_at
+from scheme_registry import default_registry
+
+
+def _scheme_metrics(amounts, tenures, rates, settings):
+    """Maturity of every compared scheme if it paid the swept rate"""
+    metrics = {}
+    for spec in default_registry(settings['scheme_details']):
+        eligible = spec.eligible(amounts, tenures)
+        maturity = spec.kernel(amounts, tenures, rates)['maturity_amount']
+        metrics[spec.label] = np.where(eligible, maturity, np.nan)
+    return metrics
+
+
+def _alternative_metrics(amounts, tenures, rates, settings):
+    """PPF at the swept rate against its fixed-rate alternatives (annual deposits)"""
+    metrics = {'PPF': amounts * annuity_factor_array(rates, tenures)}
+    for name, rate in settings['alternative_rates'].items():
+        metrics[name] = amounts * annuity_factor_array(rate, tenures)
+    return metrics
+
+
+def _loan_metrics(amounts, tenures, rates, settings):
+    """Monthly EMI, total payment and total interest (tenure in years)"""
+    r = rates / 100 / 12
+    n = tenures * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (1 + r) ** n
+        emi = np.where(r == 0, amounts / n, amounts * r * growth / (growth - 1))
+    total_payment = emi * n
+    return {
+        'emi': emi,
+        'total_payment': total_payment,
+        'total_interest': total_payment - amounts
+    }
+
+
+SWEEP_TARGETS = {
+    'schemes': _scheme_metrics,
+    'alternatives': _alternative_metrics,
+    'loans': _loan_metrics
+}
+
+# Targets whose kernels count whole years of deposits and interest credits
+WHOLE_YEAR_TARGETS = ('schemes', 'alternatives')
+
+
+def _evaluate(target, axes, settings, start, stop):
+    """Metrics for flat grid positions [start, stop)"""
+    shape = tuple(len(axis) for axis in axes)
+    i, j, k = np.unravel_index(np.arange(start, stop), shape)
+    amounts, tenures, rates = axes
+    return SWEEP_TARGETS[target](amounts[i], tenures[j], rates[k], settings)
+
+
+# Shared result buffers, handed to each worker process when it starts
+_outputs = {}
+
+
+def _attach_outputs(outputs):
+    _outputs.update(outputs)
+
+
+def _sweep_chunk(target, axes, settings, start, stop):
+    """Evaluate one chunk in a worker and write it into the shared results"""
+    for name, values in _evaluate(target, axes, settings, start, stop).items():
+        np.frombuffer(_outputs[name], dtype=np.float64)[start:stop] = values
+
+
+def _sweep_chunk_args(args):
+    return _sweep_chunk(*args)
+
+
+class ParameterSweep:
+    """Evaluate a comparison over a full amount x tenure x rate grid
+
+    Scheme limits and the alternatives' rates are those of `calculator`,
+    including any local overrides of its rates and scheme details.
+    """
+
+    def __init__(self, chunk_size=250000, max_workers=None, calculator=None):
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.calculator = calculator or PublicFundsCalculator()
+
+    def run(self, target, amounts, tenures, rates):
+        """Return {metric: array of shape (amounts, tenures, rates)}
+
+        The grid is flattened and split into chunks of `chunk_size` points,
+        so temporaries stay bounded however large the grid is. With several
+        chunks, workers write straight into shared result arrays.
+        Scheme and alternative tenures must be whole years.
+        """
+        if target not in SWEEP_TARGETS:
+            raise ValueError(f"Unknown sweep target: {target}")
+        axes = tuple(np.atleast_1d(np.asarray(axis, dtype=np.float64))
+                     for axis in (amounts, tenures, rates))
+        if target in WHOLE_YEAR_TARGETS and (axes[1] != np.floor(axes[1])).any():
+            raise ValueError("Tenures must be whole years")
+        settings = self._settings()
+        shape = tuple(len(axis) for axis in axes)
+        size = int(np.prod(shape))
+        bounds = [(start, min(start + self.chunk_size, size))
+                  for start in range(0, size, self.chunk_size)]
+
+        if size == 0:
+            # Metric names from a throwaway point; every array is empty
+            names = SWEEP_TARGETS[target](np.ones(1), np.ones(1), np.ones(1), settings)
+            return {name: np.empty(shape) for name in names}
+
+        if self.max_workers == 1 or len(bounds) < 2:
+            results = {}
+            for start, stop in bounds:
+                for name, values in _evaluate(target, axes, settings, start, stop).items():
+                    results.setdefault(name, np.empty(size))[start:stop] = values
+            return {name: values.reshape(shape) for name, values in results.items()}
+
+        # One evaluated point gives the metric names to allocate. The
+        # returned arrays are views of the shared buffers, not copies.
+        names = list(_evaluate(target, axes, settings, 0, 1))
+        outputs = {name: RawArray('d', size) for name in names}
+        jobs = [(target, axes, settings, start, stop) for start, stop in bounds]
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach_outputs,
+                                 initargs=(outputs,)) as pool:
+            list(pool.map(_sweep_chunk_args, jobs))
+        return {name: np.frombuffer(buffer, dtype=np.float64).reshape(shape)
+                for name, buffer in outputs.items()}
+
+    def _settings(self):
+        """Plain-dict copy of the calculator's limits and rates for the workers"""
+        terms = self.calculator.terms
+        return {
+            'scheme_details': terms.scheme_details,
+            'alternative_rates': dict(terms.snapshot.alternative_rates, NSC=rate_at(terms.rates['nsc']))
+        }
+
+    def compare_all_schemes(self, amounts, tenures, rates):
+        """Scheme maturities over the grid (see PublicFundsCalculator.compare_all_schemes)"""
+        return self.run('schemes', amounts, tenures, rates)
+
+    def compare_with_alternatives(self, annual_deposits, tenures, ppf_rates):
+        """PPF against FD, ELSS and NSC (see PPFCalculator.compare_with_alternatives)"""
+        return self.run('alternatives', annual_deposits, tenures, ppf_rates)
+
+    def compare_loans(self, principals, tenures, rates):
+        """EMI and totals over the grid; tenures in years"""
+        return self.run('loans', principals, tenures, rates)
@@ -0,0 +1,174 @@
+"""
+Payout Calendar Module
+Dated interest payouts of SCSS and Post Office MIS holdings, merged in date order
+"""
+
+import heapq
+from calendar import isleap
+from datetime import date
+from itertools import groupby
+
+from public_funds import PublicFundsCalculator
+from rate_timeline import add_years, quarter_start, rate_at
+
+SCSS = 'senior_citizen_savings'
+MIS = 'post_office_mis'
+
+INTEREST = 'interest'
+PRINCIPAL = 'principal'
+
+DAILY = 'daily'
+MONTHLY = 'monthly'
+
+DEFAULT_TENURE = 5
+_DAYS_PER_YEAR = 365
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _add_months(when, months):
+    """Shift a date by whole months, clipping to the end of shorter months"""
+    month = when.month - 1 + months
+    year = when.year + month // 12
+    month = month % 12 + 1
+    if when.day <= 28:
+        return date(year, month, when.day)
+    days = 29 if month == 2 and isleap(year) else _DAYS_IN_MONTH[month - 1]
+    return date(year, month, min(when.day, days))
+
+
+def _payout(when, holding, kind, amount):
+    # Day number and holding id lead so the merge heap compares plain ints
+    return when.toordinal(), holding['holding_id'], {
+        'date': when,
+        'holding_id': holding['holding_id'],
+        'owner_id': holding['owner_id'],
+        'scheme': holding['scheme'],
+        'kind': kind,
+        'amount': amount
+    }
+
+
+def _scss_payouts(holding):
+    """Quarterly interest on 1st April/July/October/January, pro rata for broken periods"""
+    principal, start, maturity = holding['principal'], holding['start_date'], holding['maturity_date']
+    rate = holding['rate'] / 100
+
+    period_start = start
+    due = _add_months(quarter_start(start), 3)
+    while period_start < maturity:
+        period_end = min(due, maturity)
+        if period_start == quarter_start(period_start) and period_end == due:
+            amount = principal * rate / 4
+        else:
+            amount = principal * rate * (period_end - period_start).days / _DAYS_PER_YEAR
+        yield _payout(period_end, holding, INTEREST, amount)
+        period_start = period_end
+        due = _add_months(due, 3)
+    yield _payout(maturity, holding, PRINCIPAL, principal)
+
+
+def _mis_payouts(holding):
+    """Monthly interest on each monthly anniversary of the deposit"""
+    start = holding['start_date']
+    monthly_income = holding['principal'] * holding['rate'] / 100 / 12
+    for month in range(1, round(holding['tenure'] * 12) + 1):
+        yield _payout(_add_months(start, month), holding, INTEREST, monthly_income)
+    yield _payout(holding['maturity_date'], holding, PRINCIPAL, holding['principal'])
+
+
+_PAYOUT_SCHEDULES = {
+    SCSS: _scss_payouts,
+    MIS: _mis_payouts
+}
+
+
+class PayoutCalendar:
+    """Chronological payout stream across many income-scheme holdings"""
+
+    def __init__(self, calculator=None):
+        self.calculator = calculator or PublicFundsCalculator()
+        self.holdings = []
+
+    def add_holding(self, scheme, principal, start_date, rate=None, tenure=DEFAULT_TENURE, owner_id=0):
+        """Register an SCSS or MIS holding; rate defaults to the one in force at start"""
+        if scheme not in _PAYOUT_SCHEDULES:
+            raise ValueError(f"No payout schedule for scheme: {scheme}")
+        if rate is None:
+            rate = rate_at(self.calculator.rates[scheme], start_date)
+        self.holdings.append({
+            'holding_id': len(self.holdings),
+            'owner_id': owner_id,
+            'scheme': scheme,
+            'principal': principal,
+            'start_date': start_date,
+            'rate': rate,
+            'tenure': tenure,
+            'maturity_date': add_years(start_date, tenure)
+        })
+
+    @classmethod
+    def from_store(cls, store):
+        """Calendar of the SCSS and MIS holdings in a PortfolioStore"""
+        calendar = cls(store.calculator)
+        for scheme in _PAYOUT_SCHEDULES:
+            subset = store.filter(scheme=scheme)
+            for principal, start, rate, tenure, owner in zip(
+                subset.column('principal').tolist(), subset.column('start_date').tolist(),
+                subset.column('rate').tolist(), subset.column('tenure').tolist(),
+                subset.column('owner_id').tolist()
+            ):
+                calendar.add_holding(scheme, principal, start, rate, round(tenure), owner)
+        return calendar
+
+    def payouts(self, start=None, end=None):
+        """Yield every payout in date order, lazily, via a k-way heap merge
+
+        Ties keep the order holdings were added in. Only one pending payout
+        per holding is held in memory.
+        """
+        first = start.toordinal() if start is not None else 0
+        last = end.toordinal() if end is not None else None
+
+        # Heap of (day, holding id, payout, stream); ids are unique, so
+        # payouts themselves are never compared
+        heap = []
+        for holding in self.holdings:
+            stream = _PAYOUT_SCHEDULES[holding['scheme']](holding)
+            day, holding_id, payout = next(stream)
+            heap.append((day, holding_id, payout, stream))
+        heapq.heapify(heap)
+
+        while heap:
+            day, _, payout, stream = heap[0]
+            if last is not None and day > last:
+                return
+            if day >= first:
+                yield payout
+            following = next(stream, None)
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (*following, stream))
+
+    def aggregate(self, window=MONTHLY, start=None, end=None):
+        """Yield interest and principal totals per day or per month"""
+        if window == DAILY:
+            period_of = lambda p: p['date']
+        elif window == MONTHLY:
+            period_of = lambda p: p['date'].replace(day=1)
+        else:
+            raise ValueError(f"Unknown aggregation window: {window}")
+
+        for period, payouts in groupby(self.payouts(start, end), key=period_of):
+            totals = {INTEREST: 0.0, PRINCIPAL: 0.0}
+            count = 0
+            for payout in payouts:
+                totals[payout['kind']] += payout['amount']
+                count += 1
+            yield {
+                'period': period,
+                'interest': totals[INTEREST],
+                'principal': totals[PRINCIPAL],
+                'total': totals[INTEREST] + totals[PRINCIPAL],
+                'payouts': count
+            }
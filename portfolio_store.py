@@ -0,0 +1,220 @@
+"""
+Portfolio Store Module
+Columnar store of public fund holdings with vectorized valuation queries
+"""
+
+from datetime import date
+
+import numpy as np
+
+from public_funds import PublicFundsCalculator
+from rate_timeline import rate_at
+from rd_engine import rd_value_factor
+
+# Scheme ids are positions in this tuple (keys of PublicFundsCalculator.rates)
+SCHEMES = (
+    'ppf',
+    'nsc',
+    'kisan_vikas_patra',
+    'sukanya_samriddhi',
+    'senior_citizen_savings',
+    'post_office_td',
+    'post_office_rd',
+    'post_office_mis'
+)
+SCHEME_IDS = {scheme: i for i, scheme in enumerate(SCHEMES)}
+
+DEFAULT_TENURES = {
+    'ppf': 15,
+    'nsc': 5,
+    'kisan_vikas_patra': None,  # Time to double at the purchase rate
+    'sukanya_samriddhi': 21,
+    'senior_citizen_savings': 5,
+    'post_office_td': 5,
+    'post_office_rd': 5,
+    'post_office_mis': 5
+}
+
+# How the principal column is invested
+ANNUAL_DEPOSIT = 0   # principal is a yearly deposit (PPF, SSY)
+LUMP_SUM = 1         # principal compounds until maturity (NSC, KVP, TD)
+PAYOUT = 2           # interest is paid out, principal returned (SCSS, MIS)
+MONTHLY_DEPOSIT = 3  # principal is a monthly deposit (RD)
+
+_KINDS = np.array([
+    ANNUAL_DEPOSIT, LUMP_SUM, LUMP_SUM, ANNUAL_DEPOSIT,
+    PAYOUT, LUMP_SUM, MONTHLY_DEPOSIT, PAYOUT
+], dtype=np.int8)
+_SSY_DEPOSIT_YEARS = 15
+_DAYS_PER_YEAR = 365.25
+
+_COLUMNS = (
+    ('scheme_id', np.int8),
+    ('owner_id', np.int64),
+    ('principal', np.float64),
+    ('start_date', 'datetime64[D]'),
+    ('rate', np.float64),
+    ('tenure', np.float64)
+)
+
+
+def _as_day(when):
+    if when is None:
+        when = date.today()
+    return np.datetime64(when, 'D')
+
+
+class PortfolioStore:
+    """Holdings kept as typed NumPy columns instead of per-holding dicts"""
+
+    def __init__(self, calculator=None, capacity=1024):
+        self.calculator = calculator or PublicFundsCalculator()
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in _COLUMNS}
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name):
+        """Read-only view of one column"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def append(self, scheme, principal, start_date, rate=None, tenure=None, owner_id=0):
+        """Add one holding; rate and tenure default to the scheme's current terms"""
+        self.extend([scheme], [principal], [start_date], None if rate is None else [rate],
+                    None if tenure is None else [tenure], owner_id)
+
+    def extend(self, schemes, principals, start_dates, rates=None, tenures=None, owner_ids=0):
+        """Add many holdings at once from array-likes"""
+        scheme_ids = np.array([SCHEME_IDS[s] for s in schemes] if len(schemes) and isinstance(schemes[0], str)
+                              else schemes, dtype=np.int8)
+        count = len(scheme_ids)
+        start_dates = np.array([_as_day(d) for d in start_dates]
+                               if len(start_dates) and isinstance(start_dates[0], date)
+                               else start_dates, dtype='datetime64[D]')
+
+        # Missing terms default to the calculator's current rates
+        if rates is None:
+            current = np.array([rate_at(self.calculator.rates[s]) for s in SCHEMES])
+            rates = current[scheme_ids]
+        rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), (count,))
+        if tenures is None:
+            tenures = self._default_tenures(scheme_ids, rates)
+
+        self._reserve(self._size + count)
+        end = self._size + count
+        self._columns['scheme_id'][self._size:end] = scheme_ids
+        self._columns['owner_id'][self._size:end] = owner_ids
+        self._columns['principal'][self._size:end] = principals
+        self._columns['start_date'][self._size:end] = start_dates
+        self._columns['rate'][self._size:end] = rates
+        self._columns['tenure'][self._size:end] = tenures
+        self._size = end
+
+    def filter(self, mask=None, scheme=None, owner_id=None):
+        """Return a new store with the holdings matching a mask and/or keys"""
+        keep = np.ones(self._size, dtype=bool) if mask is None else np.array(mask, dtype=bool)
+        if scheme is not None:
+            keep &= self.column('scheme_id') == SCHEME_IDS[scheme]
+        if owner_id is not None:
+            keep &= self.column('owner_id') == owner_id
+
+        subset = PortfolioStore(self.calculator, capacity=max(int(keep.sum()), 1))
+        for name, _ in _COLUMNS:
+            values = self.column(name)[keep]
+            subset._columns[name][:len(values)] = values
+        subset._size = int(keep.sum())
+        return subset
+
+    def valuation(self, as_of=None):
+        """Value, amount invested and interest accrued of every holding on a date"""
+        elapsed = (_as_day(as_of) - self.column('start_date')).astype(np.float64) / _DAYS_PER_YEAR
+        return self._value_after(np.clip(elapsed, 0.0, self.column('tenure')), elapsed >= 0)
+
+    def maturity(self):
+        """Maturity date and value of every holding"""
+        tenure = self.column('tenure')
+        result = self._value_after(tenure, np.ones(self._size, dtype=bool))
+        days = np.round(tenure * _DAYS_PER_YEAR).astype('timedelta64[D]')
+        result['maturity_date'] = self.column('start_date') + days
+        return result
+
+    def interest_accrued(self, start, end=None):
+        """Interest earned by every holding between two dates"""
+        return self.valuation(end)['interest_accrued'] - self.valuation(start)['interest_accrued']
+
+    def group_by(self, values, by='scheme'):
+        """Sum a per-holding array by scheme name or by owner id"""
+        if by == 'scheme':
+            totals = np.bincount(self.column('scheme_id'), weights=values, minlength=len(SCHEMES))
+            return {scheme: float(totals[i]) for i, scheme in enumerate(SCHEMES) if totals[i]}
+        owners, position = np.unique(self.column('owner_id'), return_inverse=True)
+        totals = np.bincount(position, weights=values, minlength=len(owners))
+        return dict(zip(owners.tolist(), totals.tolist()))
+
+    def _value_after(self, elapsed, active):
+        kind = _KINDS[self.column('scheme_id')]
+        principal = self.column('principal')
+        tenure = self.column('tenure')
+        r = self.column('rate') / 100
+        g = 1 + r
+
+        value = np.zeros(self._size)
+        invested = np.zeros(self._size)
+        payouts = np.zeros(self._size)
+
+        # Yearly deposits at the start of each year; SSY deposits stop after 15
+        rows = kind == ANNUAL_DEPOSIT
+        deposit_years = np.where(self.column('scheme_id') == SCHEME_IDS['sukanya_samriddhi'],
+                                 np.minimum(tenure, _SSY_DEPOSIT_YEARS), tenure)
+        made = np.minimum(np.floor(elapsed) + 1, deposit_years)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annuity = np.where(r == 0, made, g ** elapsed * (1 - g ** -made) / (1 - 1 / g))
+        value[rows] = (principal * annuity)[rows]
+        invested[rows] = (principal * made)[rows]
+
+        rows = kind == LUMP_SUM
+        value[rows] = (principal * g ** elapsed)[rows]
+        invested[rows] = principal[rows]
+
+        rows = kind == PAYOUT
+        value[rows] = principal[rows]
+        invested[rows] = principal[rows]
+        payouts[rows] = (principal * r * elapsed)[rows]
+
+        # Monthly deposits at the start of each month, interest credited quarterly
+        rows = kind == MONTHLY_DEPOSIT
+        months = elapsed * 12
+        made = np.minimum(np.floor(months) + 1, tenure * 12)
+        value[rows] = (principal * rd_value_factor(r * 100, made, months))[rows]
+        invested[rows] = (principal * made)[rows]
+
+        value[~active] = 0.0
+        invested[~active] = 0.0
+        payouts[~active] = 0.0
+        return {
+            'value': value,
+            'invested': invested,
+            'interest_paid_out': payouts,
+            'interest_accrued': value - invested + payouts
+        }
+
+    def _default_tenures(self, scheme_ids, rates):
+        tenures = np.array([DEFAULT_TENURES[s] or 0 for s in SCHEMES], dtype=np.float64)[scheme_ids]
+        kvp = scheme_ids == SCHEME_IDS['kisan_vikas_patra']
+        tenures[kvp] = np.log(2) / np.log1p(rates[kvp] / 100)
+        return tenures
+
+    def _reserve(self, size):
+        capacity = len(self._columns['scheme_id'])
+        if size <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < size:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
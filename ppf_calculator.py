@@ -4,38 +4,98 @@ Handles PPF calculations, tax benefits, and maturity projections
 """
 
 import math
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from growth_kernel import default_kernel, annuity_factor_array
+from paise_backend import (
+    BULK_BACKEND, PAISE_BACKEND, SCHEME_ROUNDING, annual_deposit_maturity, from_paise, to_paise, to_rate_units
+)
+from rate_config import default_config, pinned_attribute
+from rate_timeline import RateTimeline, annuity_factor, growth_factor, rate_at
+from tax_engine import IncomeTaxEngine, OLD_REGIME, CESS_RATE, DEFAULT_FINANCIAL_YEAR
+from xirr import XirrEngine
+
+# Per-row error codes returned by the batch APIs
+BATCH_OK = 0
+BATCH_BELOW_MIN_DEPOSIT = 1
+BATCH_ABOVE_MAX_DEPOSIT = 2
+
+# Deposits made on or before this day earn interest for the month
+LEDGER_CUTOFF_DAY = 5
+
+# Cost marking infeasible extension plans
+_INFEASIBLE = 1e18
+
+class PPFTerms:
+    """PPF rate and limits of one rate snapshot, bound and read as a unit"""
+    
+    __slots__ = ('snapshot', 'rate_version', 'current_rate', 'min_deposit', 'max_deposit',
+                 'lock_period', 'tax_exemption_limit', 'alternative_rates')
+    
+    def __init__(self, snapshot):
+        details = snapshot.scheme_details['ppf']
+        self.snapshot = snapshot
+        self.rate_version = snapshot.version
+        self.current_rate = snapshot.rates['ppf']     # Current PPF interest rate
+        self.min_deposit = details['min_deposit']     # Minimum annual deposit
+        self.max_deposit = details['max_deposit']     # Maximum annual deposit
+        self.lock_period = details['tenure']          # Lock-in period in years
+        self.tax_exemption_limit = snapshot.ppf['tax_exemption_limit']  # 80C limit
+        # Rates of the options compare_with_alternatives weighs PPF against
+        self.alternative_rates = dict(snapshot.alternative_rates, NSC=snapshot.rates['nsc'])
 
 class PPFCalculator:
     """PPF Calculator with all features"""
     
-    def __init__(self):
-        self.current_rate = 7.1  # Current PPF interest rate (2024)
-        self.min_deposit = 500   # Minimum annual deposit
-        self.max_deposit = 150000  # Maximum annual deposit
-        self.lock_period = 15    # Lock-in period in years
-        self.tax_exemption_limit = 150000  # 80C limit
+    # The rate and limits of the bound snapshot, read through one PPFTerms
+    snapshot = pinned_attribute('terms', 'snapshot')
+    rate_version = pinned_attribute('terms', 'rate_version')
+    current_rate = pinned_attribute('terms', 'current_rate')
+    min_deposit = pinned_attribute('terms', 'min_deposit')
+    max_deposit = pinned_attribute('terms', 'max_deposit')
+    lock_period = pinned_attribute('terms', 'lock_period')
+    tax_exemption_limit = pinned_attribute('terms', 'tax_exemption_limit')
+    alternative_rates = pinned_attribute('terms', 'alternative_rates')
     
-    def calculate_ppf_maturity(self, annual_deposit, years=15, interest_rate=None):
-        """Calculate PPF maturity amount"""
-        if interest_rate is None:
-            interest_rate = self.current_rate
+    def __init__(self, config=None):
+        self.config = config or default_config
+        self.kernel = default_kernel  # Shared growth-factor table
+        self.refresh()
+    
+    def refresh(self):
+        """Bind to the latest rate snapshot; returns True if the version changed
         
-        if annual_deposit < self.min_deposit:
-            return None, f"Minimum deposit is ₹{self.min_deposit}"
+        Every result of this calculator comes from one snapshot, so a reload
+        only takes effect here when refresh() is called between requests.
+        The terms are swapped in one assignment and each method reads them
+        once, so a result never mixes two snapshots.
+        """
+        snapshot = self.config.current()
+        changed = getattr(self, 'terms', None) is None or self.terms.snapshot is not snapshot
+        self.terms = PPFTerms(snapshot)
+        return changed
+    
+    def calculate_ppf_maturity(self, annual_deposit, years=15, interest_rate=None, start_date=None):
+        """Calculate PPF maturity amount (rate may be a RateTimeline)"""
+        return self._ppf_maturity(self.terms, annual_deposit, years, interest_rate, start_date)
+    
+    def _ppf_maturity(self, terms, annual_deposit, years, interest_rate, start_date):
+        if interest_rate is None:
+            interest_rate = terms.current_rate
         
-        if annual_deposit > self.max_deposit:
-            return None, f"Maximum deposit is ₹{self.max_deposit}"
+        if annual_deposit < terms.min_deposit:
+            return None, f"Minimum deposit is ₹{terms.min_deposit}"
         
-        # PPF compounds annually
-        r = interest_rate / 100
-        maturity_amount = 0
+        if annual_deposit > terms.max_deposit:
+            return None, f"Maximum deposit is ₹{terms.max_deposit}"
         
-        # Calculate year by year compounding
-        for year in range(years):
-            # Deposit made at beginning of year
-            deposit_value = annual_deposit * ((1 + r) ** (years - year))
-            maturity_amount += deposit_value
+        # PPF compounds annually, deposit made at beginning of year
+        maturity_amount = annual_deposit * annuity_factor(
+            interest_rate, years, start_date=start_date, kernel=self.kernel
+        )
         
         total_invested = annual_deposit * years
         interest_earned = maturity_amount - total_invested
@@ -46,72 +106,144 @@ class PPFCalculator:
             'interest_earned': interest_earned,
             'effective_rate': (interest_earned / total_invested) * 100,
             'years': years,
-            'annual_deposit': annual_deposit
+            'annual_deposit': annual_deposit,
+            'rate_version': terms.rate_version
         }, None
     
-    def calculate_monthly_target(self, target_amount, years=15, interest_rate=None):
+    def calculate_ppf_maturity_batch(self, annual_deposits, years=15, interest_rates=None, backend=BULK_BACKEND):
+        """Calculate PPF maturity for arrays of deposits, tenures and rates in one pass
+        
+        The default PAISE_BACKEND credits interest yearly rounded to the
+        rupee, as on a passbook, on deposits rounded to the paisa;
+        FLOAT_BACKEND gives the closed form of calculate_ppf_maturity.
+        """
+        terms = self.terms
+        if interest_rates is None:
+            interest_rates = terms.current_rate
+        
+        deposits, years, rates = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(annual_deposits, dtype=np.float64)),
+            np.asarray(years, dtype=np.int64),
+            np.asarray(interest_rates, dtype=np.float64)
+        )
+        
+        # Same min/max checks as the scalar method, reported per row
+        error_code = np.full(deposits.shape, BATCH_OK, dtype=np.int8)
+        error_code[deposits < terms.min_deposit] = BATCH_BELOW_MIN_DEPOSIT
+        error_code[deposits > terms.max_deposit] = BATCH_ABOVE_MAX_DEPOSIT
+        valid = error_code == BATCH_OK
+        
+        if backend == PAISE_BACKEND:
+            paise = to_paise(deposits)
+            deposits = from_paise(paise)
+            maturity_amount = from_paise(annual_deposit_maturity(
+                paise, years, to_rate_units(rates), unit=SCHEME_ROUNDING['ppf']
+            ))
+        else:
+            # Closed form of the yearly compounding, deposit at beginning of year
+            maturity_amount = annuity_factor_array(rates, years)
+            maturity_amount *= deposits
+        total_invested = deposits * years
+        maturity_amount[~valid] = np.nan
+        total_invested[~valid] = np.nan
+        interest_earned = maturity_amount - total_invested
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_rate = interest_earned / total_invested
+        effective_rate *= 100
+        
+        return {
+            'maturity_amount': maturity_amount,
+            'total_invested': total_invested,
+            'interest_earned': interest_earned,
+            'effective_rate': effective_rate,
+            'years': years,
+            'annual_deposit': deposits,
+            'rate_version': terms.rate_version,
+            'error_code': error_code
+        }
+    
+    def batch_error_message(self, error_code):
+        """Return the scalar-API error message for a batch error code"""
+        terms = self.terms
+        if error_code == BATCH_BELOW_MIN_DEPOSIT:
+            return f"Minimum deposit is ₹{terms.min_deposit}"
+        if error_code == BATCH_ABOVE_MAX_DEPOSIT:
+            return f"Maximum deposit is ₹{terms.max_deposit}"
+        return None
+    
+    def calculate_monthly_target(self, target_amount, years=15, interest_rate=None, start_date=None):
         """Calculate required monthly deposit to reach target"""
+        terms = self.terms
         if interest_rate is None:
-            interest_rate = self.current_rate
-        
-        r = interest_rate / 100
+            interest_rate = terms.current_rate
         
         # Use formula to find required annual deposit
         # Target = Annual_Deposit * [((1+r)^n - 1) / r] * (1+r)
-        factor = (((1 + r) ** years - 1) / r) * (1 + r)
+        factor = annuity_factor(interest_rate, years, start_date=start_date, kernel=self.kernel)
         required_annual = target_amount / factor
         required_monthly = required_annual / 12
         
-        if required_annual > self.max_deposit:
-            return None, f"Required annual deposit ₹{required_annual:.0f} exceeds limit of ₹{self.max_deposit}"
+        if required_annual > terms.max_deposit:
+            return None, f"Required annual deposit ₹{required_annual:.0f} exceeds limit of ₹{terms.max_deposit}"
         
         return {
             'required_monthly': required_monthly,
             'required_annual': required_annual,
             'target_amount': target_amount,
             'years': years,
-            'total_investment': required_annual * years
+            'total_investment': required_annual * years,
+            'rate_version': terms.rate_version
         }, None
     
-    def calculate_tax_benefits(self, annual_deposit):
-        """Calculate tax benefits under Section 80C"""
-        eligible_amount = min(annual_deposit, self.tax_exemption_limit)
+    def calculate_tax_benefits(self, annual_deposit, annual_income=None, age=30,
+                               financial_year=DEFAULT_FINANCIAL_YEAR):
+        """Calculate tax benefits under Section 80C (old regime only)"""
+        terms = self.terms
+        eligible_amount = min(annual_deposit, terms.tax_exemption_limit)
+        engine = IncomeTaxEngine(financial_year)
         
-        # Tax savings for different tax brackets
+        # Tax savings for each old-regime slab, including cess
         tax_brackets = {
-            '5%': eligible_amount * 0.05,
-            '20%': eligible_amount * 0.20,
-            '30%': eligible_amount * 0.30
+            f"{rate:g}%": eligible_amount * rate / 100 * (1 + CESS_RATE / 100)
+            for rate in engine.slab_rates(OLD_REGIME)
         }
         
-        return {
+        result = {
             'eligible_amount': eligible_amount,
             'tax_savings': tax_brackets,
-            'max_benefit': tax_brackets['30%']
+            'max_benefit': max(tax_brackets.values()),
+            'rate_version': terms.rate_version
         }
+        if annual_income is not None:
+            # Actual saving for this income, across slab boundaries
+            result['max_benefit'] = float(engine.deduction_saving(annual_income, eligible_amount, age)[0])
+        return result
     
-    def calculate_extension_benefits(self, maturity_amount, extension_years=5):
+    def calculate_extension_benefits(self, maturity_amount, extension_years=5, interest_rate=None, start_date=None):
         """Calculate benefits of PPF extension"""
+        terms = self.terms
+        if interest_rate is None:
+            interest_rate = terms.current_rate
+        
         # After 15 years, can extend in blocks of 5 years
         # Can withdraw partial amount or continue without deposits
         
         # Option 1: Continue with deposits
-        additional_deposits = self.max_deposit * extension_years
-        r = self.current_rate / 100
+        additional_deposits = terms.max_deposit * extension_years
+        growth = growth_factor(interest_rate, extension_years, start_date, kernel=self.kernel)
         
         # Existing amount grows
-        existing_growth = maturity_amount * ((1 + r) ** extension_years)
+        existing_growth = maturity_amount * growth
         
         # New deposits compound
-        new_deposits_value = 0
-        for year in range(extension_years):
-            deposit_value = self.max_deposit * ((1 + r) ** (extension_years - year))
-            new_deposits_value += deposit_value
+        new_deposits_value = terms.max_deposit * annuity_factor(
+            interest_rate, extension_years, start_date=start_date, kernel=self.kernel
+        )
         
         total_after_extension = existing_growth + new_deposits_value
         
         # Option 2: No new deposits, just growth
-        growth_only = maturity_amount * ((1 + r) ** extension_years)
+        growth_only = maturity_amount * growth
         
         return {
             'with_deposits': {
@@ -123,82 +255,499 @@ class PPFCalculator:
                 'final_amount': growth_only,
                 'growth': growth_only - maturity_amount
             },
-            'extension_years': extension_years
+            'extension_years': extension_years,
+            'rate_version': terms.rate_version
         }
     
-    def compare_with_alternatives(self, annual_deposit, years=15):
+    def compare_with_alternatives(self, annual_deposit, years=15, interest_rate=None, start_date=None):
         """Compare PPF with other investment options"""
+        terms = self.terms
+        if interest_rate is None:
+            interest_rate = terms.current_rate
         
         # PPF calculation
-        ppf_result, _ = self.calculate_ppf_maturity(annual_deposit, years)
+        ppf_result, _ = self._ppf_maturity(terms, annual_deposit, years, interest_rate, start_date)
         
-        # FD at 6.5%
-        fd_rate = 6.5 / 100
+        # FD, ELSS (tax saving mutual fund) and NSC at their configured rates
+        fd_rate = terms.alternative_rates['Fixed_Deposit'] / 100
         fd_maturity = annual_deposit * (((1 + fd_rate) ** years - 1) / fd_rate) * (1 + fd_rate)
         
-        # ELSS (tax saving mutual fund) at 12%
-        elss_rate = 12 / 100
+        elss_rate = terms.alternative_rates['ELSS'] / 100
         elss_maturity = annual_deposit * (((1 + elss_rate) ** years - 1) / elss_rate) * (1 + elss_rate)
         
-        # NSC at 6.8%
-        nsc_rate = 6.8 / 100
+        nsc_rate = terms.alternative_rates['NSC'] / 100
         nsc_maturity = annual_deposit * (((1 + nsc_rate) ** years - 1) / nsc_rate) * (1 + nsc_rate)
         
+        # XIRR of each option: yearly deposits at the start of each year
+        maturities = [ppf_result['maturity_amount'], fd_maturity, elss_maturity, nsc_maturity]
+        times = np.arange(years + 1, dtype=np.float64)
+        flows = np.full((len(maturities), years + 1), -float(annual_deposit))
+        flows[:, -1] = maturities
+        xirr = XirrEngine().solve(np.broadcast_to(times, flows.shape), flows)['xirr'].tolist()
+        
         return {
             'PPF': {
                 'maturity': ppf_result['maturity_amount'],
                 'tax_free': True,
-                'lock_in': '15 years',
-                'rate': f"{self.current_rate}%"
+                'lock_in': f'{terms.lock_period} years',
+                'rate': f"{rate_at(interest_rate, start_date)}%",
+                'rate_version': terms.rate_version,
+                'xirr': xirr[0]
             },
             'Fixed_Deposit': {
                 'maturity': fd_maturity,
                 'tax_free': False,
                 'lock_in': 'Flexible',
-                'rate': '6.5%'
+                'rate': f"{terms.alternative_rates['Fixed_Deposit']:g}%",
+                'rate_version': terms.rate_version,
+                'xirr': xirr[1]
             },
             'ELSS': {
                 'maturity': elss_maturity,
                 'tax_free': False,
                 'lock_in': '3 years',
-                'rate': '12% (assumed)'
+                'rate': f"{terms.alternative_rates['ELSS']:g}% (assumed)",
+                'rate_version': terms.rate_version,
+                'xirr': xirr[2]
             },
             'NSC': {
                 'maturity': nsc_maturity,
                 'tax_free': False,
                 'lock_in': '5 years',
-                'rate': '6.8%'
+                'rate': f"{terms.alternative_rates['NSC']:g}%",
+                'rate_version': terms.rate_version,
+                'xirr': xirr[3]
             }
         }
     
-    def calculate_loan_against_ppf(self, ppf_balance, loan_percentage=25):
+    def calculate_loan_against_ppf(self, ppf_balance=None, loan_percentage=25, ppf_rate=None, loan_date=None,
+                                   account=None, year=None):
         """Calculate loan eligibility against PPF"""
+        terms = self.terms
+        if ppf_rate is None:
+            ppf_rate = terms.current_rate
+        
         # Can take loan from 3rd year onwards
         # Maximum 25% of balance at end of 2nd preceding year
         
-        max_loan = ppf_balance * (loan_percentage / 100)
-        interest_rate = self.current_rate + 1  # PPF rate + 1%
+        if account is not None:
+            if year is None:
+                raise ValueError("Loan year is required when an account is given")
+            max_loan = account.max_loan(year)
+        else:
+            max_loan = ppf_balance * (loan_percentage / 100)
+        interest_rate = rate_at(ppf_rate, loan_date) + 1  # PPF rate + 1%
         
         return {
             'max_loan_amount': max_loan,
             'interest_rate': interest_rate,
             'repayment_period': '36 months maximum',
-            'eligibility': 'From 3rd financial year'
+            'eligibility': 'From 3rd financial year',
+            'rate_version': terms.rate_version
         }
     
-    def calculate_partial_withdrawal(self, ppf_balance, withdrawal_percentage=50):
+    def calculate_partial_withdrawal(self, ppf_balance=None, withdrawal_percentage=50, account=None, year=None):
         """Calculate partial withdrawal after 7th year"""
         # Can withdraw up to 50% from 7th year onwards
+        # Of the lower of the balances 4 years back and last year
         
-        max_withdrawal = ppf_balance * (withdrawal_percentage / 100)
+        if account is not None:
+            if year is None:
+                raise ValueError("Withdrawal year is required when an account is given")
+            max_withdrawal = account.max_withdrawal(year)
+        else:
+            max_withdrawal = ppf_balance * (withdrawal_percentage / 100)
         
         return {
             'max_withdrawal': max_withdrawal,
             'eligibility': 'From 7th financial year',
             'frequency': 'Once per financial year',
-            'tax_implication': 'Tax-free'
+            'tax_implication': 'Tax-free',
+            'rate_version': self.rate_version
         }
 
+    def iter_monthly_ledger(self, deposits, opening_date, years=15, interest_rate=None):
+        """Yield month-by-month PPF balances for a dated deposit stream
+        
+        `deposits` is an iterable of (date, amount) pairs in date order and is
+        consumed lazily; negative amounts are withdrawals. Interest is earned
+        on the lowest balance between the 5th and the end of each month and
+        credited on 31st March. The ledger runs until the end of the
+        `years`-th financial year after the year of opening. A RateTimeline
+        applies the rate in force in each month.
+        """
+        if interest_rate is None:
+            interest_rate = self.current_rate
+        
+        monthly_rate = rate_at(interest_rate, opening_date) / 100 / 12
+        deposits = iter(deposits)
+        pending = next(deposits, None)
+        
+        # Financial year runs April to March, named by the year it ends in
+        year, month = opening_date.year, opening_date.month
+        fy = year + 1 if month >= 4 else year
+        maturity_fy = fy + years
+        
+        balance = 0.0
+        interest_due = 0.0
+        
+        while fy <= maturity_fy:
+            month_deposits = 0.0
+            if isinstance(interest_rate, RateTimeline):
+                monthly_rate = interest_rate.rate_at(date(year, month, 1)) / 100 / 12
+            
+            # Deposits on or before the cut-off day count for the whole month
+            while pending is not None and (pending[0].year, pending[0].month) < (year, month):
+                balance += pending[1]
+                month_deposits += pending[1]
+                pending = next(deposits, None)
+            while (pending is not None and (pending[0].year, pending[0].month) == (year, month)
+                   and pending[0].day <= LEDGER_CUTOFF_DAY):
+                balance += pending[1]
+                month_deposits += pending[1]
+                pending = next(deposits, None)
+            
+            # Later transactions in the month can only lower the minimum
+            min_balance = balance
+            while pending is not None and (pending[0].year, pending[0].month) == (year, month):
+                balance += pending[1]
+                month_deposits += pending[1]
+                min_balance = min(min_balance, balance)
+                pending = next(deposits, None)
+            
+            interest_accrued = max(min_balance, 0.0) * monthly_rate
+            interest_due += interest_accrued
+            
+            interest_credited = 0.0
+            if month == 3:
+                interest_credited = interest_due
+                balance += interest_credited
+                interest_due = 0.0
+            
+            yield {
+                'year': year,
+                'month': month,
+                'financial_year': fy,
+                'deposits': month_deposits,
+                'min_balance': min_balance,
+                'interest_accrued': interest_accrued,
+                'interest_credited': interest_credited,
+                'balance': balance
+            }
+            
+            if month == 3:
+                fy += 1
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+    
+    def run_ledger_bulk(self, early_deposits, late_deposits=None, interest_rate=None, first_year=None):
+        """Run the monthly ledger for many accounts on (accounts, months) arrays
+        
+        Column 0 is April of the first financial year. `early_deposits` holds
+        the net amount paid on or before the 5th of each month and
+        `late_deposits` the net amount paid after it. Only year-end balances
+        and credited interest are kept, as (accounts, financial years) arrays.
+        With a RateTimeline, `first_year` is the calendar year of that April.
+        """
+        if interest_rate is None:
+            interest_rate = self.current_rate
+        
+        # float32 inputs are used as-is to keep bulk runs compact
+        early = np.asarray(early_deposits)
+        if early.dtype.kind != 'f':
+            early = early.astype(np.float64)
+        if early.ndim == 1:
+            early = early[np.newaxis, :]
+        late = None
+        if late_deposits is not None:
+            late = np.broadcast_to(np.asarray(late_deposits), early.shape)
+        
+        accounts, months = early.shape
+        if isinstance(interest_rate, RateTimeline):
+            monthly_rates = [
+                interest_rate.rate_at(date(first_year + (m + 3) // 12, (m + 3) % 12 + 1, 1)) / 100 / 12
+                for m in range(months)
+            ]
+        else:
+            # Interest may be a per-account array as well as a scalar
+            monthly_rates = [np.asarray(interest_rate, dtype=np.float64) / 100 / 12] * months
+        fy_count = -(-months // 12)
+        
+        balance = np.zeros(accounts)
+        interest_due = np.zeros(accounts)
+        year_end_balances = np.empty((accounts, fy_count))
+        yearly_interest = np.empty((accounts, fy_count))
+        
+        # One vectorized step per month across all accounts
+        for m in range(months):
+            balance += early[:, m]
+            min_balance = balance
+            if late is not None:
+                balance = balance + late[:, m]
+                min_balance = np.minimum(min_balance, balance)
+            interest_due += np.maximum(min_balance, 0.0) * monthly_rates[m]
+            
+            if m % 12 == 11 or m == months - 1:
+                fy_index = m // 12
+                balance = balance + interest_due
+                yearly_interest[:, fy_index] = interest_due
+                year_end_balances[:, fy_index] = balance
+                interest_due[:] = 0.0
+        
+        return {
+            'year_end_balances': year_end_balances,
+            'yearly_interest': yearly_interest
+        }
+
+class PPFExtensionOptimizer:
+    """Dynamic-programming search over 5-year PPF extension blocks
+    
+    Each block either continues contributions (any level in `deposit_levels`,
+    withdrawals capped at 60% of the balance at the start of the block) or
+    runs without contributions (one withdrawal of any size per year). The
+    value of every balance is solved backwards block by block on a
+    log-spaced balance grid, so the search grows linearly with the number
+    of blocks rather than exponentially.
+    """
+    
+    block_years = 5
+    withdrawal_limit = 0.60  # Of the opening balance, for contributing blocks
+    max_transitions = 8      # Grid transitions kept, least recently used dropped first
+    
+    def __init__(self, calculator=None, deposit_levels=None, grid_points=1000, max_balance=1e10):
+        self.calculator = calculator or PPFCalculator()
+        if deposit_levels is None:
+            deposit_levels = [0, self.calculator.min_deposit] + list(
+                range(10000, self.calculator.max_deposit + 1, 10000)
+            )
+        self.deposit_levels = np.array(sorted(set(deposit_levels)), dtype=np.float64)
+        self.grid = np.concatenate(([0.0], np.geomspace(100.0, max_balance, grid_points)))
+        self._log_grid = np.log1p(self.grid)
+        self._transitions = OrderedDict()  # Grid transitions per (growth, withdrawal), LRU-bounded
+    
+    def plan_for_target(self, maturity_amount, target_amount, max_years=50, interest_rate=None):
+        """Cheapest sequence of blocks that grows the corpus to a target"""
+        blocks = (max_years - self.calculator.lock_period) // self.block_years
+        
+        def terminal(balance):
+            return np.where(balance >= target_amount, 0.0, _INFEASIBLE)
+        
+        def settled(balance):
+            return balance >= target_amount
+        
+        return self._solve(maturity_amount, blocks, 0.0, terminal, settled, interest_rate,
+                           f"Target ₹{target_amount:,.0f} cannot be reached within {max_years} years")
+    
+    def plan_for_cash_flow(self, maturity_amount, annual_need, years=20, interest_rate=None):
+        """Cheapest sequence of blocks that funds a yearly withdrawal
+        
+        Among plans with equal deposits, the one leaving the larger final
+        balance wins.
+        """
+        blocks = -(-years // self.block_years)
+        
+        def terminal(balance):
+            return -balance * 1e-6
+        
+        return self._solve(maturity_amount, blocks, annual_need, terminal, None, interest_rate,
+                           f"Withdrawals of ₹{annual_need:,.0f} a year cannot be sustained for {years} years")
+    
+    def _solve(self, balance, blocks, withdrawal, terminal, settled, interest_rate, error):
+        terms = self.calculator.terms
+        if interest_rate is None:
+            interest_rate = terms.current_rate
+        if blocks < 1:
+            return None, "Extension needs at least one 5-year block"
+        
+        g = 1 + rate_at(interest_rate) / 100
+        growth = np.array([g ** t for t in range(self.block_years + 1)])
+        accumulated = np.concatenate(([0.0], np.cumsum(growth[1:])))
+        
+        # Backward induction: values[k] is the cost-to-go at the start of block k.
+        # The grid transition is the same for every block, so it is built once.
+        transition = self._transition(g, withdrawal, growth, accumulated)
+        values = [None] * (blocks + 1)
+        values[blocks] = terminal(self.grid)
+        for k in range(blocks - 1, -1, -1):
+            best = self._block_costs(transition, values[k + 1]).min(axis=1)
+            if settled is not None:
+                best[settled(self.grid)] = 0.0
+            values[k] = best
+        
+        # Forward pass on the exact balance, reading continuation values
+        plan = []
+        total_deposits = 0.0
+        total_withdrawals = 0.0
+        start_year = terms.lock_period
+        for k in range(blocks):
+            if settled is not None and settled(balance):
+                break
+            step = self._build_transition(np.array([float(balance)]), withdrawal, growth, accumulated)
+            cost = self._block_costs(step, values[k + 1])[0]
+            choice = int(np.argmin(cost))
+            if cost[choice] >= _INFEASIBLE / 2:
+                return None, error
+            
+            deposit = float(self.deposit_levels[choice])
+            closing = float(balance * growth[-1] + (deposit - withdrawal) * accumulated[-1])
+            plan.append({
+                'block': k + 1,
+                'start_year': start_year,
+                'end_year': start_year + self.block_years,
+                'with_contribution': deposit > 0,
+                'annual_deposit': deposit,
+                'annual_withdrawal': withdrawal,
+                'opening_balance': balance,
+                'closing_balance': closing
+            })
+            total_deposits += deposit * self.block_years
+            total_withdrawals += withdrawal * self.block_years
+            balance = closing
+            start_year += self.block_years
+        
+        goal_met = settled(balance) if settled is not None else len(plan) == blocks
+        if not goal_met:
+            return None, error
+        
+        return {
+            'plan': plan,
+            'final_balance': float(balance),
+            'total_deposits': total_deposits,
+            'total_withdrawals': total_withdrawals,
+            'years': start_year
+        }, None
+    
+    def _transition(self, g, withdrawal, growth, accumulated):
+        key = (g, withdrawal)
+        transition = self._transitions.get(key)
+        if transition is not None:
+            self._transitions.move_to_end(key)
+            return transition
+        transition = self._build_transition(self.grid, withdrawal, growth, accumulated)
+        self._transitions[key] = transition
+        if len(self._transitions) > self.max_transitions:
+            self._transitions.popitem(last=False)
+        return transition
+    
+    def _build_transition(self, balances, withdrawal, growth, accumulated):
+        """Grid positions and fixed cost of every (balance, deposit level) pair"""
+        opening = balances[:, np.newaxis]
+        net = self.deposit_levels[np.newaxis, :] - withdrawal
+        
+        # Balance after each year's flows must stay non-negative
+        feasible = np.ones((len(balances), len(self.deposit_levels)), dtype=bool)
+        for t in range(self.block_years):
+            feasible &= opening * growth[t] + net * accumulated[t] + net >= -1e-6
+        
+        # Contributing blocks cap total withdrawals at 60% of the opening balance
+        if withdrawal > 0:
+            capped = withdrawal * self.block_years > self.withdrawal_limit * opening
+            feasible &= ~(capped & (self.deposit_levels[np.newaxis, :] > 0))
+        
+        # Linear interpolation weights on the log-spaced grid
+        closing = np.log1p(np.maximum(opening * growth[-1] + net * accumulated[-1], 0.0))
+        index = np.clip(np.searchsorted(self._log_grid, closing) - 1, 0, len(self.grid) - 2)
+        weight = (closing - self._log_grid[index]) / (self._log_grid[index + 1] - self._log_grid[index])
+        np.clip(weight, 0.0, 1.0, out=weight)
+        
+        # Tiny per-block charge prefers shorter plans when deposits tie
+        fixed_cost = np.broadcast_to(self.deposit_levels * self.block_years + 1e-3, feasible.shape).copy()
+        fixed_cost[~feasible] = _INFEASIBLE
+        return index, weight, fixed_cost
+    
+    def _block_costs(self, transition, next_values):
+        index, weight, fixed_cost = transition
+        continuation = next_values[index] * (1 - weight) + next_values[index + 1] * weight
+        return np.minimum(fixed_cost + continuation, _INFEASIBLE)
+
+class PPFAccountIndex:
+    """Year-end balances of many PPF accounts for eligibility lookups
+    
+    Column k holds the balance at the end of financial year k + 1, counting
+    the year of opening as year 1 (the layout returned by run_ledger_bulk).
+    """
+    
+    loan_first_year = 3
+    loan_last_year = 6
+    loan_percentage = 25
+    withdrawal_first_year = 7
+    withdrawal_percentage = 50
+    
+    def __init__(self, year_end_balances):
+        balances = np.asarray(year_end_balances, dtype=np.float64)
+        if balances.ndim == 1:
+            balances = balances[np.newaxis, :]
+        self.year_end_balances = balances
+    
+    @classmethod
+    def from_deposits(cls, annual_deposits, interest_rate):
+        """Build the index from (accounts, years) deposits made at the start of each year"""
+        deposits = np.atleast_2d(np.asarray(annual_deposits, dtype=np.float64))
+        g = 1 + rate_at(interest_rate) / 100
+        
+        # balance_k = sum(d_j * g^(k-j+1)) = g^k * cumsum(d_j * g^(1-j))
+        powers = g ** np.arange(1, deposits.shape[1] + 1)
+        return cls(np.cumsum(deposits / powers * g, axis=1) * powers)
+    
+    def balances_at(self, years):
+        """Balance at the end of a given year per account (0 before opening, NaN if not yet known)"""
+        years = np.broadcast_to(np.asarray(years, dtype=np.int64), (len(self.year_end_balances),))
+        known = self.year_end_balances.shape[1]
+        column = np.clip(years - 1, 0, known - 1)
+        balances = self.year_end_balances[np.arange(len(years)), column]
+        balances = np.where(years < 1, 0.0, balances)
+        return np.where(years > known, np.nan, balances)
+    
+    def loan_limits(self, years):
+        """Maximum loan in the given year: 25% of the balance two years earlier"""
+        years = np.broadcast_to(np.asarray(years, dtype=np.int64), (len(self.year_end_balances),))
+        eligible = (years >= self.loan_first_year) & (years <= self.loan_last_year)
+        reference = self.balances_at(years - 2)
+        eligible &= ~np.isnan(reference)
+        return np.where(eligible, reference * self.loan_percentage / 100, 0.0), eligible
+    
+    def withdrawal_limits(self, years):
+        """Maximum withdrawal in the given year: 50% of the lower of the balances
+        at the end of the fourth preceding and the preceding year"""
+        years = np.broadcast_to(np.asarray(years, dtype=np.int64), (len(self.year_end_balances),))
+        reference = np.minimum(self.balances_at(years - 4), self.balances_at(years - 1))
+        eligible = (years >= self.withdrawal_first_year) & ~np.isnan(reference)
+        return np.where(eligible, reference * self.withdrawal_percentage / 100, 0.0), eligible
+
+
+class PPFAccount:
+    """Single PPF account answering loan and withdrawal eligibility by lookup"""
+    
+    def __init__(self, year_end_balances):
+        self.index = PPFAccountIndex(year_end_balances)
+    
+    @classmethod
+    def from_deposits(cls, annual_deposits, interest_rate):
+        """Build an account from deposits made at the start of each year"""
+        account = cls([])
+        account.index = PPFAccountIndex.from_deposits(annual_deposits, interest_rate)
+        return account
+    
+    @classmethod
+    def from_ledger(cls, ledger_rows):
+        """Build an account from PPFCalculator.iter_monthly_ledger rows"""
+        return cls([row['balance'] for row in ledger_rows if row['month'] == 3])
+    
+    def balance_at(self, year):
+        """Balance at the end of a given year of the account"""
+        return float(self.index.balances_at(year)[0])
+    
+    def max_loan(self, year):
+        """Maximum loan in the given year (0 when not eligible)"""
+        limits, _ = self.index.loan_limits(year)
+        return float(limits[0])
+    
+    def max_withdrawal(self, year):
+        """Maximum partial withdrawal in the given year (0 when not eligible)"""
+        limits, _ = self.index.withdrawal_limits(year)
+        return float(limits[0])
+
 # Demo functions
 def demo_ppf_calculations():
     """Demo PPF calculator functionality"""
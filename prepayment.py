@@ -0,0 +1,164 @@
+"""
+Prepayment Module
+Loan simulator with lump-sum and recurring part-payments, recomputed incrementally
+"""
+
+from calculations import calculate_emi
+
+REDUCE_TENURE = 'reduce_tenure'  # keep the EMI, close the loan earlier
+REDUCE_EMI = 'reduce_emi'        # keep the tenure, lower the EMI after each prepayment
+
+# Balances below this are treated as repaid
+_CLOSED = 1e-6
+
+
+class LoanPrepaymentSimulator:
+    """What-if schedules for one loan under edited prepayments
+
+    Month k (1-based) pays the EMI in force and then any prepayment due in
+    that month. The balance and EMI after every month are kept as
+    checkpoints; an edit only marks the months from its first affected
+    month as stale, and the next query recomputes that suffix alone.
+    """
+
+    def __init__(self, principal, annual_rate, months, mode=REDUCE_TENURE):
+        if mode not in (REDUCE_TENURE, REDUCE_EMI):
+            raise ValueError(f"Unknown prepayment mode: {mode}")
+        base = calculate_emi(principal, annual_rate, months)
+        self.principal = principal
+        self.annual_rate = annual_rate
+        self.months = int(months)
+        self.mode = mode
+        self.base = base
+        self._r = annual_rate / 100 / 12
+
+        # Index k holds the state after month k; index 0 is the opening state
+        size = self.months + 1
+        self._extra = [0.0] * size        # prepayment scheduled for month k
+        self._balance = [float(principal)] + [0.0] * self.months
+        self._emi = [base.emi] * size     # EMI in force after month k
+        self._interest = [0.0] * size
+        self._payment = [0.0] * size
+        self._prepaid = [0.0] * size
+        self._valid = 0                   # months 1.._valid are up to date
+
+        self._prepayments = {}
+        self._next_id = 1
+
+    # Editing
+    def add_lump_sum(self, month, amount):
+        """Prepay `amount` after the EMI of `month`; returns the prepayment id"""
+        return self._add([month], amount)
+
+    def add_recurring(self, amount, start_month, every=12, end_month=None):
+        """Prepay `amount` every `every` months from `start_month`; returns the id"""
+        if every < 1:
+            raise ValueError("Recurring prepayments need a positive interval")
+        end_month = self.months if end_month is None else min(end_month, self.months)
+        return self._add(list(range(start_month, end_month + 1, every)), amount)
+
+    def edit_prepayment(self, prepayment_id, amount=None, month=None):
+        """Change the amount (and, for a lump sum, the month) of a prepayment"""
+        months, old_amount = self._prepayments[prepayment_id]
+        if month is not None:
+            if len(months) != 1:
+                raise ValueError("Only lump-sum prepayments can be moved")
+            new_months = [month]
+        else:
+            new_months = months
+        self._check_months(new_months)
+        self._apply(months, -old_amount)
+        amount = old_amount if amount is None else amount
+        self._apply(new_months, amount)
+        self._prepayments[prepayment_id] = (new_months, amount)
+
+    def remove_prepayment(self, prepayment_id):
+        months, amount = self._prepayments.pop(prepayment_id)
+        self._apply(months, -amount)
+
+    def set_mode(self, mode):
+        if mode not in (REDUCE_TENURE, REDUCE_EMI):
+            raise ValueError(f"Unknown prepayment mode: {mode}")
+        if mode != self.mode:
+            self.mode = mode
+            # The mode first matters for the EMI set after the first prepayment
+            first = next((k for k in range(1, self.months + 1) if self._extra[k]), None)
+            if first is not None:
+                self._invalidate(first)
+
+    def _add(self, months, amount):
+        self._check_months(months)
+        prepayment_id = self._next_id
+        self._next_id += 1
+        self._prepayments[prepayment_id] = (months, amount)
+        self._apply(months, amount)
+        return prepayment_id
+
+    def _check_months(self, months):
+        if not months or months[0] < 1 or months[-1] > self.months:
+            raise ValueError(f"Prepayment months must fall within 1..{self.months}")
+
+    def _apply(self, months, amount):
+        for month in months:
+            self._extra[month] += amount
+        self._invalidate(months[0])
+
+    def _invalidate(self, month):
+        self._valid = min(self._valid, month - 1)
+
+    # Evaluation
+    def _update(self):
+        """Recompute the stale suffix from the last valid checkpoint"""
+        r, months, reduce_emi = self._r, self.months, self.mode == REDUCE_EMI
+        balance, emi = self._balance[self._valid], self._emi[self._valid]
+        for k in range(self._valid + 1, months + 1):
+            interest = payment = prepaid = 0.0
+            if balance > _CLOSED:
+                interest = balance * r
+                payment = balance + interest if k == months else min(emi, balance + interest)
+                balance += interest - payment
+                prepaid = min(self._extra[k], balance)
+                balance -= prepaid
+                if balance <= _CLOSED:
+                    balance = 0.0
+                elif reduce_emi and prepaid and k < months:
+                    emi = calculate_emi(balance, self.annual_rate, months - k).emi
+            else:
+                balance = 0.0
+            self._interest[k], self._payment[k], self._prepaid[k] = interest, payment, prepaid
+            self._balance[k], self._emi[k] = balance, emi
+        self._valid = months
+
+    def schedule(self):
+        """Monthly rows up to the month the loan closes"""
+        self._update()
+        rows = []
+        for k in range(1, self.months + 1):
+            rows.append({
+                'month': k,
+                'payment': self._payment[k],
+                'interest': self._interest[k],
+                'principal': self._payment[k] - self._interest[k],
+                'prepayment': self._prepaid[k],
+                'balance': self._balance[k],
+                'emi': self._emi[k]
+            })
+            if self._balance[k] == 0:
+                break
+        return rows
+
+    def summary(self):
+        """Totals of the current plan against the loan without prepayments"""
+        self._update()
+        closed = next((k for k in range(1, self.months + 1) if self._balance[k] == 0), self.months)
+        total_interest = sum(self._interest[1:closed + 1])
+        return {
+            'emi': self.base.emi,
+            'final_emi': self._emi[closed - 1],
+            'months': closed,
+            'months_saved': self.months - closed,
+            'total_interest': total_interest,
+            'total_prepaid': sum(self._prepaid[1:closed + 1]),
+            'interest_saved': self.base.total_interest - total_interest,
+            'mode': self.mode
+        }
@@ -3,58 +3,111 @@ Public Funds Calculator Module
 Comprehensive calculator for various government schemes and public funds
 """
 
+import copy
 import math
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from growth_kernel import default_kernel
+from paise_backend import BULK_BACKEND
+from rate_config import default_config, pinned_attribute
+from rate_timeline import annuity_factor, rate_at
+from rd_engine import rd_maturity_factor
+from scheme_registry import default_registry
+from tax_engine import IncomeTaxEngine, NEW_REGIME, DEFAULT_FINANCIAL_YEAR
+
+# Bit of each scheme in the eligibility mask; existing holdings use the same bits
+SCHEME_BITS = {
+    'PPF': 1,
+    'NSC': 2,
+    'Sukanya_Samriddhi': 4,
+    'SCSS': 8,
+    'KVP': 16
+}
+
+ELIGIBILITY_CONDITIONS = {
+    'PPF': 'Open to all Indian residents',
+    'NSC': 'Open to all Indian residents',
+    'Sukanya_Samriddhi': 'For girl child up to 10 years',
+    'SCSS': 'For senior citizens (60+ years)',
+    'KVP': 'Open to all Indian residents'
+}
+
+SSY_MAX_AGE = 10  # last completed age at which an SSY account can be opened
+SCSS_MIN_AGE = 60
+
+
+def eligibility_mask(age, female, resident=True, holdings=0):
+    """Bitmask of schemes each customer may open, from array-likes"""
+    age = np.asarray(age)
+    female = np.asarray(female, dtype=bool)
+    resident = np.asarray(resident, dtype=bool)
+    holdings = np.asarray(holdings, dtype=np.uint8)
+
+    # One PPF account per person and one SSY account per girl child
+    rules = {
+        'PPF': (holdings & SCHEME_BITS['PPF']) == 0,
+        'NSC': np.ones(age.shape, dtype=bool),
+        'Sukanya_Samriddhi': female & (age <= SSY_MAX_AGE) & ((holdings & SCHEME_BITS['Sukanya_Samriddhi']) == 0),
+        'SCSS': age >= SCSS_MIN_AGE,
+        'KVP': np.ones(age.shape, dtype=bool)
+    }
+    mask = np.zeros(np.broadcast(age, female, resident, holdings).shape, dtype=np.uint8)
+    for label, allowed in rules.items():
+        mask |= np.where(allowed & resident, SCHEME_BITS[label], 0).astype(np.uint8)
+    return mask
+
+
+class SchemeTerms:
+    """One rate snapshot with a calculator's private copies of its rates and limits
+    
+    rates and scheme_details are copies, so any entry may still be replaced
+    locally (e.g. by a RateTimeline); the registry is built from the copy.
+    """
+    
+    __slots__ = ('snapshot', 'rate_version', 'rates', 'scheme_details', 'registry')
+    
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.rate_version = snapshot.version
+        self.rates = snapshot.mutable_rates()
+        self.scheme_details = snapshot.mutable_scheme_details()
+        self.registry = default_registry(self.scheme_details)  # Schemes used by compare_all_schemes
+
+
 class PublicFundsCalculator:
     """Calculator for various public investment schemes"""
     
-    def __init__(self):
-        # Current rates (2024)
-        self.rates = {
-            'ppf': 7.1,
-            'nsc': 6.8,
-            'kisan_vikas_patra': 7.5,
-            'sukanya_samriddhi': 8.0,
-            'senior_citizen_savings': 8.2,
-            'post_office_td': 6.9,
-            'post_office_rd': 5.8,
-            'post_office_mis': 7.4
-        }
-        
-        # Scheme limits and features
-        self.scheme_details = {
-            'ppf': {
-                'min_deposit': 500,
-                'max_deposit': 150000,
-                'tenure': 15,
-                'tax_benefit': True,
-                'premature_withdrawal': False
-            },
-            'nsc': {
-                'min_deposit': 1000,
-                'max_deposit': None,
-                'tenure': 5,
-                'tax_benefit': True,
-                'premature_withdrawal': False
-            },
-            'sukanya_samriddhi': {
-                'min_deposit': 250,
-                'max_deposit': 150000,
-                'tenure': 21,
-                'tax_benefit': True,
-                'premature_withdrawal': True
-            }
-        }
+    # Rates and limits of the bound snapshot, read through one SchemeTerms
+    snapshot = pinned_attribute('terms', 'snapshot')
+    rate_version = pinned_attribute('terms', 'rate_version')
+    rates = pinned_attribute('terms', 'rates')
+    scheme_details = pinned_attribute('terms', 'scheme_details')
+    registry = pinned_attribute('terms', 'registry')
     
-    def calculate_ppf(self, annual_deposit, years=15):
+    def __init__(self, config=None):
+        self.config = config or default_config
+        self.kernel = default_kernel  # Shared growth-factor table
+        self.refresh()
+    
+    def refresh(self):
+        """Bind to the latest rate snapshot; returns True if the version changed
+        
+        The terms are swapped in one assignment and each method reads them
+        once, so a result never mixes two snapshots.
+        """
+        snapshot = self.config.current()
+        changed = getattr(self, 'terms', None) is None or self.terms.snapshot is not snapshot
+        self.terms = SchemeTerms(snapshot)
+        return changed
+    
+    def calculate_ppf(self, annual_deposit, years=15, start_date=None):
         """Calculate PPF maturity"""
-        rate = self.rates['ppf'] / 100
-        maturity = 0
-        
-        for year in range(years):
-            deposit_value = annual_deposit * ((1 + rate) ** (years - year))
-            maturity += deposit_value
+        terms = self.terms
+        maturity = annual_deposit * annuity_factor(
+            terms.rates['ppf'], years, start_date=start_date, kernel=self.kernel
+        )
         
         total_invested = annual_deposit * years
         interest = maturity - total_invested
@@ -64,15 +117,18 @@ class PublicFundsCalculator:
             'maturity_amount': maturity,
             'total_invested': total_invested,
             'interest_earned': interest,
-            'rate': self.rates['ppf'],
+            'rate': rate_at(terms.rates['ppf'], start_date),
+            'rate_version': terms.rate_version,
             'tax_free': True,
             'tenure': years
         }
     
-    def calculate_nsc(self, investment_amount, years=5):
+    def calculate_nsc(self, investment_amount, years=5, start_date=None):
         """Calculate NSC maturity"""
-        rate = self.rates['nsc'] / 100
-        maturity = investment_amount * ((1 + rate) ** years)
+        terms = self.terms
+        # Rate is fixed for the whole term at the time of purchase
+        rate = rate_at(terms.rates['nsc'], start_date)
+        maturity = investment_amount * self.kernel.growth_factor(rate, years)
         interest = maturity - investment_amount
         
         return {
@@ -80,23 +136,21 @@ class PublicFundsCalculator:
             'maturity_amount': maturity,
             'total_invested': investment_amount,
             'interest_earned': interest,
-            'rate': self.rates['nsc'],
+            'rate': rate,
+            'rate_version': terms.rate_version,
             'tax_free': False,
             'tenure': years
         }
     
-    def calculate_sukanya_samriddhi(self, annual_deposit, years=21):
+    def calculate_sukanya_samriddhi(self, annual_deposit, years=21, start_date=None):
         """Calculate Sukanya Samriddhi Yojana"""
-        rate = self.rates['sukanya_samriddhi'] / 100
-        
-        # Deposits for first 15 years only
+        terms = self.terms
+        # Deposits for first 15 years only, then the balance keeps compounding
         deposit_years = min(years, 15)
-        maturity = 0
-        
-        # Calculate deposits with compounding
-        for year in range(deposit_years):
-            deposit_value = annual_deposit * ((1 + rate) ** (years - year))
-            maturity += deposit_value
+        maturity = annual_deposit * annuity_factor(
+            terms.rates['sukanya_samriddhi'], deposit_years, years,
+            start_date=start_date, kernel=self.kernel
+        )
         
         total_invested = annual_deposit * deposit_years
         interest = maturity - total_invested
@@ -106,15 +160,18 @@ class PublicFundsCalculator:
             'maturity_amount': maturity,
             'total_invested': total_invested,
             'interest_earned': interest,
-            'rate': self.rates['sukanya_samriddhi'],
+            'rate': rate_at(terms.rates['sukanya_samriddhi'], start_date),
+            'rate_version': terms.rate_version,
             'tax_free': True,
             'tenure': years,
             'deposit_years': deposit_years
         }
     
-    def calculate_kisan_vikas_patra(self, investment_amount):
+    def calculate_kisan_vikas_patra(self, investment_amount, start_date=None):
         """Calculate Kisan Vikas Patra (doubles money)"""
-        rate = self.rates['kisan_vikas_patra'] / 100
+        terms = self.terms
+        annual_rate = rate_at(terms.rates['kisan_vikas_patra'], start_date)
+        rate = annual_rate / 100
         
         # Calculate time to double
         doubling_time = math.log(2) / math.log(1 + rate)
@@ -125,14 +182,17 @@ class PublicFundsCalculator:
             'maturity_amount': maturity_amount,
             'total_invested': investment_amount,
             'interest_earned': investment_amount,
-            'rate': self.rates['kisan_vikas_patra'],
+            'rate': annual_rate,
+            'rate_version': terms.rate_version,
             'doubling_time': doubling_time,
             'tax_free': False
         }
     
-    def calculate_senior_citizen_savings(self, investment_amount, years=5):
+    def calculate_senior_citizen_savings(self, investment_amount, years=5, start_date=None):
         """Calculate Senior Citizen Savings Scheme"""
-        rate = self.rates['senior_citizen_savings'] / 100
+        terms = self.terms
+        annual_rate = rate_at(terms.rates['senior_citizen_savings'], start_date)
+        rate = annual_rate / 100
         
         # Quarterly interest payout
         quarterly_rate = rate / 4
@@ -147,15 +207,17 @@ class PublicFundsCalculator:
             'interest_earned': total_interest,
             'quarterly_interest': quarterly_interest,
             'annual_interest': annual_interest,
-            'rate': self.rates['senior_citizen_savings'],
+            'rate': annual_rate,
+            'rate_version': terms.rate_version,
             'tax_free': False,
             'tenure': years
         }
     
-    def calculate_post_office_td(self, investment_amount, years=5):
+    def calculate_post_office_td(self, investment_amount, years=5, start_date=None):
         """Calculate Post Office Time Deposit"""
-        rate = self.rates['post_office_td'] / 100
-        maturity = investment_amount * ((1 + rate) ** years)
+        terms = self.terms
+        rate = rate_at(terms.rates['post_office_td'], start_date)
+        maturity = investment_amount * self.kernel.growth_factor(rate, years)
         interest = maturity - investment_amount
         
         return {
@@ -163,20 +225,20 @@ class PublicFundsCalculator:
             'maturity_amount': maturity,
             'total_invested': investment_amount,
             'interest_earned': interest,
-            'rate': self.rates['post_office_td'],
+            'rate': rate,
+            'rate_version': terms.rate_version,
             'tax_free': False,
             'tenure': years
         }
     
-    def calculate_post_office_rd(self, monthly_deposit, years=5):
+    def calculate_post_office_rd(self, monthly_deposit, years=5, start_date=None):
         """Calculate Post Office Recurring Deposit"""
-        rate = self.rates['post_office_rd'] / 100 / 12
+        terms = self.terms
+        annual_rate = rate_at(terms.rates['post_office_rd'], start_date)
         months = years * 12
         
-        if rate == 0:
-            maturity = monthly_deposit * months
-        else:
-            maturity = monthly_deposit * (((1 + rate) ** months - 1) / rate) * (1 + rate)
+        # Monthly installments, interest compounded quarterly
+        maturity = monthly_deposit * float(rd_maturity_factor(annual_rate, months))
         
         total_invested = monthly_deposit * months
         interest = maturity - total_invested
@@ -187,14 +249,17 @@ class PublicFundsCalculator:
             'total_invested': total_invested,
             'interest_earned': interest,
             'monthly_deposit': monthly_deposit,
-            'rate': self.rates['post_office_rd'],
+            'rate': annual_rate,
+            'rate_version': terms.rate_version,
             'tax_free': False,
             'tenure': years
         }
     
-    def calculate_post_office_mis(self, investment_amount):
+    def calculate_post_office_mis(self, investment_amount, start_date=None):
         """Calculate Post Office Monthly Income Scheme"""
-        rate = self.rates['post_office_mis'] / 100
+        terms = self.terms
+        annual_rate = rate_at(terms.rates['post_office_mis'], start_date)
+        rate = annual_rate / 100
         monthly_income = (investment_amount * rate) / 12
         annual_income = monthly_income * 12
         
@@ -203,39 +268,66 @@ class PublicFundsCalculator:
             'investment_amount': investment_amount,
             'monthly_income': monthly_income,
             'annual_income': annual_income,
-            'rate': self.rates['post_office_mis'],
+            'rate': annual_rate,
+            'rate_version': terms.rate_version,
             'tax_free': False,
             'tenure': 5
         }
     
-    def compare_all_schemes(self, investment_amount, years=5):
+    def compare_all_schemes(self, investment_amount, years=5, start_date=None):
         """Compare all public fund schemes"""
+        # A shallow copy keeps the current terms, so every scheme sees one snapshot
+        pinned = copy.copy(self)
         results = {}
         
-        # PPF (if tenure allows)
-        if years >= 15:
-            annual_ppf = investment_amount / years
-            if annual_ppf <= 150000:
-                results['PPF'] = self.calculate_ppf(annual_ppf, years)
+        for spec in pinned.registry:
+            if spec.eligible(investment_amount, years):
+                results[spec.label] = spec.calculate(pinned, investment_amount, years, start_date)
         
-        # NSC
-        results['NSC'] = self.calculate_nsc(investment_amount, min(years, 5))
-        
-        # KVP
-        results['KVP'] = self.calculate_kisan_vikas_patra(investment_amount)
-        
-        # Post Office TD
-        results['Post_Office_TD'] = self.calculate_post_office_td(investment_amount, years)
+        return results
+    
+    def compare_all_schemes_batch(self, investment_amounts, years=5, start_date=None, backend=BULK_BACKEND):
+        """Compare all schemes for many investors in one pass
+        
+        Each scheme uses the rate in force on start_date. Returns one dict of
+        arrays per scheme; rows where the scheme does not apply are NaN and
+        flagged False in 'eligible'. The default PAISE_BACKEND rounds deposits
+        to the paisa and every interest credit per scheme; FLOAT_BACKEND
+        gives the closed forms of compare_all_schemes.
+        """
+        terms = self.terms
+        amounts, years = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(investment_amounts, dtype=np.float64)),
+            np.asarray(years, dtype=np.int64)
+        )
+        results = {}
         
-        # SCSS (if applicable)
-        if years <= 5:
-            results['SCSS'] = self.calculate_senior_citizen_savings(investment_amount, years)
+        for spec in terms.registry:
+            eligible = spec.eligible(amounts, years)
+            if not eligible.any():
+                continue
+            rate = rate_at(terms.rates[spec.rate_key], start_date)
+            columns = spec.kernel(amounts, years, rate, backend)
+            for name, values in columns.items():
+                columns[name] = np.where(eligible, values, np.nan)
+            columns['rate'] = rate
+            columns['rate_version'] = terms.rate_version
+            columns['tax_free'] = spec.tax_free
+            columns['eligible'] = eligible
+            results[spec.label] = columns
         
         return results
     
-    def calculate_tax_implications(self, scheme_results):
-        """Calculate tax implications for different schemes"""
+    def calculate_tax_implications(self, scheme_results, annual_income=None, regime=NEW_REGIME, age=30,
+                                   financial_year=DEFAULT_FINANCIAL_YEAR):
+        """Calculate tax implications for different schemes
+        
+        Without an annual income the interest is taxed at a flat 30%.
+        Otherwise it is spread evenly over the tenure and taxed yearly at the
+        investor's slab rates, including surcharge, cess and 80TTB.
+        """
         tax_analysis = {}
+        engine = IncomeTaxEngine(financial_year) if annual_income is not None else None
         
         for scheme, result in scheme_results.items():
             if result.get('tax_free'):
@@ -245,9 +337,15 @@ class PublicFundsCalculator:
                     'net_return': result['maturity_amount']
                 }
             else:
-                # Assume 30% tax bracket
                 taxable_interest = result['interest_earned']
-                tax_amount = taxable_interest * 0.30
+                if engine is None:
+                    # Assume 30% tax bracket
+                    tax_amount = taxable_interest * 0.30
+                else:
+                    years = max(result.get('tenure') or result.get('doubling_time') or 1, 1)
+                    tax_amount = float(engine.tax_on_interest(
+                        annual_income, taxable_interest / years, regime, age
+                    )[0]) * years
                 net_return = result['maturity_amount'] - tax_amount
                 
                 tax_analysis[scheme] = {
@@ -259,41 +357,45 @@ class PublicFundsCalculator:
         
         return tax_analysis
     
-    def get_scheme_eligibility(self, age, gender=None, investment_amount=None):
-        """Check eligibility for different schemes"""
-        eligibility = {}
-        
-        # PPF - Universal
-        eligibility['PPF'] = {
-            'eligible': True,
-            'conditions': 'Open to all Indian residents'
-        }
-        
-        # NSC - Universal
-        eligibility['NSC'] = {
-            'eligible': True,
-            'conditions': 'Open to all Indian residents'
-        }
+    def calculate_tax_implications_batch(self, batch_results, annual_incomes, regime=NEW_REGIME, ages=30,
+                                         financial_year=DEFAULT_FINANCIAL_YEAR):
+        """Post-tax returns for compare_all_schemes_batch results, one row per investor"""
+        engine = IncomeTaxEngine(financial_year)
+        tax_analysis = {}
         
-        # Sukanya Samriddhi - Girl child
-        eligibility['Sukanya_Samriddhi'] = {
-            'eligible': gender == 'female' and age <= 10,
-            'conditions': 'For girl child below 10 years'
-        }
+        for scheme, columns in batch_results.items():
+            interest = columns['interest_earned']
+            if columns['tax_free']:
+                tax_amount = np.zeros(interest.shape)
+            else:
+                years = np.maximum(np.nan_to_num(columns['tenure'], nan=1.0), 1)
+                tax_amount = engine.tax_on_interest(
+                    annual_incomes, np.nan_to_num(interest) / years, regime, ages
+                ) * years
+                tax_amount = np.where(columns['eligible'], tax_amount, np.nan)
+            net_return = columns['maturity_amount'] - tax_amount
+            
+            tax_analysis[scheme] = {
+                'taxable_interest': np.zeros(interest.shape) if columns['tax_free'] else interest,
+                'tax_amount': tax_amount,
+                'net_return': net_return,
+                'effective_rate': (net_return - columns['total_invested']) / columns['total_invested'] * 100
+            }
         
-        # SCSS - Senior Citizens
-        eligibility['SCSS'] = {
-            'eligible': age >= 60,
-            'conditions': 'For senior citizens (60+ years)'
-        }
+        return tax_analysis
+    
+    def get_scheme_eligibility(self, age, gender=None, investment_amount=None):
+        """Check eligibility for different schemes"""
+        # Same rules the bulk EligibilityScreener applies to customer files
+        mask = int(eligibility_mask(age, str(gender).lower() in ('female', 'f'))[()])
         
-        # KVP - Universal
-        eligibility['KVP'] = {
-            'eligible': True,
-            'conditions': 'Open to all Indian residents'
+        return {
+            label: {
+                'eligible': bool(mask & bit),
+                'conditions': ELIGIBILITY_CONDITIONS[label]
+            }
+            for label, bit in SCHEME_BITS.items()
         }
-        
-        return eligibility
 
 # Demo function
 def demo_public_funds():
@@ -0,0 +1,200 @@
+"""
+Rate Configuration Module
+Versioned rate and limit snapshots, hot-reloaded from a JSON file
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+# Optional path of the JSON rate file used by default_config
+RATE_CONFIG_ENV = 'FINANCETOOLS_RATE_CONFIG'
+
+# Built-in values, used when no file is configured and as the base a file
+# overrides key by key. Each value lives in one place only: scheme rates
+# under 'rates', deposit limits and tenures under 'scheme_details'.
+DEFAULT_CONFIG = {
+    'version': 'builtin-2024',
+    'ppf': {
+        'tax_exemption_limit': 150000  # 80C limit
+    },
+    'rates': {
+        'ppf': 7.1,                  # Current PPF interest rate (2024)
+        'nsc': 6.8,
+        'kisan_vikas_patra': 7.5,
+        'sukanya_samriddhi': 8.0,
+        'senior_citizen_savings': 8.2,
+        'post_office_td': 6.9,
+        'post_office_rd': 5.8,
+        'post_office_mis': 7.4
+    },
+    # Assumed rates of the non-government options PPF is compared against
+    'alternative_rates': {
+        'Fixed_Deposit': 6.5,
+        'ELSS': 12.0
+    },
+    'scheme_details': {
+        'ppf': {
+            'min_deposit': 500,
+            'max_deposit': 150000,
+            'tenure': 15,            # Lock-in period in years
+            'tax_benefit': True,
+            'premature_withdrawal': False
+        },
+        'nsc': {
+            'min_deposit': 1000,
+            'max_deposit': None,
+            'tenure': 5,
+            'tax_benefit': True,
+            'premature_withdrawal': False
+        },
+        'sukanya_samriddhi': {
+            'min_deposit': 250,
+            'max_deposit': 150000,
+            'tenure': 21,
+            'tax_benefit': True,
+            'premature_withdrawal': True
+        },
+        'post_office_rd': {
+            'min_deposit': 100,      # Minimum monthly installment
+            'max_deposit': None,
+            'tenure': 5,
+            'tax_benefit': False,
+            'premature_withdrawal': True
+        }
+    }
+}
+
+# Keys that used to be duplicated, and where their single copy now lives
+_MOVED_KEYS = {
+    'current_rate': 'rates.ppf',
+    'min_deposit': 'scheme_details.ppf.min_deposit',
+    'max_deposit': 'scheme_details.ppf.max_deposit',
+    'lock_period': 'scheme_details.ppf.tenure'
+}
+
+
+def pinned_attribute(bundle, name):
+    """Read-only attribute forwarding to `name` on the instance's `bundle`
+
+    Calculators keep everything bound from one snapshot in a single bundle
+    that refresh() replaces in one assignment.
+    """
+    return property(lambda self: getattr(getattr(self, bundle), name))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _merge(base, override):
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class RateSnapshot:
+    """Immutable view of one version of the rates and limits"""
+
+    __slots__ = ('version', 'ppf', 'rates', 'alternative_rates', 'scheme_details', 'loaded_at')
+
+    def __init__(self, data, loaded_at=None):
+        if not data.get('version'):
+            raise ValueError("Rate configuration needs a version")
+        moved = sorted(set(data['ppf']) & set(_MOVED_KEYS))
+        if moved:
+            raise ValueError("Rate configuration keys moved: " +
+                             ", ".join(f"ppf.{key} -> {_MOVED_KEYS[key]}" for key in moved))
+        object.__setattr__(self, 'version', str(data['version']))
+        object.__setattr__(self, 'ppf', _freeze(data['ppf']))
+        object.__setattr__(self, 'rates', _freeze(data['rates']))
+        object.__setattr__(self, 'alternative_rates', _freeze(data['alternative_rates']))
+        object.__setattr__(self, 'scheme_details', _freeze(data['scheme_details']))
+        object.__setattr__(self, 'loaded_at', loaded_at or time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RateSnapshot is immutable")
+
+    def mutable_rates(self):
+        """Private copy of the scheme rates for a calculator to own"""
+        return _thaw(self.rates)
+
+    def mutable_scheme_details(self):
+        """Private copy of the scheme limits for a calculator to own"""
+        return _thaw(self.scheme_details)
+
+
+class RateConfig:
+    """Current rate snapshot, swapped copy-on-write when the file changes
+
+    Readers just take the current reference and never lock; a reload builds
+    a complete new snapshot before publishing it in one assignment. The
+    file is first read by current(), so a missing file leaves the built-in
+    snapshot in place instead of failing at import.
+    """
+
+    def __init__(self, path=None, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()  # serialises writers only
+        self._stamp = None
+        self._checked = None  # never checked, so the first current() loads the file
+        self._snapshot = RateSnapshot(DEFAULT_CONFIG)
+
+    def set_path(self, path):
+        """Point at a (new) rate file and load it"""
+        self.path = path
+        self._stamp = None
+        return self.reload()
+
+    def current(self):
+        """Latest snapshot, checking the file at most every check_interval seconds"""
+        if self.path and (self._checked is None or time.monotonic() - self._checked >= self.check_interval):
+            try:
+                self.reload()
+            except (OSError, ValueError, KeyError):
+                # A missing or half-written file keeps the last good snapshot
+                pass
+        return self._snapshot
+
+    def reload(self):
+        """Load the file if it changed; returns True when a new snapshot was published
+
+        Only a new version is published, so edits must bump the version.
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp == self._stamp:
+                return False
+            with open(self.path, encoding='utf-8') as source:
+                data = json.load(source)
+            snapshot = RateSnapshot(_merge(DEFAULT_CONFIG, data))
+            self._stamp = stamp
+            if snapshot.version == self._snapshot.version:
+                return False
+            self._snapshot = snapshot
+            return True
+
+
+default_config = RateConfig(os.environ.get(RATE_CONFIG_ENV))
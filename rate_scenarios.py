@@ -0,0 +1,261 @@
+"""
+Rate Scenario Module
+Monte Carlo rate paths for PPF, its alternatives and the public fund schemes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ppf_calculator import PPFCalculator
+from public_funds import PublicFundsCalculator
+from rate_timeline import rate_at
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Cash-flow shapes a scenario leg can take
+ANNUAL_DEPOSITS = 'annual'      # deposit at the start of each deposit year
+LUMP_FLOATING = 'lump'          # one deposit compounding at each year's rate
+LUMP_FIXED = 'lump_fixed'       # one deposit, rate locked at purchase
+SIMPLE_PAYOUT = 'simple_fixed'  # interest paid out, rate locked at purchase
+
+
+class MeanRevertingRateModel:
+    """Annual small-savings rate paths pulled back towards a long-run level"""
+
+    def __init__(self, initial, long_run=None, speed=0.15, volatility=0.5, floor=0.0):
+        self.initial = initial
+        self.long_run = initial if long_run is None else long_run
+        self.speed = speed
+        self.volatility = volatility
+        self.floor = floor
+
+    def sample(self, rng, paths, years):
+        """Return a (paths, years) array of annual rates in percent"""
+        rates = np.empty((paths, years))
+        current = np.full(paths, float(self.initial))
+        for year in range(years):
+            rates[:, year] = current
+            current = current + self.speed * (self.long_run - current) \
+                + self.volatility * rng.standard_normal(paths)
+            np.maximum(current, self.floor, out=current)
+        return rates
+
+
+class LognormalReturnModel:
+    """Independent lognormal annual returns, e.g. for an equity (ELSS) leg"""
+
+    def __init__(self, expected=12.0, volatility=18.0):
+        self.expected = expected
+        self.volatility = volatility
+
+    def sample(self, rng, paths, years):
+        """Return a (paths, years) array of annual returns in percent"""
+        mean_growth = 1 + self.expected / 100
+        sigma = np.sqrt(np.log1p((self.volatility / 100 / mean_growth) ** 2))
+        mu = np.log(mean_growth) - sigma ** 2 / 2
+        return np.expm1(mu + sigma * rng.standard_normal((paths, years))) * 100
+
+
+class ScenarioLeg:
+    """One investment evaluated along sampled rate paths"""
+
+    def __init__(self, model, amount, years, shape=ANNUAL_DEPOSITS, deposit_years=None):
+        self.model = model
+        self.amount = amount
+        self.years = years
+        self.shape = shape
+        self.deposit_years = years if deposit_years is None else deposit_years
+
+    def evaluate(self, rng, paths):
+        """Return the terminal value of each path"""
+        growth = 1 + self.model.sample(rng, paths, self.years) / 100
+
+        if self.shape == ANNUAL_DEPOSITS:
+            # tail[:, y] = growth from the start of year y to maturity
+            tail = np.cumprod(growth[:, ::-1], axis=1)[:, ::-1]
+            return self.amount * tail[:, :self.deposit_years].sum(axis=1)
+        if self.shape == LUMP_FLOATING:
+            return self.amount * growth.prod(axis=1)
+        if self.shape == LUMP_FIXED:
+            return self.amount * growth[:, 0] ** self.years
+        if self.shape == SIMPLE_PAYOUT:
+            return self.amount * (1 + (growth[:, 0] - 1) * self.years)
+        raise ValueError(f"Unknown cash-flow shape: {self.shape}")
+
+
+class StreamingPercentiles:
+    """Mergeable log-spaced histogram giving percentiles in bounded memory
+
+    Values outside [low, high) are kept exactly rather than clipped into
+    the edge bins, so tail percentiles stay unbiased when a chunk strays
+    beyond the range fixed up front; `summary` reports how many there were.
+    """
+
+    def __init__(self, low, high, bins=20000):
+        self.log_low = np.log(low)
+        self.log_step = (np.log(high) - self.log_low) / bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.below = np.empty(0)
+        self.above = np.empty(0)
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def update(self, values):
+        """Add a chunk of positive values"""
+        index = np.floor((np.log(values) - self.log_low) / self.log_step).astype(np.int64)
+        inside = (index >= 0) & (index < len(self.counts))
+        self.counts += np.bincount(index[inside], minlength=len(self.counts))
+        self.below = np.concatenate((self.below, values[index < 0]))
+        self.above = np.concatenate((self.above, values[index >= len(self.counts)]))
+        self.total += values.sum()
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+
+    def merge(self, other):
+        """Fold in a histogram built with the same bins"""
+        self.counts += other.counts
+        self.below = np.concatenate((self.below, other.below))
+        self.above = np.concatenate((self.above, other.above))
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Return mean, min, max, out-of-range count and the requested percentiles"""
+        below, above = np.sort(self.below), np.sort(self.above)
+        binned = self.counts.sum()
+        count = len(below) + binned + len(above)
+        cumulative = np.cumsum(self.counts)
+        result = {
+            'paths': int(count),
+            'mean': float(self.total / count),
+            'min': float(self.minimum),
+            'max': float(self.maximum),
+            'out_of_range': len(below) + len(above)
+        }
+        for q in percentiles:
+            target = q / 100 * count
+            if target <= len(below) and len(below):
+                value = below[max(int(np.ceil(target)) - 1, 0)]
+            elif target > len(below) + binned:
+                value = above[min(int(np.ceil(target - len(below) - binned)) - 1, len(above) - 1)]
+            else:
+                # Interpolate inside the bin in log space
+                target -= len(below)
+                b = min(int(np.searchsorted(cumulative, target)), len(self.counts) - 1)
+                before = cumulative[b - 1] if b else 0
+                fraction = (target - before) / self.counts[b] if self.counts[b] else 0.0
+                value = np.exp(self.log_low + (b + fraction) * self.log_step)
+            result[f'p{q}'] = float(min(max(value, self.minimum), self.maximum))
+        return result
+
+
+def _simulate_chunk(seed, paths, legs, ranges, bins):
+    """Evaluate one chunk of paths and return a histogram per leg"""
+    rng = np.random.default_rng(seed)
+    histograms = {}
+    for name, leg in legs.items():
+        histogram = StreamingPercentiles(*ranges[name], bins=bins)
+        histogram.update(leg.evaluate(rng, paths))
+        histograms[name] = histogram
+    return histograms
+
+
+def _simulate_chunk_args(args):
+    return _simulate_chunk(*args)
+
+
+class RateScenarioEngine:
+    """Monte Carlo engine producing percentile bands for the calculators"""
+
+    def __init__(self, seed=2024, paths=100000, chunk_size=10000, max_workers=None, bins=20000):
+        self.seed = seed
+        self.paths = paths
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.bins = bins
+        self.ppf = PPFCalculator()
+        self.public_funds = PublicFundsCalculator()
+
+    def run(self, legs, percentiles=DEFAULT_PERCENTILES):
+        """Simulate every leg over all paths and return percentile summaries
+
+        Each chunk draws from its own child of the seed, so results do not
+        depend on the number of workers.
+        """
+        chunk_sizes = [self.chunk_size] * (self.paths // self.chunk_size)
+        if self.paths % self.chunk_size:
+            chunk_sizes.append(self.paths % self.chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+
+        # A pilot chunk fixes the histogram range shared by all workers;
+        # later values outside it are kept exactly, not clipped
+        rng = np.random.default_rng(seeds[0])
+        pilot = {name: leg.evaluate(rng, chunk_sizes[0]) for name, leg in legs.items()}
+        ranges = {name: (values.min() / 4, values.max() * 4) for name, values in pilot.items()}
+        totals = {}
+        for name, values in pilot.items():
+            totals[name] = StreamingPercentiles(*ranges[name], bins=self.bins)
+            totals[name].update(values)
+
+        jobs = [(seeds[i], chunk_sizes[i], legs, ranges, self.bins)
+                for i in range(1, len(chunk_sizes))]
+        if self.max_workers == 1 or len(jobs) < 2:
+            results = map(_simulate_chunk_args, jobs)
+            self._merge(totals, results)
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                self._merge(totals, pool.map(_simulate_chunk_args, jobs))
+
+        return {name: histogram.summary(percentiles) for name, histogram in totals.items()}
+
+    def simulate_ppf_maturity(self, annual_deposit, years=15, volatility=0.5):
+        """Distribution of PPF maturity under mean-reverting rates"""
+        model = MeanRevertingRateModel(self.ppf.current_rate, volatility=volatility)
+        return self.run({'PPF': ScenarioLeg(model, annual_deposit, years)})['PPF']
+
+    def simulate_alternatives(self, annual_deposit, years=15):
+        """Distributions for the legs of PPFCalculator.compare_with_alternatives"""
+        terms = self.ppf.terms
+        alternatives = terms.alternative_rates
+        legs = {
+            'PPF': ScenarioLeg(MeanRevertingRateModel(terms.current_rate), annual_deposit, years),
+            'Fixed_Deposit': ScenarioLeg(MeanRevertingRateModel(alternatives['Fixed_Deposit'], volatility=0.75),
+                                         annual_deposit, years),
+            'ELSS': ScenarioLeg(LognormalReturnModel(alternatives['ELSS'], 18.0), annual_deposit, years),
+            'NSC': ScenarioLeg(MeanRevertingRateModel(alternatives['NSC']), annual_deposit, years)
+        }
+        return self.run(legs)
+
+    def simulate_public_schemes(self, investment_amount, years=5, annual_deposit=None):
+        """Distributions for the public fund schemes at their current rates
+
+        PPF and SSY take annual deposits (default: the amount spread over the
+        tenure; SSY always runs 21 years with 15 deposit years); NSC, TD and
+        SCSS lock the sampled rate at purchase.
+        """
+        rates = self.public_funds.rates
+        if annual_deposit is None:
+            annual_deposit = investment_amount / years
+
+        def model(scheme):
+            return MeanRevertingRateModel(rate_at(rates[scheme]))
+
+        legs = {
+            'NSC': ScenarioLeg(model('nsc'), investment_amount, min(years, 5), LUMP_FIXED),
+            'Post_Office_TD': ScenarioLeg(model('post_office_td'), investment_amount, years, LUMP_FIXED),
+            'SSY': ScenarioLeg(model('sukanya_samriddhi'), annual_deposit, 21, deposit_years=15)
+        }
+        if years >= 15:
+            legs['PPF'] = ScenarioLeg(model('ppf'), annual_deposit, years)
+        if years <= 5:
+            legs['SCSS'] = ScenarioLeg(model('senior_citizen_savings'), investment_amount,
+                                       years, SIMPLE_PAYOUT)
+        return self.run(legs)
+
+    def _merge(self, totals, results):
+        for histograms in results:
+            for name, histogram in histograms.items():
+                totals[name].merge(histogram)
@@ -0,0 +1,119 @@
+"""
+Rate Solver Module
+Implied annual rate of EMI offers, solved for many offers at once
+"""
+
+import numpy as np
+
+# Per-row error codes
+RATE_OK = 0
+RATE_INVALID_OFFER = 1     # non-positive amount, EMI or tenure, or fees eat the loan
+RATE_BELOW_ZERO = 2        # the EMIs repay less than the amount received
+RATE_NOT_CONVERGED = 3
+
+# Below this monthly rate the annuity factor uses its series expansion
+_SMALL_RATE = 1e-7
+
+
+def _annuity(r, n):
+    """Present value of 1 per month for n months and its derivative in r"""
+    small = np.abs(r) < _SMALL_RATE
+    safe = np.where(small, 1.0, r)
+    v = (1 + safe) ** -n
+    value = np.where(small, n - n * (n + 1) / 2 * r, (1 - v) / safe)
+    slope = np.where(small, -n * (n + 1) / 2 + n * (n + 1) * (n + 2) / 3 * r,
+                     n * v / (1 + safe) / safe - (1 - v) / safe ** 2)
+    return value, slope
+
+
+class ImpliedRateSolver:
+    """Back out the rate of "EMI X for N months on principal P" offers
+
+    The borrower receives P less upfront fees (and less any EMIs collected
+    in advance) and repays the remaining EMIs monthly in arrears. The
+    monthly rate r solves net = EMI * (1 - (1 + r)^-n) / r; Newton steps
+    are kept inside a [0, EMI / net] bracket and fall back to bisection
+    when they leave it. Rates are nominal annual percentages, as taken by
+    calculate_emi.
+    """
+
+    def __init__(self, max_iterations=60, tolerance=1e-10):
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+    def implied_rate(self, principals, emis, months, fees=0.0, advance_emis=0):
+        """Implied annual rate (%) per offer with convergence flags"""
+        principals, emis, months, fees, advance = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(principals, dtype=np.float64)),
+            np.asarray(emis, dtype=np.float64),
+            np.asarray(months, dtype=np.int64),
+            np.asarray(fees, dtype=np.float64),
+            np.asarray(advance_emis, dtype=np.int64)
+        )
+        net = principals - fees - advance * emis
+        payments = (months - advance).astype(np.float64)
+
+        error_code = np.full(principals.shape, RATE_OK, dtype=np.int8)
+        invalid = (principals <= 0) | (emis <= 0) | (payments <= 0) | (net <= 0)
+        error_code[invalid] = RATE_INVALID_OFFER
+        scale = np.where(invalid, 1.0, net)
+
+        # Zero-cost rows: the EMIs exactly repay what was received
+        surplus = emis * payments - net
+        zero = ~invalid & (np.abs(surplus) <= self.tolerance * scale)
+        below = ~invalid & ~zero & (surplus < 0)
+        error_code[below] = RATE_BELOW_ZERO
+        solve = np.flatnonzero(error_code == RATE_OK)
+        solve = solve[~zero[solve]]
+
+        rate = np.zeros(principals.shape)
+        converged = zero.copy()
+        iterations = np.zeros(principals.shape, dtype=np.int16)
+        if len(solve):
+            rate[solve], converged[solve], iterations[solve] = self._solve(
+                net[solve], emis[solve], payments[solve], surplus[solve]
+            )
+        error_code[(error_code == RATE_OK) & ~converged] = RATE_NOT_CONVERGED
+
+        ok = error_code == RATE_OK
+        monthly = np.where(ok, rate, np.nan)
+        return {
+            'annual_rate': monthly * 1200,
+            'effective_annual_rate': ((1 + monthly) ** 12 - 1) * 100,
+            'net_amount': net,
+            'total_interest': emis * payments - net,
+            'converged': converged,
+            'iterations': iterations,
+            'error_code': error_code
+        }
+
+    def _solve(self, net, emi, n, surplus):
+        low = np.zeros(net.shape)
+        high = emi / net
+        # Start from the flat-to-reducing rule of thumb 2I / (P (n + 1))
+        rate = np.clip(2 * surplus / (net * (n + 1)), 0.0, high)
+        converged = np.zeros(net.shape, dtype=bool)
+        iterations = np.zeros(net.shape, dtype=np.int16)
+
+        active = np.arange(len(net))
+        for iteration in range(1, self.max_iterations + 1):
+            r, e, m = rate[active], emi[active], n[active]
+            value, slope = _annuity(r, m)
+            gap = e * value - net[active]
+            done = (np.abs(gap) <= self.tolerance * net[active]) | (high[active] - low[active] <= 1e-15)
+            converged[active[done]] = True
+            iterations[active[done]] = iteration
+            keep = ~done
+            active, r, gap, slope = active[keep], r[keep], gap[keep], slope[keep]
+            if not len(active):
+                break
+
+            # gap falls as the rate rises
+            low[active] = np.where(gap > 0, r, low[active])
+            high[active] = np.where(gap < 0, r, high[active])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = r - gap / (emi[active] * slope)
+            inside = np.isfinite(newton) & (newton > low[active]) & (newton < high[active])
+            rate[active] = np.where(inside, newton, (low[active] + high[active]) / 2)
+        iterations[active] = self.max_iterations
+        return rate, converged, iterations
@@ -0,0 +1,193 @@
+"""
+Rate Timeline Module
+Quarterly interest-rate history per scheme with a cumulative growth index
+"""
+
+from datetime import date
+
+from growth_kernel import default_kernel
+
+# Earliest date a flat timeline covers (PPF was introduced in 1968)
+SMALL_SAVINGS_INCEPTION = date(1968, 4, 1)
+
+# Official PPF rate revisions (effective date, annual rate %) since 1986-87.
+# Small-savings rates have been reset quarterly since April 2016.
+PPF_RATE_HISTORY = [
+    (date(1986, 4, 1), 12.0),
+    (date(2000, 1, 15), 11.0),
+    (date(2001, 3, 1), 9.5),
+    (date(2002, 3, 1), 9.0),
+    (date(2003, 3, 1), 8.0),
+    (date(2011, 12, 1), 8.6),
+    (date(2012, 4, 1), 8.8),
+    (date(2013, 4, 1), 8.7),
+    (date(2016, 4, 1), 8.1),
+    (date(2016, 10, 1), 8.0),
+    (date(2017, 4, 1), 7.9),
+    (date(2017, 7, 1), 7.8),
+    (date(2018, 1, 1), 7.6),
+    (date(2018, 10, 1), 8.0),
+    (date(2019, 7, 1), 7.9),
+    (date(2020, 4, 1), 7.1)
+]
+
+
+def quarter_start(when):
+    """Return the first day of the calendar quarter containing `when`"""
+    return date(when.year, 3 * ((when.month - 1) // 3) + 1, 1)
+
+
+def financial_year_start(when):
+    """Return 1st April of the financial year containing `when`"""
+    return date(when.year if when.month >= 4 else when.year - 1, 4, 1)
+
+
+def add_years(when, years):
+    """Shift a date by whole years, mapping 29th February to the 28th"""
+    try:
+        return when.replace(year=when.year + years)
+    except ValueError:
+        return when.replace(year=when.year + years, day=28)
+
+
+def _add_quarters(when, quarters):
+    months = when.month - 1 + 3 * quarters
+    return date(when.year + months // 12, months % 12 + 1, 1)
+
+
+class RateTimeline:
+    """Quarterly rates for one scheme with a prefix-product growth index"""
+
+    def __init__(self, scheme, start, quarterly_rates):
+        if start != quarter_start(start):
+            raise ValueError("Timeline must start on the first day of a quarter")
+        if not quarterly_rates:
+            raise ValueError("Timeline needs at least one quarterly rate")
+
+        self.scheme = scheme
+        self.start = start
+        self.rates = list(quarterly_rates)
+
+        # Rates compound annually, so each quarter grows by (1 + r)^(1/4).
+        # index[q] is the growth of one rupee from `start` to quarter q.
+        self._steps = [(1 + rate / 100) ** 0.25 for rate in self.rates]
+        self._index = [1.0]
+        for step in self._steps:
+            self._index.append(self._index[-1] * step)
+
+    @classmethod
+    def from_changes(cls, scheme, changes, until=None):
+        """Build a timeline from dated rate revisions
+
+        Each quarter takes the rate in force on its first day. The timeline
+        runs up to the quarter containing `until` (default: today).
+        """
+        changes = sorted(changes)
+        start = quarter_start(changes[0][0])
+        end = quarter_start(until or date.today())
+
+        rates = []
+        current = changes[0][1]
+        position = 0
+        quarter = start
+        while quarter <= end:
+            while position < len(changes) and changes[position][0] <= quarter:
+                current = changes[position][1]
+                position += 1
+            rates.append(current)
+            quarter = _add_quarters(quarter, 1)
+
+        return cls(scheme, start, rates)
+
+    @classmethod
+    def flat(cls, scheme, rate, start=SMALL_SAVINGS_INCEPTION):
+        """Build a single-rate timeline, e.g. from a calculator's current rate"""
+        return cls(scheme, quarter_start(start), [rate])
+
+    def __len__(self):
+        return len(self.rates)
+
+    @property
+    def end(self):
+        """First day after the last recorded quarter"""
+        return _add_quarters(self.start, len(self.rates))
+
+    def rate_at(self, when):
+        """Annual rate (%) in force on a date; the last rate holds until revised"""
+        quarter = self._quarter_of(when)
+        return self.rates[min(quarter, len(self.rates) - 1)]
+
+    def growth(self, start, end):
+        """Growth of one rupee between two dates, in O(1)"""
+        return self._cumulative(end) / self._cumulative(start)
+
+    def effective_rate(self, start, end):
+        """Annualised rate (%) equivalent to the growth between two dates"""
+        years = (end - start).days / 365.25
+        if years <= 0:
+            return self.rate_at(start)
+        return (self.growth(start, end) ** (1 / years) - 1) * 100
+
+    def growth_factor(self, years, start_date):
+        """Growth of one rupee over whole years from `start_date`"""
+        return self.growth(start_date, add_years(start_date, years))
+
+    def annuity_factor(self, deposit_years, years, start_date):
+        """Value after `years` of one rupee deposited at the start of each of `deposit_years`"""
+        end = add_years(start_date, years)
+        end_index = self._cumulative(end)
+        return sum(end_index / self._cumulative(add_years(start_date, year))
+                   for year in range(deposit_years))
+
+    def _quarter_of(self, when):
+        months = (when.year - self.start.year) * 12 + when.month - self.start.month
+        if months < 0:
+            raise ValueError(f"{when} is before the {self.scheme} timeline starts ({self.start})")
+        return months // 3
+
+    def _cumulative(self, when):
+        quarter = self._quarter_of(when)
+        begin = _add_quarters(self.start, quarter)
+        span = (_add_quarters(self.start, quarter + 1) - begin).days
+        fraction = (when - begin).days / span
+
+        # Past the last recorded quarter the latest rate keeps applying
+        last = len(self._steps) - 1
+        if quarter > last:
+            return self._index[-1] * self._steps[last] ** (quarter - last - 1 + fraction)
+        return self._index[quarter] * self._steps[quarter] ** fraction
+
+
+def default_timelines(rates):
+    """Timelines for every scheme in a rates dict, using full history where known"""
+    timelines = {}
+    for scheme, rate in rates.items():
+        if scheme == 'ppf':
+            timelines[scheme] = RateTimeline.from_changes(scheme, PPF_RATE_HISTORY)
+        else:
+            timelines[scheme] = RateTimeline.flat(scheme, rate)
+    return timelines
+
+
+def rate_at(rate, when=None):
+    """Annual rate (%) for a scalar rate or a RateTimeline"""
+    if isinstance(rate, RateTimeline):
+        return rate.rate_at(when or date.today())
+    return rate
+
+
+def growth_factor(rate, years, start_date=None, kernel=default_kernel):
+    """Growth over whole years for a scalar rate or a RateTimeline"""
+    if isinstance(rate, RateTimeline):
+        return rate.growth_factor(years, start_date or financial_year_start(date.today()))
+    return kernel.growth_factor(rate, years)
+
+
+def annuity_factor(rate, deposit_years, years=None, start_date=None, kernel=default_kernel):
+    """Annuity factor (deposits at year start) for a scalar rate or a RateTimeline"""
+    if years is None:
+        years = deposit_years
+    if isinstance(rate, RateTimeline):
+        return rate.annuity_factor(deposit_years, years,
+                                   start_date or financial_year_start(date.today()))
+    return kernel.annuity_factor(rate, deposit_years, years)
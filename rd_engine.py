@@ -0,0 +1,201 @@
+"""
+Recurring Deposit Engine Module
+Post Office RD with quarterly interest credits, defaults and advance-deposit rebates
+"""
+
+import numpy as np
+
+from rate_config import default_config
+
+RD_MONTHS = 60
+
+# Default fee per ₹100 of installment for each month of delay
+DEFAULT_FEE_PER_100 = 1.0
+
+# Rebate per ₹100 of installment when deposits are paid in advance in one go
+REBATE_12_INSTALLMENTS = 40.0
+REBATE_6_INSTALLMENTS = 10.0
+
+
+def _rates(rate):
+    rate = np.asarray(rate, dtype=np.float64)
+    return rate / 1200, rate / 400  # simple monthly accrual, quarterly credit
+
+
+def installment_growth(rate, start_month, months=RD_MONTHS):
+    """Value at `months` of ₹1 earning from the start of `start_month` (vectorized)
+
+    Interest accrues monthly on the balance and is credited, and so starts
+    compounding, at the end of each quarter of the account; a final partial
+    quarter is credited at maturity.
+    """
+    j, q = _rates(rate)
+    start = np.asarray(start_month)
+    months = np.asarray(months)
+    last_credit = months // 3 * 3
+    first_credit = (start // 3 + 1) * 3
+    credited = (1 + j * (first_credit - start)) * (1 + q) ** ((last_credit - first_credit) // 3) \
+        * (1 + j * (months - last_credit))
+    return np.where(first_credit <= last_credit, credited, 1 + j * (months - start))
+
+
+def rd_value_factor(rate, made, months):
+    """Value after `months` months of ₹1 paid at the start of months 0..made-1
+
+    Closed form of summing installment_growth, for accounts that have made
+    every installment up to the current quarter (made >= 3 * (months // 3)).
+    Each full quarter's three installments are worth 3 + 2q at its end.
+    """
+    j, q = _rates(rate)
+    made = np.asarray(made)
+    months = np.asarray(months)
+    quarters = months // 3
+    tail = months - quarters * 3
+    safe = np.where(q == 0, 1.0, q)
+    credited = np.where(q == 0, 3.0 * quarters, (3 + 2 * q) * ((1 + q) ** quarters - 1) / safe)
+    current = made - quarters * 3  # installments in the quarter still running
+    return credited * (1 + j * tail) + current + j * current * (tail - (current - 1) / 2)
+
+
+def rd_maturity_factor(rate, months=RD_MONTHS):
+    """Maturity value of ₹1 paid at the start of each month (vectorized)"""
+    return rd_value_factor(rate, months, months)
+
+
+def advance_rebate(installment, count):
+    """Rebate on `count` installments deposited together in advance"""
+    blocks_12, rest = divmod(np.asarray(count), 12)
+    blocks_6 = rest // 6
+    return installment / 100 * (blocks_12 * REBATE_12_INSTALLMENTS + blocks_6 * REBATE_6_INSTALLMENTS)
+
+
+class RecurringDepositEngine:
+    """Installment-level Post Office RD projections, per account or in bulk
+
+    Installment k falls due at the start of month k (0-based). A paid month
+    after k is a late payment: it earns interest only from the month it is
+    paid and attracts the default fee. Installments paid before k earn from
+    their due month and, when six or more go in together, a rebate.
+    Installments never paid (None / NaN) earn nothing.
+    """
+
+    def __init__(self, rate, months=RD_MONTHS, config=None):
+        self.rate = rate
+        self.months = months
+        self.config = config or default_config
+        self.refresh()
+
+    def refresh(self):
+        """Take the installment limit from the latest rate snapshot"""
+        self.min_installment = self.config.current().scheme_details['post_office_rd']['min_deposit']
+
+    def installment_ledger(self, installment, paid_months=None, rate=None):
+        """Ledger rows per installment plus account totals"""
+        if installment < self.min_installment:
+            return None, f"Minimum installment is ₹{self.min_installment}"
+        rate = self.rate if rate is None else rate
+        if paid_months is None:
+            paid_months = list(range(self.months))
+        if len(paid_months) != self.months:
+            return None, f"Expected {self.months} installments, got {len(paid_months)}"
+
+        rows = []
+        for due, paid in enumerate(paid_months):
+            if paid is None:
+                rows.append({
+                    'installment': due + 1,
+                    'due_month': due,
+                    'paid_month': None,
+                    'amount': 0.0,
+                    'default_fee': 0.0,
+                    'months_earning': 0,
+                    'maturity_value': 0.0
+                })
+                continue
+            if paid >= self.months:
+                return None, f"Installment {due + 1} paid after maturity"
+            earning = self.months - max(paid, due)
+            rows.append({
+                'installment': due + 1,
+                'due_month': due,
+                'paid_month': paid,
+                'amount': installment,
+                'default_fee': installment / 100 * DEFAULT_FEE_PER_100 * max(paid - due, 0),
+                'months_earning': earning,
+                'maturity_value': installment * float(installment_growth(rate, max(paid, due), self.months))
+            })
+
+        # Rebates per payment month, for installments paid ahead of time
+        paid_together = {}
+        for row in rows:
+            if row['paid_month'] is not None and row['due_month'] >= row['paid_month']:
+                paid_together[row['paid_month']] = paid_together.get(row['paid_month'], 0) + 1
+        rebates = {month: float(advance_rebate(installment, count)) for month, count in paid_together.items()}
+        rebates = {month: rebate for month, rebate in rebates.items() if rebate}
+
+        total_deposited = sum(row['amount'] for row in rows)
+        maturity_amount = sum(row['maturity_value'] for row in rows)
+        total_fees = sum(row['default_fee'] for row in rows)
+        total_rebates = sum(rebates.values())
+        return {
+            'ledger': rows,
+            'rebates': rebates,
+            'maturity_amount': maturity_amount,
+            'total_deposited': total_deposited,
+            'interest_earned': maturity_amount - total_deposited,
+            'default_fees': total_fees,
+            'advance_rebates': total_rebates,
+            'net_gain': maturity_amount - total_deposited - total_fees + total_rebates,
+            'rate': rate
+        }, None
+
+    def maturity_batch(self, installments, rates=None, paid_months=None):
+        """Maturity projections for many accounts at once
+
+        Without `paid_months` every installment is on time and the closed
+        form is used. Otherwise `paid_months` is an (accounts, months) array
+        of payment months with NaN for installments never paid.
+        """
+        rates = self.rate if rates is None else rates
+        installments, rates = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(installments, dtype=np.float64)),
+            np.asarray(rates, dtype=np.float64)
+        )
+
+        if paid_months is None:
+            maturity = installments * rd_maturity_factor(rates, self.months)
+            deposited = installments * self.months
+            fees = np.zeros(installments.shape)
+            rebates = np.zeros(installments.shape)
+        else:
+            paid = np.asarray(paid_months, dtype=np.float64)
+            due = np.arange(self.months)
+            made = ~np.isnan(paid)
+            paid_or_due = np.where(made, paid, 0.0)
+            start = np.maximum(paid_or_due, due).astype(np.int64)
+            growth = installment_growth(rates[:, None], start, self.months)
+            maturity = installments * np.where(made, growth, 0.0).sum(axis=1)
+            deposited = installments * made.sum(axis=1)
+            delay = np.where(made, np.maximum(paid_or_due - due, 0.0), 0.0).sum(axis=1)
+            fees = installments / 100 * DEFAULT_FEE_PER_100 * delay
+
+            # A rebate needs at least five installments paid before their due
+            # month, so only those accounts are counted per payment month
+            rebates = np.zeros(installments.shape)
+            candidates = np.flatnonzero((made & (paid_or_due < due)).sum(axis=1) >= 5)
+            if len(candidates):
+                ahead = made[candidates] & (paid_or_due[candidates] <= due)
+                account, month = np.nonzero(ahead)
+                slots = account * self.months + paid_or_due[candidates][account, month].astype(np.int64)
+                counts = np.bincount(slots, minlength=len(candidates) * self.months)
+                counts = counts.reshape(len(candidates), self.months)
+                rebates[candidates] = advance_rebate(installments[candidates, None], counts).sum(axis=1)
+
+        return {
+            'maturity_amount': maturity,
+            'total_deposited': deposited,
+            'interest_earned': maturity - deposited,
+            'default_fees': fees,
+            'advance_rebates': rebates,
+            'net_gain': maturity - deposited - fees + rebates
+        }
@@ -0,0 +1,196 @@
+"""
+Scheme Registry Module
+Declarative scheme definitions with vectorized kernels for scheme comparisons
+"""
+
+import numpy as np
+
+from growth_kernel import annuity_factor_array
+from paise_backend import (
+    FLOAT_BACKEND, PAISE_BACKEND, PAISE_VALUE_FUNCTIONS, from_paise, to_paise, to_rate_units
+)
+from rate_config import default_config
+from rd_engine import rd_maturity_factor
+
+# Cash-flow shapes
+ANNUAL_DEPOSITS = 'annual'    # yearly deposit at the start of each year
+LUMP_SUM = 'lump'             # one deposit compounding until maturity
+PAYOUT = 'payout'             # interest paid out, principal returned
+MONTHLY_DEPOSITS = 'monthly'  # monthly deposit at the start of each month
+
+SSY_DEPOSIT_YEARS = 15
+
+
+def _ppf_value(amount, years, rate):
+    return amount * annuity_factor_array(rate, years)
+
+
+def _ssy_value(amount, years, rate):
+    # Deposits stop after 15 years, the balance compounds until maturity
+    return amount * annuity_factor_array(rate, np.minimum(years, SSY_DEPOSIT_YEARS), years)
+
+
+def _compound_value(amount, years, rate):
+    return amount * (1 + np.asarray(rate) / 100) ** years
+
+
+def _simple_value(amount, years, rate):
+    # Interest is paid out, so the total received grows linearly
+    return amount * (1 + np.asarray(rate) / 100 * years)
+
+
+def _rd_value(amount, years, rate):
+    return amount * rd_maturity_factor(rate, np.asarray(years) * 12)
+
+
+# Maturity value of each scheme as f(amount, years, rate %), vectorized.
+# PPF and SSY amounts are annual deposits, RD amounts monthly deposits.
+SCHEME_VALUE_FUNCTIONS = {
+    'ppf': _ppf_value,
+    'sukanya_samriddhi': _ssy_value,
+    'nsc': _compound_value,
+    'kisan_vikas_patra': _compound_value,
+    'post_office_td': _compound_value,
+    'senior_citizen_savings': _simple_value,
+    'post_office_mis': _simple_value,
+    'post_office_rd': _rd_value
+}
+
+
+class SchemeSpec:
+    """Everything compare_all_schemes needs to know about one scheme"""
+
+    def __init__(self, label, rate_key, shape, tenure, calculate, deposit=None,
+                 min_deposit=None, max_deposit=None, max_years=None, min_years=None,
+                 tax_free=False, doubles=False):
+        self.label = label
+        self.rate_key = rate_key
+        self.shape = shape
+        self.tenure = tenure            # f(years) -> tenure used for the scheme
+        self.calculate = calculate      # f(calculator, amount, years, start_date) -> result dict
+        self.deposit = deposit or (lambda amount, years: amount)
+        self.min_deposit = min_deposit
+        self.max_deposit = max_deposit
+        self.min_years = min_years
+        self.max_years = max_years
+        self.tax_free = tax_free
+        self.doubles = doubles          # KVP: fixed 2x payout, tenure follows the rate
+
+    def eligible(self, amounts, years):
+        """Vectorized eligibility of (amount, years) pairs"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        years = np.asarray(years)
+        deposits = self.deposit(amounts, years)
+        mask = np.ones(np.broadcast(amounts, years).shape, dtype=bool)
+        if self.min_years is not None:
+            mask &= years >= self.min_years
+        if self.max_years is not None:
+            mask &= years <= self.max_years
+        if self.min_deposit is not None:
+            mask &= deposits >= self.min_deposit
+        if self.max_deposit is not None:
+            mask &= deposits <= self.max_deposit
+        return mask
+
+    def kernel(self, amounts, years, rate, backend=FLOAT_BACKEND):
+        """Vectorized maturity, investment and interest for many investors"""
+        amounts = np.asarray(amounts, dtype=np.float64)
+        years = np.asarray(years)
+        deposits = self.deposit(amounts, years)
+        if backend == PAISE_BACKEND:
+            # Invested totals use the same paisa-rounded deposits as the maturity
+            paise = to_paise(deposits)
+            deposits = from_paise(paise)
+
+        if self.doubles:
+            tenure = np.full(amounts.shape, np.log(2) / np.log1p(rate / 100))
+            maturity = amounts * 2
+        else:
+            tenure = self.tenure(years)
+            if backend == PAISE_BACKEND:
+                maturity = from_paise(PAISE_VALUE_FUNCTIONS[self.rate_key](paise, tenure, to_rate_units(rate)))
+            else:
+                maturity = SCHEME_VALUE_FUNCTIONS[self.rate_key](deposits, tenure, rate)
+
+        if self.shape == ANNUAL_DEPOSITS:
+            invested = deposits * np.minimum(tenure, SSY_DEPOSIT_YEARS) \
+                if self.rate_key == 'sukanya_samriddhi' else deposits * tenure
+        elif self.shape == MONTHLY_DEPOSITS:
+            invested = deposits * tenure * 12
+        else:
+            invested = deposits
+
+        return {
+            'maturity_amount': maturity,
+            'total_invested': invested,
+            'interest_earned': maturity - invested,
+            'tenure': tenure
+        }
+
+
+class SchemeRegistry:
+    """Ordered collection of scheme specs"""
+
+    def __init__(self, specs=()):
+        self._specs = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec):
+        """Add or replace a scheme"""
+        self._specs[spec.label] = spec
+
+    def unregister(self, label):
+        """Remove a scheme"""
+        del self._specs[label]
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+    def __getitem__(self, label):
+        return self._specs[label]
+
+    def __len__(self):
+        return len(self._specs)
+
+
+def default_registry(scheme_details=None):
+    """Schemes compared by PublicFundsCalculator.compare_all_schemes
+
+    Tenures and deposit limits come from `scheme_details` (by default those
+    of the current rate snapshot), so each limit is declared only once.
+    """
+    if scheme_details is None:
+        scheme_details = default_config.current().scheme_details
+    ppf = scheme_details['ppf']
+    nsc_years = scheme_details['nsc']['tenure']
+    return SchemeRegistry([
+        SchemeSpec(
+            'PPF', 'ppf', ANNUAL_DEPOSITS,
+            tenure=lambda years: years,
+            deposit=lambda amount, years: amount / years,
+            calculate=lambda calc, amount, years, start: calc.calculate_ppf(amount / years, years, start),
+            min_years=ppf['tenure'], max_deposit=ppf['max_deposit'], tax_free=True
+        ),
+        SchemeSpec(
+            'NSC', 'nsc', LUMP_SUM,
+            tenure=lambda years: np.minimum(years, nsc_years),
+            calculate=lambda calc, amount, years, start: calc.calculate_nsc(amount, min(years, nsc_years), start)
+        ),
+        SchemeSpec(
+            'KVP', 'kisan_vikas_patra', LUMP_SUM,
+            tenure=None, doubles=True,
+            calculate=lambda calc, amount, years, start: calc.calculate_kisan_vikas_patra(amount, start)
+        ),
+        SchemeSpec(
+            'Post_Office_TD', 'post_office_td', LUMP_SUM,
+            tenure=lambda years: years,
+            calculate=lambda calc, amount, years, start: calc.calculate_post_office_td(amount, years, start)
+        ),
+        SchemeSpec(
+            'SCSS', 'senior_citizen_savings', PAYOUT,
+            tenure=lambda years: years,
+            calculate=lambda calc, amount, years, start: calc.calculate_senior_citizen_savings(amount, years, start),
+            max_years=5
+        )
+    ])
@@ -0,0 +1,133 @@
+"""
+Sukanya Samriddhi Simulator Module
+Account-level SSY projections from date of birth and opening date, in batch
+"""
+
+import numpy as np
+
+from public_funds import SSY_MAX_AGE, PublicFundsCalculator
+from rate_timeline import RateTimeline
+
+SSY_DEPOSIT_YEARS = 15
+SSY_MATURITY_YEARS = 21
+SSY_WITHDRAWAL_AGE = 18
+SSY_MAX_WITHDRAWAL_FRACTION = 0.5
+SSY_DEFAULT_PENALTY = 50  # ₹ per year the minimum deposit was missed
+
+# Per-row error codes
+SSY_OK = 0
+SSY_TOO_OLD_AT_OPENING = 1
+SSY_INVALID_WITHDRAWAL = 2
+
+_DAYS_PER_YEAR = 365.25
+
+
+def _as_days(dates):
+    dates = np.atleast_1d(dates)
+    if dates.dtype.kind == 'M':
+        return dates.astype('datetime64[D]')
+    return np.array([np.datetime64(d, 'D') for d in dates], dtype='datetime64[D]')
+
+
+class SukanyaSamriddhiSimulator:
+    """SSY accounts with irregular deposits, defaults and the age-18 withdrawal
+
+    Account year t runs from the t-th anniversary of the opening date.
+    Deposits (one amount per account year, up to 15) are made at the start
+    of the year and interest compounds yearly until maturity at 21 years.
+    """
+
+    def __init__(self, calculator=None):
+        self.calculator = calculator or PublicFundsCalculator()
+        details = self.calculator.scheme_details['sukanya_samriddhi']
+        self.min_deposit = details['min_deposit']
+        self.max_deposit = details['max_deposit']
+
+    def simulate(self, date_of_birth, opening_date, deposits, withdrawal_fraction=0.0, rate=None):
+        """Simulate one account; returns (result, error) like the PPF calculator"""
+        batch = self.simulate_batch([date_of_birth], [opening_date], [deposits], withdrawal_fraction, rate)
+        code = batch['error_code'][0]
+        if code == SSY_TOO_OLD_AT_OPENING:
+            return None, f"Account must be opened before the girl turns {SSY_MAX_AGE + 1}"
+        if code == SSY_INVALID_WITHDRAWAL:
+            return None, f"Withdrawal is limited to {SSY_MAX_WITHDRAWAL_FRACTION:.0%} of the balance"
+
+        result = {name: values[0] for name, values in batch.items() if name != 'error_code'}
+        result['year_end_balances'] = result['year_end_balances'].tolist()
+        for name, value in result.items():
+            if isinstance(value, np.generic):
+                result[name] = value.item()
+        return result, None
+
+    def simulate_batch(self, dates_of_birth, opening_dates, deposits, withdrawal_fractions=0.0, rates=None):
+        """Simulate many accounts with array ops
+
+        `deposits` is an (accounts, years) array of yearly deposits for up to
+        15 years (shorter rows are padded with zeros). Amounts above the
+        annual limit are refunded without interest; years below the minimum
+        count as defaults and attract the revival penalty.
+        """
+        births = _as_days(dates_of_birth)
+        openings = _as_days(opening_dates)
+        accounts = len(openings)
+
+        deposits = np.atleast_2d(np.asarray(deposits, dtype=np.float64))
+        padded = np.zeros((accounts, SSY_DEPOSIT_YEARS))
+        width = min(deposits.shape[1], SSY_DEPOSIT_YEARS)
+        padded[:, :width] = deposits[:, :width]
+        excess = np.maximum(padded - self.max_deposit, 0.0)
+        padded -= excess
+
+        if rates is None:
+            rates = self.calculator.rates['sukanya_samriddhi']
+            if isinstance(rates, RateTimeline):
+                rates = [rates.rate_at(d) for d in openings.tolist()]
+        rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), (accounts,))
+        fractions = np.broadcast_to(np.asarray(withdrawal_fractions, dtype=np.float64), (accounts,))
+
+        # Year-end balance after t years: g^t * sum over k < t of d_k g^-k
+        years = np.arange(1, SSY_MATURITY_YEARS + 1)
+        g = (1 + rates / 100)[:, None]
+        discounted = np.zeros((accounts, SSY_MATURITY_YEARS))
+        discounted[:, :SSY_DEPOSIT_YEARS] = padded * g ** -np.arange(SSY_DEPOSIT_YEARS)
+        balances = g ** years * np.cumsum(discounted, axis=1)
+
+        # Withdrawal at the start of the first account year after she turns 18,
+        # from the balance at the end of the preceding year
+        opening_age = (openings - births).astype(np.float64) / _DAYS_PER_YEAR
+        withdrawal_year = np.ceil(SSY_WITHDRAWAL_AGE - opening_age).astype(np.int64)
+        row = np.arange(accounts)
+        withdrawal = fractions * balances[row, np.clip(withdrawal_year, 1, SSY_MATURITY_YEARS) - 1]
+        after = years[None, :] > withdrawal_year[:, None]
+        balances -= np.where(after, withdrawal[:, None] * g ** (years[None, :] - withdrawal_year[:, None]), 0.0)
+
+        defaults = (padded < self.min_deposit).sum(axis=1)
+
+        error_code = np.full(accounts, SSY_OK, dtype=np.int8)
+        error_code[(fractions < 0) | (fractions > SSY_MAX_WITHDRAWAL_FRACTION)] = SSY_INVALID_WITHDRAWAL
+        # Same limit as eligibility_mask, which takes age in completed years
+        error_code[np.floor(opening_age) > SSY_MAX_AGE] = SSY_TOO_OLD_AT_OPENING
+        invalid = error_code != SSY_OK
+        balances[invalid] = np.nan
+
+        # Maturity on the 21st anniversary of opening
+        months = openings.astype('datetime64[M]')
+        maturity_date = (months + SSY_MATURITY_YEARS * 12).astype('datetime64[D]') + (openings - months)
+
+        total_deposited = padded.sum(axis=1)
+        maturity = balances[:, -1]
+        penalty = defaults * SSY_DEFAULT_PENALTY
+        return {
+            'year_end_balances': balances,
+            'maturity_amount': maturity,
+            'total_deposited': total_deposited,
+            'interest_earned': maturity + withdrawal - total_deposited,
+            'withdrawal_year': withdrawal_year,
+            'withdrawal_amount': np.where(invalid, np.nan, withdrawal),
+            'default_years': defaults,
+            'default_penalty': penalty,
+            'excess_refunded': excess.sum(axis=1),
+            'maturity_date': maturity_date,
+            'rate': rates,
+            'error_code': error_code
+        }
@@ -0,0 +1,206 @@
+"""
+Tax Engine Module
+Vectorized slab-based income tax (old and new regimes) per financial year
+"""
+
+import numpy as np
+
+OLD_REGIME = 'old'
+NEW_REGIME = 'new'
+
+SENIOR_AGE = 60
+SUPER_SENIOR_AGE = 80
+
+# Old regime rules did not change between these years
+_OLD_REGIME = {
+    # (lower bound, rate %) per age band: below 60, 60-79, 80+
+    'slabs': (
+        [(0, 0), (250000, 5), (500000, 20), (1000000, 30)],
+        [(0, 0), (300000, 5), (500000, 20), (1000000, 30)],
+        [(0, 0), (500000, 20), (1000000, 30)]
+    ),
+    'standard_deduction': 50000,
+    'rebate_limit': 500000,
+    'rebate_max': 12500,
+    'rebate_marginal_relief': False,
+    'surcharge': [(5000000, 10), (10000000, 15), (20000000, 25), (50000000, 37)],
+    'chapter_via_deductions': True,  # 80C/80TTA/80TTB apply, whatever their limits
+    'deduction_80c': 150000,
+    'deduction_80tta': 10000,   # savings account interest, below 60
+    'deduction_80ttb': 50000    # all deposit interest, 60 and above
+}
+
+# Slabs, rebates and surcharges by financial year and regime
+TAX_TABLES = {
+    '2024-25': {
+        OLD_REGIME: _OLD_REGIME,
+        NEW_REGIME: {
+            'slabs': ([(0, 0), (300000, 5), (700000, 10), (1000000, 15), (1200000, 20), (1500000, 30)],),
+            'standard_deduction': 75000,
+            'rebate_limit': 700000,
+            'rebate_max': 25000,
+            'rebate_marginal_relief': True,
+            'surcharge': [(5000000, 10), (10000000, 15), (20000000, 25)]
+        }
+    },
+    '2025-26': {
+        OLD_REGIME: _OLD_REGIME,
+        NEW_REGIME: {
+            'slabs': ([(0, 0), (400000, 5), (800000, 10), (1200000, 15), (1600000, 20),
+                       (2000000, 25), (2400000, 30)],),
+            'standard_deduction': 75000,
+            'rebate_limit': 1200000,
+            'rebate_max': 60000,
+            'rebate_marginal_relief': True,
+            'surcharge': [(5000000, 10), (10000000, 15), (20000000, 25)]
+        }
+    }
+}
+
+DEFAULT_FINANCIAL_YEAR = '2025-26'
+CESS_RATE = 4  # Health and education cess, % of tax plus surcharge
+
+
+class SlabTable:
+    """Progressive slabs compiled into sorted threshold arrays"""
+
+    def __init__(self, slabs):
+        self.thresholds = np.array([lower for lower, _ in slabs], dtype=np.float64)
+        self.rates = np.array([rate for _, rate in slabs], dtype=np.float64) / 100
+        # Tax due on income up to each threshold
+        widths = np.diff(self.thresholds)
+        self.base = np.concatenate(([0.0], np.cumsum(widths * self.rates[:-1])))
+
+    def tax(self, income):
+        """Tax on each income via searchsorted bucketing"""
+        income = np.asarray(income, dtype=np.float64)
+        slab = np.searchsorted(self.thresholds, income, side='right') - 1
+        np.clip(slab, 0, None, out=slab)
+        return self.base[slab] + (income - self.thresholds[slab]) * self.rates[slab]
+
+
+class CompiledRegime:
+    """One regime of one financial year, ready for array evaluation"""
+
+    def __init__(self, name, table):
+        self.name = name
+        self.slabs = [SlabTable(slabs) for slabs in table['slabs']]
+        self.standard_deduction = table['standard_deduction']
+        self.rebate_limit = table['rebate_limit']
+        self.rebate_max = table['rebate_max']
+        self.rebate_marginal_relief = table['rebate_marginal_relief']
+        self.surcharge_thresholds = np.array([0.0] + [t for t, _ in table['surcharge']])
+        self.surcharge_rates = np.array([0.0] + [r for _, r in table['surcharge']]) / 100
+        self.chapter_via_deductions = table.get('chapter_via_deductions', False)
+        self.deduction_80c = table.get('deduction_80c', 0)
+        self.deduction_80tta = table.get('deduction_80tta', 0)
+        self.deduction_80ttb = table.get('deduction_80ttb', 0)
+
+    def slab_tax(self, taxable, age):
+        """Slab tax after the section 87A rebate"""
+        if len(self.slabs) == 1:
+            tax = self.slabs[0].tax(taxable)
+        else:
+            band = (age >= SENIOR_AGE).astype(np.int8) + (age >= SUPER_SENIOR_AGE)
+            tax = np.choose(band, [slabs.tax(taxable) for slabs in self.slabs])
+
+        within = taxable <= self.rebate_limit
+        rebated = np.where(within, np.maximum(tax - self.rebate_max, 0.0), tax)
+        if self.rebate_marginal_relief:
+            # Just above the limit, tax may not exceed the income over it
+            rebated = np.where(within, rebated, np.minimum(tax, taxable - self.rebate_limit))
+        return rebated
+
+    def compute(self, income, age, deductions_80c, savings_interest, deposit_interest, salaried):
+        gross = income + savings_interest + deposit_interest
+        deductions = np.where(salaried, self.standard_deduction, 0.0)
+        if self.chapter_via_deductions:
+            senior = age >= SENIOR_AGE
+            deductions = deductions + np.minimum(deductions_80c, self.deduction_80c)
+            deductions = deductions + np.where(
+                senior,
+                np.minimum(savings_interest + deposit_interest, self.deduction_80ttb),
+                np.minimum(savings_interest, self.deduction_80tta)
+            )
+        taxable = np.maximum(gross - deductions, 0.0)
+        tax = self.slab_tax(taxable, age)
+
+        # Surcharge with marginal relief at each threshold
+        band = np.searchsorted(self.surcharge_thresholds, taxable, side='right') - 1
+        rate = self.surcharge_rates[band]
+        threshold = self.surcharge_thresholds[band]
+        previous = self.surcharge_rates[np.maximum(band - 1, 0)]
+        ceiling = self.slab_tax(threshold, age) * (1 + previous) + (taxable - threshold)
+        with_surcharge = np.where(band > 0, np.minimum(tax * (1 + rate), ceiling), tax)
+        surcharge = with_surcharge - tax
+
+        cess = with_surcharge * CESS_RATE / 100
+        return {
+            'gross_income': gross,
+            'deductions': np.minimum(deductions, gross),
+            'taxable_income': taxable,
+            'tax': tax,
+            'surcharge': surcharge,
+            'cess': cess,
+            'total_tax': with_surcharge + cess
+        }
+
+
+class IncomeTaxEngine:
+    """Income tax for many taxpayers at once under either regime"""
+
+    def __init__(self, financial_year=DEFAULT_FINANCIAL_YEAR, tables=None):
+        tables = tables or TAX_TABLES
+        if financial_year not in tables:
+            raise ValueError(f"No tax table for financial year {financial_year}")
+        self.financial_year = financial_year
+        self.regimes = {name: CompiledRegime(name, table)
+                        for name, table in tables[financial_year].items()}
+
+    def compute(self, income, regime=NEW_REGIME, age=30, deductions_80c=0,
+                savings_interest=0, deposit_interest=0, salaried=True):
+        """Tax breakdown for each row; `regime` may be a string or an array of them
+
+        `income` excludes the interest passed separately, which the
+        old-regime 80TTA/80TTB deductions apply to.
+        """
+        income, age, deductions_80c, savings_interest, deposit_interest, salaried, regime = \
+            np.broadcast_arrays(
+                np.atleast_1d(np.asarray(income, dtype=np.float64)),
+                np.asarray(age),
+                np.asarray(deductions_80c, dtype=np.float64),
+                np.asarray(savings_interest, dtype=np.float64),
+                np.asarray(deposit_interest, dtype=np.float64),
+                np.asarray(salaried, dtype=bool),
+                np.asarray(regime)
+            )
+        names = set(np.unique(regime).tolist())
+        unknown = names - set(self.regimes)
+        if unknown:
+            raise ValueError(f"Unknown tax regime: {', '.join(sorted(unknown))}")
+
+        results = {}
+        for name in names:
+            columns = self.regimes[name].compute(income, age, deductions_80c, savings_interest,
+                                                 deposit_interest, salaried)
+            rows = regime == name
+            for key, values in columns.items():
+                results.setdefault(key, np.zeros(income.shape))[rows] = values[rows]
+        return results
+
+    def tax_on_interest(self, income, interest, regime=NEW_REGIME, age=30, deductions_80c=0, salaried=True):
+        """Extra tax caused by adding deposit interest to each income"""
+        without = self.compute(income, regime, age, deductions_80c, salaried=salaried)['total_tax']
+        with_interest = self.compute(income, regime, age, deductions_80c,
+                                     deposit_interest=interest, salaried=salaried)['total_tax']
+        return with_interest - without
+
+    def deduction_saving(self, income, deduction, age=30, salaried=True):
+        """Tax saved by an 80C deduction under the old regime"""
+        without = self.compute(income, OLD_REGIME, age, salaried=salaried)['total_tax']
+        with_deduction = self.compute(income, OLD_REGIME, age, deduction, salaried=salaried)['total_tax']
+        return without - with_deduction
+
+    def slab_rates(self, regime=OLD_REGIME):
+        """Positive slab rates (%) of a regime for people below 60"""
+        return [float(rate * 100) for rate in self.regimes[regime].slabs[0].rates if rate > 0]
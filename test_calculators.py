@@ -0,0 +1,807 @@
+#!/usr/bin/env python3
+"""
+Tests for the PPF and public funds calculation modules
+These modules have no GUI dependencies and can be tested directly
+"""
+
+import json
+import math
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+import calculations
+from amortization import AmortizationEngine, iter_schedule
+from eligibility_screener import EligibilityScreener, SCHEME_BITS, decode_mask
+from floating_rate import BenchmarkSeries, FloatingRateLoanEngine, RESET_EMI, RESET_TENURE
+from goal_seek import GoalSeekSolver, GOAL_UNREACHABLE
+from growth_kernel import GrowthFactorKernel, DEPOSIT_AT_END
+from public_funds import PublicFundsCalculator
+from paise_backend import (
+    FLOAT_BACKEND, PAISE_BACKEND, emi_totals, recurring_deposit_maturity, round_div, to_paise, to_rate_units
+)
+from parameter_sweep import ParameterSweep
+from payout_calendar import PayoutCalendar
+from prepayment import LoanPrepaymentSimulator, REDUCE_EMI
+from rate_config import RateConfig
+from rate_solver import ImpliedRateSolver, RATE_BELOW_ZERO, RATE_INVALID_OFFER
+from rate_scenarios import RateScenarioEngine, StreamingPercentiles
+from rd_engine import RecurringDepositEngine
+from rate_timeline import RateTimeline, PPF_RATE_HISTORY
+from scheme_registry import default_registry
+from sip_projection import Fund, SipProjectionEngine
+from ssy_simulator import SukanyaSamriddhiSimulator
+from tax_engine import IncomeTaxEngine, TAX_TABLES
+from xirr import XirrEngine, XIRR_NO_BRACKET, XIRR_ONE_SIGNED, pack_cash_flows, xnpv
+from portfolio_store import PortfolioStore
+from ppf_calculator import (
+    PPFCalculator, PPFExtensionOptimizer, PPFAccount, PPFAccountIndex, BATCH_OK, BATCH_BELOW_MIN_DEPOSIT, BATCH_ABOVE_MAX_DEPOSIT
+)
+
+
+def test_ppf_maturity_batch_matches_scalar():
+    """Batch PPF maturity matches the scalar method row by row"""
+    ppf = PPFCalculator()
+    deposits = [400, 500, 12000, 150000, 160000, 75000]
+    years = [15, 15, 20, 15, 15, 1]
+    rates = [7.1, 0, 8.0, 7.1, 7.1, 12.0]
+
+    batch = ppf.calculate_ppf_maturity_batch(deposits, years, rates, backend=FLOAT_BACKEND)
+
+    for i, deposit in enumerate(deposits):
+        result, error = ppf.calculate_ppf_maturity(deposit, years[i], rates[i])
+        if result is None:
+            assert batch['error_code'][i] != BATCH_OK
+            assert ppf.batch_error_message(batch['error_code'][i]) == error
+            assert np.isnan(batch['maturity_amount'][i])
+        else:
+            assert batch['error_code'][i] == BATCH_OK
+            assert round(batch['maturity_amount'][i]) == round(result['maturity_amount'])
+            assert abs(batch['effective_rate'][i] - result['effective_rate']) < 1e-9
+
+    assert batch['error_code'][0] == BATCH_BELOW_MIN_DEPOSIT
+    assert batch['error_code'][4] == BATCH_ABOVE_MAX_DEPOSIT
+
+
+def test_growth_kernel_matches_loop_and_caches():
+    """Closed-form factors match the yearly loop and repeat queries hit the table"""
+    kernel = GrowthFactorKernel(max_entries=2)
+    r = 0.08
+    loop = sum((1 + r) ** (21 - year) for year in range(15))
+
+    assert abs(kernel.annuity_factor(8.0, 15, 21) - loop) < 1e-9
+    assert abs(kernel.annuity_factor(8.0, 15, 21) - loop) < 1e-9
+    assert kernel.annuity_factor(0, 10, timing=DEPOSIT_AT_END) == 10
+    assert kernel.growth_factor(0, 5) == 1
+
+    stats = kernel.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+    assert stats['entries'] == 2
+
+
+def test_monthly_ledger_matches_annual_compounding():
+    """Deposits before the 5th of April reproduce the annual maturity figure"""
+    ppf = PPFCalculator()
+    expected, _ = ppf.calculate_ppf_maturity(150000, 15)
+    deposits = ((date(2010 + year, 4, 3), 150000) for year in range(15))
+
+    last_row = None
+    for last_row in ppf.iter_monthly_ledger(deposits, date(2010, 4, 1), years=14):
+        pass
+    assert last_row['financial_year'] == 2025
+    assert round(last_row['balance']) == round(expected['maturity_amount'])
+
+    early = np.zeros((2, 180), dtype=np.float32)
+    early[:, ::12] = 150000
+    late = np.zeros((2, 180))
+    late[1, 5] = -10000
+    bulk = ppf.run_ledger_bulk(early, late)
+    assert bulk['year_end_balances'].shape == (2, 15)
+    assert round(bulk['year_end_balances'][0, -1]) == round(expected['maturity_amount'])
+    assert bulk['year_end_balances'][1, -1] < bulk['year_end_balances'][0, -1]
+
+
+def test_rate_timeline_growth_and_calculators():
+    """Timeline growth uses the quarterly history and flat timelines match scalar rates"""
+    history = RateTimeline.from_changes('ppf', PPF_RATE_HISTORY, until=date(2024, 1, 1))
+    assert history.rate_at(date(2017, 8, 1)) == 7.8
+    assert history.rate_at(date(2030, 1, 1)) == 7.1
+
+    # FY 2018-19: two quarters at 7.6% then two at 8.0%
+    expected = (1.076 ** 0.5) * (1.08 ** 0.5)
+    assert abs(history.growth(date(2018, 4, 1), date(2019, 4, 1)) - expected) < 1e-12
+
+    ppf = PPFCalculator()
+    flat = RateTimeline.flat('ppf', 7.1)
+    scalar, _ = ppf.calculate_ppf_maturity(150000, 15)
+    timed, _ = ppf.calculate_ppf_maturity(150000, 15, flat, date(2020, 4, 1))
+    assert round(timed['maturity_amount']) == round(scalar['maturity_amount'])
+
+    historical, _ = ppf.calculate_ppf_maturity(150000, 15, history, date(2005, 4, 1))
+    assert historical['maturity_amount'] > scalar['maturity_amount']
+
+
+def test_rate_scenarios_reproducible_across_workers():
+    """Percentiles depend only on the seed, not on how chunks are spread"""
+    serial = RateScenarioEngine(seed=7, paths=4000, chunk_size=1000, max_workers=1)
+    pooled = RateScenarioEngine(seed=7, paths=4000, chunk_size=1000, max_workers=2)
+
+    first = serial.simulate_alternatives(150000, 15)
+    second = pooled.simulate_alternatives(150000, 15)
+    assert first == second
+    assert first['ELSS']['paths'] == 4000
+    assert first['PPF']['p5'] < first['PPF']['p50'] < first['PPF']['p95']
+
+
+def test_streaming_percentiles_keep_out_of_range_tails():
+    """Values beyond the pilot range are counted and not clipped into the edge bins"""
+    values = np.random.default_rng(3).lognormal(0.0, 1.0, 20000)
+    histogram = StreamingPercentiles(0.5, 2.0, bins=2000)
+    for chunk in np.array_split(values, 4):
+        histogram.update(chunk)
+    summary = histogram.summary((1, 50, 99))
+
+    assert summary['out_of_range'] == ((values < 0.5) | (values >= 2.0)).sum()
+    for q in (1, 50, 99):
+        assert abs(summary[f'p{q}'] / np.percentile(values, q) - 1) < 0.01
+
+
+def test_goal_seek_round_trips():
+    """Deposit, tenure and rate solvers agree with each other and the scalar target"""
+    ppf = PPFCalculator()
+    solver = GoalSeekSolver()
+    scalar, _ = ppf.calculate_monthly_target(1000000, 15)
+
+    deposit = solver.required_deposit('ppf', [1000000], 15)
+    assert abs(deposit['required_deposit'][0] - scalar['required_annual']) < 1e-6
+
+    rate = solver.implied_rate('sukanya_samriddhi', [465339.52, 1e12], [10000, 10000], 21)
+    assert abs(rate['implied_rate'][0] - 8.0) < 1e-6
+    assert rate['error_code'][1] == GOAL_UNREACHABLE
+
+    tenure = solver.required_tenure('nsc', [200000], [100000])
+    assert tenure['required_years'][0] == 11
+
+
+def test_extension_optimizer_plans():
+    """Extension plans reach the target cheaply and respect withdrawal limits"""
+    optimizer = PPFExtensionOptimizer()
+
+    plan, error = optimizer.plan_for_target(500000, 10000000)
+    assert error is None
+    assert plan['final_balance'] >= 10000000
+    assert plan['total_deposits'] < 150000 * 35
+
+    # Growth alone gets there, so no deposits are needed
+    plan, _ = optimizer.plan_for_target(4068209, 8000000)
+    assert plan['total_deposits'] == 0
+    assert plan['years'] == 25
+
+    plan, _ = optimizer.plan_for_cash_flow(4068209, 300000, years=20)
+    assert all(block['closing_balance'] >= 0 for block in plan['plan'])
+    assert plan['total_withdrawals'] == 300000 * 20
+
+    # A contributing block cannot withdraw more than 60% of its opening balance:
+    # ₹4L over the first block is 80% of ₹5L, so only the uncapped plan holds
+    uncapped = PPFExtensionOptimizer()
+    uncapped.withdrawal_limit = 10.0
+    plan, error = uncapped.plan_for_cash_flow(500000, 80000, years=10)
+    assert error is None and plan['plan'][0]['with_contribution']
+    _, error = optimizer.plan_for_cash_flow(500000, 80000, years=10)
+    assert error is not None
+
+    # ₹5L over the first block is 50% of ₹10L, so the cap does not bind
+    plan, error = optimizer.plan_for_cash_flow(1000000, 100000, years=20)
+    assert error is None and plan['plan'][0]['with_contribution']
+
+    # Transitions are cached per withdrawal, so the cache stays bounded
+    for need in range(10000, 10000 + 20 * 1000, 1000):
+        optimizer.plan_for_cash_flow(4068209, need, years=5)
+    assert len(optimizer._transitions) == optimizer.max_transitions
+
+
+def test_account_eligibility_follows_ppf_rules():
+    """Loan and withdrawal limits come from the right year-end balances"""
+    account = PPFAccount.from_deposits([150000] * 15, 7.1)
+    assert round(account.balance_at(1)) == 160650
+
+    assert account.max_loan(2) == 0
+    assert account.max_loan(3) == account.balance_at(1) * 0.25
+    assert account.max_loan(7) == 0
+
+    assert account.max_withdrawal(6) == 0
+    assert account.max_withdrawal(8) == min(account.balance_at(4), account.balance_at(7)) * 0.5
+
+    # The batch index gives the same answers for many accounts at once
+    index = PPFAccountIndex.from_deposits(np.full((3, 15), 150000.0), 7.1)
+    limits, eligible = index.loan_limits([2, 3, 5])
+    assert list(eligible) == [False, True, True]
+    assert limits[2] == account.max_loan(5)
+
+    calc = PPFCalculator()
+    assert calc.calculate_loan_against_ppf(account=account, year=3)['max_loan_amount'] == account.max_loan(3)
+    with pytest.raises(ValueError):
+        calc.calculate_loan_against_ppf(account=account)
+    with pytest.raises(ValueError):
+        calc.calculate_partial_withdrawal(account=account)
+
+
+def test_portfolio_store_matches_scheme_calculators():
+    """Columnar maturity values agree with the per-holding calculators"""
+    calc = PublicFundsCalculator()
+    store = PortfolioStore(capacity=2)
+    store.append('ppf', 150000, date(2010, 4, 1))
+    store.append('sukanya_samriddhi', 150000, date(2010, 4, 1))
+    store.append('nsc', 100000, date(2020, 1, 1), owner_id=7)
+    store.append('post_office_rd', 1000, date(2020, 1, 1), owner_id=7)
+
+    maturity = store.maturity()['value']
+    expected = [
+        calc.calculate_ppf(150000, 15)['maturity_amount'],
+        calc.calculate_sukanya_samriddhi(150000, 21)['maturity_amount'],
+        calc.calculate_nsc(100000, 5)['maturity_amount'],
+        calc.calculate_post_office_rd(1000, 5)['maturity_amount']
+    ]
+    assert np.allclose(maturity, expected)
+
+    values = store.valuation(date(2022, 1, 1))['value']
+    by_owner = store.group_by(values, by='owner')
+    assert abs(by_owner[7] - values[2:].sum()) < 1e-6
+    assert len(store.filter(scheme='nsc')) == 1
+    mask = np.ones(len(store), dtype=bool)
+    assert len(store.filter(mask=mask, owner_id=7)) == 2 and mask.all()  # caller's mask untouched
+
+
+def test_compare_all_schemes_batch_matches_scalar():
+    """Registry kernels agree with compare_all_schemes for every investor"""
+    calc = PublicFundsCalculator()
+    amounts = [50000, 100000, 1500000, 3000000]
+    years = [3, 5, 15, 15]
+
+    batch = calc.compare_all_schemes_batch(amounts, years, backend=FLOAT_BACKEND)
+
+    for i, amount in enumerate(amounts):
+        scalar = calc.compare_all_schemes(amount, years[i])
+        assert {label for label, columns in batch.items() if columns['eligible'][i]} == set(scalar)
+        for label, result in scalar.items():
+            assert abs(batch[label]['maturity_amount'][i] - result['maturity_amount']) < 1e-6
+            assert abs(batch[label]['interest_earned'][i] - result['interest_earned']) < 1e-6
+    assert np.isnan(batch['PPF']['maturity_amount'][3])
+
+    # Limits come from the scheme details rather than copies in the specs
+    details = calc.snapshot.mutable_scheme_details()
+    details['ppf']['max_deposit'] = 200000
+    assert default_registry(details)['PPF'].eligible(3000000, 15)
+    assert not calc.registry['PPF'].eligible(3000000, 15)
+
+
+def test_parameter_sweep_matches_scalar_and_workers():
+    """Grid sweeps agree with the scalar calculators and across worker counts"""
+    amounts = np.linspace(10000, 150000, 8)
+    tenures = np.arange(1, 21)
+    rates = np.linspace(5, 9, 5)
+
+    serial = ParameterSweep(max_workers=1).compare_with_alternatives(amounts, tenures, rates)
+    shared = ParameterSweep(chunk_size=100, max_workers=2).compare_with_alternatives(amounts, tenures, rates)
+    for name, values in serial.items():
+        assert values.shape == (8, 20, 5)
+        assert np.allclose(values, shared[name])
+
+    expected = PPFCalculator().compare_with_alternatives(amounts[2], 15, rates[1])
+    assert abs(serial['PPF'][2, 14, 1] - expected['PPF']['maturity']) < 1e-6
+    assert abs(serial['ELSS'][2, 14, 1] - expected['ELSS']['maturity']) < 1e-6
+
+    loans = ParameterSweep(max_workers=1).compare_loans([120000], [1, 2], [0, 12])
+    assert abs(loans['emi'][0, 0, 0] - 10000) < 1e-9
+    assert abs(loans['emi'][0, 1, 1] - 5648.82) < 0.01
+
+    empty = ParameterSweep(max_workers=2).compare_loans([], [1, 2], [12])
+    assert empty['emi'].shape == (0, 2, 1)
+
+    # Scheme limits follow the calculator's own details; tenures must be whole years
+    calc = PublicFundsCalculator()
+    calc.scheme_details['ppf']['max_deposit'] = 200000
+    local = ParameterSweep(max_workers=1, calculator=calc).compare_all_schemes([3000000], [15], [7.1])
+    assert np.isnan(ParameterSweep(max_workers=1).compare_all_schemes([3000000], [15], [7.1])['PPF']).all()
+    assert np.isfinite(local['PPF']).all()
+    with pytest.raises(ValueError):
+        ParameterSweep(max_workers=1).compare_with_alternatives([150000], [15.5], [7.1])
+
+
+def test_tax_engine_slabs_and_tax_implications():
+    """Slab tax matches hand-computed figures and feeds the tax implications"""
+    engine = IncomeTaxEngine('2024-25')
+    assert np.allclose(engine.compute([1000000, 775000], 'new')['total_tax'], [44200, 0])
+    assert np.allclose(engine.compute(1000000, 'old', deductions_80c=150000)['total_tax'], 75400)
+    # Marginal relief just above the FY 2025-26 rebate limit
+    assert np.allclose(IncomeTaxEngine('2025-26').compute(1285000, 'new')['total_tax'], 10400)
+
+    calc = PublicFundsCalculator()
+    scalar = calc.calculate_tax_implications(calc.compare_all_schemes(100000, 5), annual_income=1500000)
+    schemes = calc.compare_all_schemes_batch([100000, 100000], 5, backend=FLOAT_BACKEND)
+    batch = calc.calculate_tax_implications_batch(schemes, [1500000, 300000])
+    for scheme, result in scalar.items():
+        assert abs(batch[scheme]['net_return'][0] - result['net_return']) < 1e-6
+    assert batch['NSC']['tax_amount'][1] == 0
+
+    # A zero 80C limit leaves the other old-regime deductions in place
+    tables = {'2024-25': {'old': dict(TAX_TABLES['2024-25']['old'], deduction_80c=0)}}
+    no_80c = IncomeTaxEngine('2024-25', tables).compute(1000000, 'old', 150000, savings_interest=10000)
+    assert np.allclose(no_80c['deductions'], 60000)
+
+    # 80C savings per slab include the 4% cess
+    assert PPFCalculator().calculate_tax_benefits(150000)['max_benefit'] == pytest.approx(150000 * 0.30 * 1.04)
+
+
+def test_eligibility_screener_matches_scalar_rules(tmp_path):
+    """Bulk screening agrees with get_scheme_eligibility and honours holdings"""
+    source = tmp_path / 'customers.csv'
+    source.write_text(
+        'customer_id,age,gender,resident,holdings\n'
+        'A1,8,female,yes,0\n'
+        'A2,65,male,yes,0\n'
+        'A3,35,M,no,0\n'
+        'A4,5,F,yes,' + str(SCHEME_BITS['PPF']) + '\n'
+    )
+    output = tmp_path / 'eligibility.csv'
+
+    summary = EligibilityScreener(chunk_rows=2).screen_file(source, output)
+
+    rows = output.read_text().splitlines()[1:]
+    masks = {customer: int(mask) for customer, mask in (row.split(',') for row in rows)}
+    assert list(masks) == ['A1', 'A2', 'A3', 'A4']
+    assert summary['customers'] == 4
+
+    calc = PublicFundsCalculator()
+    for customer, age, gender in (('A1', 8, 'female'), ('A2', 65, 'male')):
+        expected = [label for label, rule in calc.get_scheme_eligibility(age, gender).items() if rule['eligible']]
+        assert decode_mask(masks[customer]) == expected
+    assert masks['A3'] == 0
+    assert decode_mask(masks['A4']) == ['NSC', 'Sukanya_Samriddhi', 'KVP']
+
+
+def test_payout_calendar_merges_in_date_order():
+    """Merged SCSS and MIS payouts are chronological and add up to the scalar totals"""
+    calc = PublicFundsCalculator()
+    calendar = PayoutCalendar(calc)
+    calendar.add_holding('senior_citizen_savings', 1000000, date(2024, 4, 1))
+    calendar.add_holding('post_office_mis', 900000, date(2024, 1, 31))
+    calendar.add_holding('senior_citizen_savings', 500000, date(2024, 5, 17), owner_id=3)
+
+    payouts = list(calendar.payouts())
+    dates = [p['date'] for p in payouts]
+    assert dates == sorted(dates)
+
+    def interest(holding_id):
+        return [p['amount'] for p in payouts if p['holding_id'] == holding_id and p['kind'] == 'interest']
+
+    assert abs(sum(interest(0)) - calc.calculate_senior_citizen_savings(1000000, 5)['interest_earned']) < 1e-6
+    assert len(interest(1)) == 60
+    assert abs(sum(interest(1)) - calc.calculate_post_office_mis(900000)['annual_income'] * 5) < 1e-6
+    assert dates[0] == date(2024, 2, 29)
+
+    months = list(calendar.aggregate('monthly'))
+    assert abs(sum(m['total'] for m in months) - sum(p['amount'] for p in payouts)) < 1e-6
+    assert all(m['period'].day == 1 for m in months)
+    window = list(calendar.payouts(date(2025, 1, 1), date(2025, 3, 31)))
+    assert all(date(2025, 1, 1) <= p['date'] <= date(2025, 3, 31) for p in window)
+
+
+def test_rd_engine_ledger_defaults_and_rebates():
+    """Quarterly-compounded RD ledger matches the bulk path, with fees and rebates"""
+    engine = RecurringDepositEngine(6.7)
+    regular, _ = engine.installment_ledger(100)
+    # Month-by-month passbook: interest accrues on each month's balance and
+    # is credited at every quarter end
+    balance = accrued = 0.0
+    for month in range(60):
+        balance += 100
+        accrued += balance * 0.067 / 12
+        if month % 3 == 2:
+            balance, accrued = balance + accrued, 0.0
+    assert abs(regular['maturity_amount'] - balance) < 1e-9
+    assert round(regular['maturity_amount'], 2) == 7136.73
+    assert recurring_deposit_maturity(to_paise(100), 60, to_rate_units(6.7))[0] == 713673
+
+    schedule = list(range(60))
+    schedule[10] = schedule[11] = 12      # two late installments, 3 months of delay
+    schedule[20] = None                   # one never paid
+    schedule[30:42] = [30] * 12           # a year paid in advance
+    account, _ = engine.installment_ledger(1000, schedule)
+    assert account['default_fees'] == 30
+    assert account['advance_rebates'] == 400
+    assert account['total_deposited'] == 59000
+
+    paid = np.array([[np.nan if month is None else month for month in schedule], list(range(60))])
+    batch = engine.maturity_batch([1000, 100], paid_months=paid)
+    assert abs(batch['maturity_amount'][0] - account['maturity_amount']) < 1e-6
+    assert abs(batch['net_gain'][0] - account['net_gain']) < 1e-6
+    assert abs(batch['maturity_amount'][1] - regular['maturity_amount']) < 1e-9
+    assert abs(engine.maturity_batch(100)['maturity_amount'][0] - regular['maturity_amount']) < 1e-9
+
+    calc = PublicFundsCalculator()
+    calc.rates['post_office_rd'] = 6.7
+    assert abs(calc.calculate_post_office_rd(100, 5)['maturity_amount'] - regular['maturity_amount']) < 1e-9
+
+
+def test_ssy_simulator_withdrawal_and_defaults():
+    """SSY simulation matches the scheme calculator and a year-by-year loop"""
+    calc = PublicFundsCalculator()
+    simulator = SukanyaSamriddhiSimulator(calc)
+
+    regular, error = simulator.simulate(date(2020, 6, 1), date(2021, 4, 1), [150000] * 15)
+    assert error is None
+    assert abs(regular['maturity_amount'] - calc.calculate_sukanya_samriddhi(150000, 21)['maturity_amount']) < 1e-6
+    assert regular['maturity_date'] == date(2042, 4, 1)
+
+    # Half the balance withdrawn in the first account year after she turns 18
+    result, _ = simulator.simulate(date(2020, 6, 1), date(2021, 4, 1), [150000] * 15, 0.5)
+    balance = 0.0
+    for year in range(21):
+        if year == result['withdrawal_year']:
+            withdrawal = balance * 0.5
+            balance -= withdrawal
+        if year < 15:
+            balance += 150000
+        balance *= 1.08
+    assert abs(result['withdrawal_amount'] - withdrawal) < 1e-6
+    assert abs(result['maturity_amount'] - balance) < 1e-6
+
+    irregular, _ = simulator.simulate(date(2020, 6, 1), date(2021, 4, 1), [200000, 100, 1000])
+    assert irregular['excess_refunded'] == 50000
+    assert irregular['default_years'] == 13
+    assert irregular['default_penalty'] == 650
+
+    batch = simulator.simulate_batch([date(2020, 6, 1), date(2005, 1, 1)], [date(2021, 4, 1)] * 2,
+                                     [[150000] * 15, [1000] * 15])
+    assert batch['error_code'][1] != 0
+    assert abs(batch['maturity_amount'][0] - regular['maturity_amount']) < 1e-9
+
+    # A girl aged 10 (in completed years) can still open an account, as the screener says
+    aged_ten, error = simulator.simulate(date(2010, 6, 1), date(2021, 1, 1), [1000] * 15)
+    assert error is None and calc.get_scheme_eligibility(10, 'female')['Sukanya_Samriddhi']['eligible']
+    assert simulator.simulate(date(2010, 1, 1), date(2021, 4, 1), [1000] * 15)[0] is None
+    assert not calc.get_scheme_eligibility(11, 'female')['Sukanya_Samriddhi']['eligible']
+
+
+def test_paise_backend_matches_decimal_passbook():
+    """Integer-paise results equal a Decimal passbook rounded at every credit"""
+    assert to_paise([0.005, 1.015, -2.5]).tolist() == [1, 102, -250]
+    assert round_div(np.array([5, -5, 4]), 10).tolist() == [1, -1, 0]
+
+    # PPF: yearly credit rounded to the nearest rupee
+    balance = Decimal(0)
+    for _ in range(15):
+        balance += Decimal('123456.78')
+        balance += (balance * Decimal('0.071')).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    batch = PPFCalculator().calculate_ppf_maturity_batch([123456.78, 150000], 15, backend=PAISE_BACKEND)
+    assert Decimal(str(batch['maturity_amount'][0])) == balance
+    # Paise is the bulk default
+    default = PPFCalculator().calculate_ppf_maturity_batch([123456.78], 15)
+    assert Decimal(str(default['maturity_amount'][0])) == balance
+    float_batch = PPFCalculator().calculate_ppf_maturity_batch([150000], 15, backend=FLOAT_BACKEND)
+    assert abs(batch['maturity_amount'][1] - float_batch['maturity_amount'][0]) < 15
+
+    # Paise scheme comparisons invest the same paisa-rounded deposits they mature
+    paise_schemes = PublicFundsCalculator().compare_all_schemes_batch([100000], 15, backend=PAISE_BACKEND)
+    assert paise_schemes['PPF']['total_invested'][0] == pytest.approx(6666.67 * 15)
+
+    # RD: monthly product, quarterly credit rounded to the paisa
+    balance, accrued = Decimal(0), Decimal(0)
+    for month in range(60):
+        balance += Decimal(100)
+        accrued += balance * Decimal('0.067') / 12
+        if month % 3 == 2:
+            balance += accrued.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            accrued = Decimal(0)
+    rd = recurring_deposit_maturity(to_paise(100), 60, to_rate_units(6.7))
+    assert Decimal(int(rd[0])) / 100 == balance
+
+    # EMI: installments repay principal plus exactly the interest charged
+    emi, final, interest = emi_totals(to_paise([500000, 120000]), [60, 12], to_rate_units([8.5, 0]))
+    assert ((emi * np.array([59, 11]) + final) == to_paise([500000, 120000]) + interest).all()
+    assert interest[1] == 0
+
+    # The app's calculation core takes the same kernels
+    loan = calculations.calculate_loan(500000, 8.5, 5, PAISE_BACKEND)
+    assert loan.emi == emi[0] / 100 and loan.total_interest == interest[0] / 100
+    balance = Decimal(0)
+    for _ in range(12):
+        balance += Decimal('1000.00')
+        balance += (balance * Decimal('0.065') / 12).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    assert Decimal(str(calculations.calculate_rd(1000, 6.5, 12, PAISE_BACKEND).maturity_amount)) == balance
+    assert calculations.calculate_fd(10000, 7, 2, PAISE_BACKEND).maturity_amount == 11449
+
+
+def test_rate_config_hot_reload_swaps_snapshots(tmp_path):
+    """A new file version is picked up by refresh(); old snapshots stay intact"""
+    path = tmp_path / 'rates.json'
+    path.write_text(json.dumps({'version': 'q1', 'rates': {'ppf': 7.1, 'nsc': 7.7}}))
+    config = RateConfig(str(path), check_interval=0)
+    ppf, funds = PPFCalculator(config), PublicFundsCalculator(config)
+    first = funds.snapshot
+    assert ppf.calculate_ppf_maturity(150000)[0]['rate_version'] == 'q1'
+    assert funds.calculate_nsc(10000)['rate'] == 7.7
+    assert funds.calculate_nsc(10000)['rate_version'] == 'q1'
+
+    path.write_text(json.dumps({
+        'version': 'q2',
+        'rates': {'ppf': 7.5, 'nsc': 7.9},
+        'scheme_details': {'ppf': {'max_deposit': 200000}, 'post_office_rd': {'min_deposit': 500}}
+    }))
+    assert funds.calculate_nsc(10000)['rate_version'] == 'q1'  # pinned until refresh
+    pinned = ppf.terms
+    assert ppf.refresh() and funds.refresh()
+    # refresh() swaps the whole bundle, so a reader holding the old one sees only q1
+    assert pinned.rate_version == 'q1' and pinned.current_rate == 7.1 and pinned.max_deposit == 150000
+    results = [ppf.calculate_tax_benefits(150000), ppf.calculate_extension_benefits(1000000),
+               ppf.calculate_loan_against_ppf(100000), ppf.calculate_partial_withdrawal(100000),
+               *ppf.compare_with_alternatives(150000).values()]
+    assert all(result['rate_version'] == 'q2' for result in results)
+    assert ppf.current_rate == 7.5 and ppf.calculate_ppf_maturity(150000)[0]['rate_version'] == 'q2'
+    assert funds.compare_all_schemes_batch([10000])['NSC']['rate'] == 7.9
+    assert funds.registry['PPF'].max_deposit == 200000 and ppf.max_deposit == 200000
+    engine = RecurringDepositEngine(6.7, config=config)
+    assert engine.installment_ledger(100) == (None, "Minimum installment is ₹500")
+
+    # Snapshots are immutable; a torn or broken file keeps the last good one
+    assert first.rates['nsc'] == 7.7
+    with pytest.raises(TypeError):
+        first.rates['nsc'] = 9.0
+    path.write_text('{"version": "q3", "rates": ')
+    assert config.current().version == 'q2'
+    assert not funds.refresh()
+
+    # The file is read lazily: a missing one falls back to the built-in rates
+    assert RateConfig(str(tmp_path / 'missing.json')).current().version == 'builtin-2024'
+    path.write_text(json.dumps({'version': 'q4'}))
+    assert RateConfig(str(path), check_interval=3600).current().version == 'q4'
+
+
+def test_headless_calculations_match_app_formulas():
+    """The calculation core reproduces the app maths without importing Kivy"""
+    import subprocess
+    import sys
+    loaded = subprocess.run(
+        [sys.executable, '-c', 'import sys, calculations; print(any(m.split(".")[0] in '
+                               '("kivy", "kivymd", "requests") for m in sys.modules))'],
+        capture_output=True, text=True, check=True
+    )
+    assert loaded.stdout.strip() == 'False'
+
+    emi = calculations.calculate_emi(100000, 10, 12)
+    r = 10 / 1200
+    assert abs(emi.emi - 100000 * r * (1 + r)**12 / ((1 + r)**12 - 1)) < 1e-9
+    assert calculations.calculate_emi(120000, 0, 12).emi == 10000
+    assert calculations.calculate_loan(500000, 8.5, 5) == calculations.calculate_emi(500000, 8.5, 60)
+    assert set(calculations.compare_loans(500000, 5)) == set(calculations.LOAN_TYPE_RATES)
+
+    assert calculations.calculate_rd(1000, 0, 12).maturity_amount == 12000
+    assert abs(calculations.calculate_fd(10000, 7, 2).interest_earned - 1449) < 1e-9
+    gst = calculations.add_gst(1000, 18)
+    assert gst.total_amount == 1180 and gst.cgst == 90
+    assert abs(calculations.remove_gst(1180, 18).base_amount - 1000) < 1e-9
+
+    comparison = calculations.compare_investments(100000, 10)
+    assert comparison.best_option == 'PPF'
+    assert abs(comparison.highest_return - 100000 * 1.075**10) < 1e-6
+    assert calculations.convert_currency(10, 'usd', 'INR').converted == 830
+    assert calculations.exchange_rate('INR', 'INR') == 1.0
+    assert calculations.exchange_rate('JPY', 'INR') is None
+
+
+def test_amortization_chunks_match_lazy_schedule(tmp_path):
+    """Chunked (loans x months) schedules equal the per-loan generator and stream to disk"""
+    principals, rates, months = [500000, 120000, 2500000], [8.5, 0, 9.25], [240, 12, 360]
+    engine = AmortizationEngine(chunk_rows=2)
+    blocks = list(engine.chunks(principals, rates, months))
+    assert [start for start, _, _ in blocks] == [0, 2]
+
+    for loan, (principal, rate, tenure) in enumerate(zip(principals, rates, months)):
+        rows = list(iter_schedule(principal, rate, tenure))
+        start, _, block = blocks[loan // 2]
+        for name in ('payment', 'interest', 'principal', 'balance'):
+            lazy = np.array([row[name] for row in rows])
+            assert np.allclose(block[name][loan - start, :tenure], lazy, atol=1e-6)
+            assert not block[name][loan - start, tenure:].any()
+        assert rows[-1]['balance'] == 0
+        assert abs(sum(row['principal'] for row in rows) - principal) < 1e-6
+
+    csv_path = tmp_path / 'schedule.csv'
+    assert engine.write_csv(csv_path, principals, rates, months) == sum(months)
+    lines = csv_path.read_text().splitlines()
+    assert lines[0] == 'loan_id,month,payment,interest,principal,balance'
+    assert lines[241] == '1,1,10000.00,0.00,10000.00,110000.00'
+
+    binary_path = tmp_path / 'schedule.npy'
+    assert engine.write_binary(binary_path, principals, rates, months) == (3, 360, 4)
+    binary = np.load(binary_path, mmap_mode='r')
+    assert np.allclose(binary[2, :, 3], blocks[1][2]['balance'][0])
+
+
+def test_prepayment_edits_match_fresh_simulation():
+    """Suffix recomputation after edits gives the same plan as starting over"""
+    loan = LoanPrepaymentSimulator(5000000, 8.5, 360)
+    assert loan.summary()['months'] == 360
+    assert abs(loan.summary()['total_interest'] - loan.base.total_interest) < 1e-3
+
+    yearly = loan.add_recurring(100000, 12)
+    lump = loan.add_lump_sum(24, 500000)
+    shorter = loan.summary()
+    assert shorter['months'] < 360 and shorter['interest_saved'] > 0
+    assert shorter['final_emi'] == loan.base.emi
+
+    loan.edit_prepayment(lump, amount=750000, month=60)
+    loan.set_mode(REDUCE_EMI)
+    loan.remove_prepayment(yearly)
+    edited = loan.summary()
+
+    fresh = LoanPrepaymentSimulator(5000000, 8.5, 360, REDUCE_EMI)
+    fresh.add_lump_sum(60, 750000)
+    expected = fresh.summary()
+    assert edited['months'] == expected['months'] == 360
+    for name in ('final_emi', 'total_interest', 'total_prepaid', 'interest_saved'):
+        assert abs(edited[name] - expected[name]) < 1e-6
+    assert edited['final_emi'] < loan.base.emi
+    assert loan.schedule()[-1]['balance'] == 0
+
+
+def test_floating_rate_book_matches_monthly_repricing():
+    """Segment-wise closed form equals re-pricing the loan month by month"""
+    benchmark = BenchmarkSeries([(date(2022, 4, 1), 4.0), (date(2022, 6, 8), 4.5), (date(2023, 2, 1), 5.0)])
+    engine = FloatingRateLoanEngine(benchmark)
+
+    def monthly(principal, spread, months, first_month, policy):
+        balance, emi, rate, remaining, interest, elapsed = principal, None, None, months, 0.0, 0
+        while remaining:
+            year, month = divmod(first_month.month - 1 + elapsed, 12)
+            current = (benchmark.rate_for_month((first_month.year + year - 1970) * 12 + month) + spread) / 1200
+            if emi is None:
+                emi = calculations.calculate_emi(principal, current * 1200, months).emi
+            elif current != rate and policy == RESET_TENURE:
+                remaining = math.ceil(-math.log(1 - balance * current / emi) / math.log1p(current) - 1e-9)
+            elif current != rate:
+                emi = calculations.calculate_emi(balance, current * 1200, remaining).emi
+            rate = current
+            interest += balance * rate
+            balance += balance * rate - (balance * (1 + rate) if remaining == 1 else emi)
+            remaining -= 1
+            elapsed += 1
+        return interest, elapsed, emi
+
+    loans = [(2500000, 2.75, 240, date(2022, 5, 1), RESET_EMI),
+             (2500000, 2.75, 240, date(2022, 5, 1), RESET_TENURE),
+             (800000, 3.5, 60, date(2022, 9, 1), RESET_EMI)]
+    book = engine.run_book(*[list(column) for column in zip(*loans)])
+    for row, loan in enumerate(loans):
+        interest, months, emi = monthly(*loan)
+        assert abs(book['total_interest'][row] - interest) < 1e-4
+        assert book['months'][row] == months and abs(book['final_emi'][row] - emi) < 1e-6
+    assert book['resets'].tolist() == [2, 2, 1]
+    assert book['final_emi'][0] > book['initial_emi'][0]
+    assert book['final_emi'][1] == book['initial_emi'][1] and book['months'][1] > 240
+
+    # A flat benchmark is a fixed-rate loan
+    flat = FloatingRateLoanEngine(BenchmarkSeries([(date(2020, 1, 1), 6.0)]))
+    single = flat.simulate_loan(1000000, 2.5, 120, date(2024, 1, 1))
+    fixed = calculations.calculate_emi(1000000, 8.5, 120)
+    assert abs(single['total_interest'] - fixed.total_interest) < 1e-6 and single['resets'] == 0
+
+
+def test_implied_rate_inverts_calculate_emi():
+    """Solved rates reproduce calculate_emi, including zero-rate and no-cost offers"""
+    offers = [(500000, 10.5, 60), (2500000, 8.4, 240), (150000, 0, 12), (40000, 36, 6), (75000, 0.0001, 18)]
+    emis = [calculations.calculate_emi(p, rate, n).emi for p, rate, n in offers]
+    principals, rates, months = (list(column) for column in zip(*offers))
+    solved = ImpliedRateSolver().implied_rate(principals, emis, months)
+    assert solved['converged'].all() and not solved['error_code'].any()
+    assert np.allclose(solved['annual_rate'], rates, atol=1e-6)
+    assert solved['annual_rate'][2] == 0
+
+    # No-cost EMI: 6 x 5000 on 30000, but a 500 processing fee is a real cost
+    no_cost = ImpliedRateSolver().implied_rate([30000, 30000, 30000], 5000, 6, fees=[0, 500, 0],
+                                               advance_emis=[0, 0, 1])
+    assert no_cost['annual_rate'][0] == 0
+    net_emi = calculations.calculate_emi(29500, no_cost['annual_rate'][1], 6).emi
+    assert abs(net_emi - 5000) < 1e-6
+    assert no_cost['annual_rate'][2] == 0
+
+    bad = ImpliedRateSolver().implied_rate([30000, 0], [4000, 100], [6, 6])
+    assert bad['error_code'].tolist() == [RATE_BELOW_ZERO, RATE_INVALID_OFFER]
+    assert np.isnan(bad['annual_rate']).all() and not bad['converged'].any()
+
+
+def test_xirr_batch_solves_padded_portfolios():
+    """Batched XIRR zeroes the XNPV of every portfolio and ranks by timing"""
+    portfolios = [
+        [(date(2020, 1, 1), -10000), (date(2020, 6, 1), -5000), (date(2021, 3, 15), 3000), (date(2022, 12, 31), 14000)],
+        [(date(2021, 1, 1), -100), (date(2022, 1, 1), 110)],
+        [(date(2021, 1, 1), -100), (date(2026, 1, 1), 1)],
+        [(date(2021, 1, 1), 100), (date(2022, 1, 1), 5)],
+        [(date(2021, 1, 1), -100), (date(2021, 1, 2), 1000)]
+    ]
+    years, amounts = pack_cash_flows(portfolios)
+    assert years.shape == (5, 4) and amounts[1, 2:].tolist() == [0, 0]
+
+    result = XirrEngine().xirr_batch(portfolios)
+    assert result['converged'][:3].all()
+    for row in range(3):
+        assert abs(xnpv(result['xirr'][row], portfolios[row])) < 1e-6
+    assert abs(result['xirr'][1] - 10) < 1e-9
+    assert result['xirr'][2] < -50
+    assert result['error_code'][3:].tolist() == [XIRR_ONE_SIGNED, XIRR_NO_BRACKET]
+
+    # An XNPV of exactly zero on the bracketing grid is the root itself
+    flat = XirrEngine().solve([[0, 1], [0, 2]], [[-100, 100], [-100, 121]])
+    assert flat['converged'].all() and flat['error_code'].tolist() == [0, 0]
+    assert flat['xirr'][0] == 0 and abs(flat['xirr'][1] - 10) < 1e-9
+    zero_rates = dict.fromkeys(['Fixed Deposit', 'Recurring Deposit', 'Mutual Fund SIP', 'PPF'], 0)
+    zero = calculations.compare_investments(100000, 10, rates=zero_rates).annualized_returns
+    assert all(abs(value) < 1e-9 for value in zero.values())
+
+    # Equal terminal values can hide very different returns once timing counts
+    comparison = calculations.compare_investments(100000, 10).annualized_returns
+    assert abs(comparison['Fixed Deposit'] - 6) < 1e-9 and abs(comparison['PPF'] - 7.5) < 1e-9
+    assert comparison['Mutual Fund SIP'] > 12
+    bare = calculations.InvestmentComparison(100000, 10, maturities={'Fixed Deposit': 179085})
+    assert math.isnan(bare.annualized_returns['Fixed Deposit'])
+    assert calculations.InvestmentComparison(100000, 10).annualized_returns == {}
+    alternatives = PPFCalculator().compare_with_alternatives(150000)
+    assert abs(alternatives['PPF']['xirr'] - 7.1) < 1e-9 and abs(alternatives['NSC']['xirr'] - 6.8) < 1e-9
+
+
+def test_step_up_sip_projection_matches_monthly_loop(tmp_path):
+    """Vectorized multi-fund series equal a month-by-month simulation"""
+    funds = [Fund('Equity', 12), Fund('Debt', 7, 4), Fund('Gold', 8, 1)]
+    engine = SipProjectionEngine(funds)
+    projection = engine.project([10000, 5000, 0], 60, allocations=[[0.6, 0.3, 0.1], [0, 1, 0], [0, 0, 1]],
+                                step_up=[10, 0, 0], pause_start=[24, 60, 0], pause_end=[30, 60, 0],
+                                lump_sums=[0, 100000, 50000], deposit_at_start=[False, True, False],
+                                per_fund=True)
+    assert projection['value'].shape == (3, 60) and projection['month'][-1] == 60
+
+    allocations = [[0.6, 0.3, 0.1], [0, 1, 0], [0, 0, 1]]
+    for row, (monthly, step, pause, lump, start) in enumerate([(10000, 10, (24, 30), 0, False),
+                                                               (5000, 0, (60, 60), 100000, True),
+                                                               (0, 0, (0, 0), 50000, False)]):
+        balances = [lump * weight for weight in allocations[row]]
+        invested = lump
+        for month in range(60):
+            paid = 0.0 if pause[0] <= month < pause[1] else monthly * (1 + step / 100) ** (month // 12)
+            invested += paid
+            for index, fund in enumerate(funds):
+                share = paid * allocations[row][index]
+                balances[index] = ((balances[index] + share) * fund.monthly_growth if start
+                                   else balances[index] * fund.monthly_growth + share)
+            assert abs(projection['value'][row, month] - sum(balances)) < 1e-6
+            assert abs(projection['invested'][row, month] - invested) < 1e-6
+        assert np.allclose(projection['fund_values'][row, :, -1], balances)
+    assert not projection['contribution'][0, 24:30].any()
+
+    # Without a step-up the comparison screen, built on the same engine,
+    # reproduces the flat lump-sum, RD and SIP formulas
+    flat = calculations.compare_investments(120000, 5).maturities
+    assert math.isclose(flat['Fixed Deposit'], 120000 * 1.06 ** 5)
+    assert math.isclose(flat['PPF'], 120000 * 1.075 ** 5)
+    assert math.isclose(flat['Recurring Deposit'], calculations.calculate_rd(2000, 6.5, 60).maturity_amount)
+    assert math.isclose(flat['Mutual Fund SIP'], 2000 * (1.01 ** 60 - 1) / 0.01)
+
+    # A step-up raises the SIP instalments every year
+    comparison = calculations.compare_investments(120000, 5, step_up=10)
+    assert len(comparison.series['Mutual Fund SIP']) == 60
+    assert comparison.invested['Mutual Fund SIP'][-1] > 120000
+    assert comparison.series['PPF'][-1] == comparison.maturities['PPF']
+
+    report = tmp_path / 'projection.csv'
+    assert engine.write_report(report, projection, customer_ids=[101, 102, 103]) == 180
+    lines = report.read_text().splitlines()
+    assert lines[0] == 'customer_id,month,contribution,invested,value'
+    assert lines[1].startswith('101,1,10000.00,10000.00,') and lines[-1].startswith('103,60,0.00,50000.00,')
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,151 @@
+"""
+XIRR Module
+XNPV and XIRR for dated cash flows, batched over many portfolios
+"""
+
+import numpy as np
+
+DAYS_PER_YEAR = 365.0
+
+# Per-row error codes
+XIRR_OK = 0
+XIRR_ONE_SIGNED = 1       # flows are all inflows or all outflows
+XIRR_NO_BRACKET = 2       # no sign change of XNPV between -99.99% and +2,000,000%
+XIRR_NOT_CONVERGED = 3
+
+# Bracketing grid in x = log(1 + rate); rows solve on x so every rate > -100%
+_GRID = np.concatenate((np.linspace(-9.0, -1.0, 9), np.linspace(-0.9, 0.9, 19), np.linspace(1.0, 10.0, 10)))
+
+
+def pack_cash_flows(portfolios):
+    """Pad lists of (date, amount) pairs into (portfolios, flows) arrays
+
+    Returns year offsets from each portfolio's first date and amounts;
+    padding has amount 0, so it adds nothing to the XNPV.
+    """
+    width = max((len(flows) for flows in portfolios), default=0)
+    days = np.zeros((len(portfolios), width))
+    amounts = np.zeros((len(portfolios), width))
+    for row, flows in enumerate(portfolios):
+        if not flows:
+            continue
+        dates = np.array([when for when, _ in flows], dtype='datetime64[D]')
+        days[row, :len(flows)] = (dates - dates.min()).astype(np.float64)
+        amounts[row, :len(flows)] = [amount for _, amount in flows]
+    return days / DAYS_PER_YEAR, amounts
+
+
+def xnpv_array(rates, years, amounts):
+    """XNPV per row of padded (rows, flows) arrays at annual `rates` (fractions)"""
+    rates = np.asarray(rates, dtype=np.float64)
+    discount = np.log1p(rates)[..., None] if rates.ndim else np.log1p(rates)
+    return (amounts * np.exp(-discount * years)).sum(axis=-1)
+
+
+def xnpv(rate, cash_flows):
+    """XNPV of one list of (date, amount) pairs at an annual rate in percent"""
+    years, amounts = pack_cash_flows([cash_flows])
+    return float(xnpv_array(rate / 100, years, amounts)[0])
+
+
+class XirrEngine:
+    """Vectorized XIRR over padded cash-flow arrays
+
+    XNPV is scanned on a fixed grid of log(1 + rate) to bracket the root
+    nearest a zero rate for every row at once; Newton steps then refine it
+    and fall back to bisection whenever a step leaves the bracket.
+    """
+
+    def __init__(self, max_iterations=100, tolerance=1e-10):
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+    def xirr(self, cash_flows):
+        """XIRR in percent of one list of (date, amount) pairs, or None"""
+        result = self.xirr_batch([cash_flows])
+        return None if result['error_code'][0] else float(result['xirr'][0])
+
+    def xirr_batch(self, portfolios):
+        """XIRR for a list of (date, amount) lists"""
+        return self.solve(*pack_cash_flows(portfolios))
+
+    def solve(self, years, amounts):
+        """XIRR in percent for (rows, flows) arrays of year offsets and amounts"""
+        years = np.atleast_2d(np.asarray(years, dtype=np.float64))
+        amounts = np.atleast_2d(np.asarray(amounts, dtype=np.float64))
+        rows = len(amounts)
+
+        error_code = np.full(rows, XIRR_OK, dtype=np.int8)
+        error_code[~((amounts > 0).any(axis=1) & (amounts < 0).any(axis=1))] = XIRR_ONE_SIGNED
+
+        # Bracket: grid cell with a strict sign change closest to x = 0. A
+        # grid point where XNPV is exactly zero is itself a root and is taken
+        # when it is at least as close.
+        with np.errstate(over='ignore', invalid='ignore'):
+            values = np.stack([self._npv(x, years, amounts) for x in _GRID], axis=1)
+        change = np.sign(values[:, :-1]) * np.sign(values[:, 1:]) < 0
+        distance = np.where(change, np.abs(_GRID[:-1] + _GRID[1:]), np.inf)
+        cell = distance.argmin(axis=1)
+        cell_distance = distance[np.arange(rows), cell]
+        zero_distance = np.where(values == 0, np.abs(2 * _GRID), np.inf)
+        point = zero_distance.argmin(axis=1)
+        on_grid = np.isfinite(zero_distance[np.arange(rows), point]) \
+            & (zero_distance[np.arange(rows), point] <= cell_distance)
+        found = np.isfinite(cell_distance) | on_grid
+        error_code[(error_code == XIRR_OK) & ~found] = XIRR_NO_BRACKET
+
+        x = np.full(rows, np.nan)
+        converged = np.zeros(rows, dtype=bool)
+        exact = (error_code == XIRR_OK) & on_grid
+        x[exact], converged[exact] = _GRID[point[exact]], True
+        solve = np.flatnonzero((error_code == XIRR_OK) & ~on_grid)
+        if len(solve):
+            x[solve], converged[solve] = self._refine(
+                years[solve], amounts[solve], _GRID[cell[solve]], _GRID[cell[solve] + 1],
+                values[solve, cell[solve]]
+            )
+        error_code[(error_code == XIRR_OK) & ~converged] = XIRR_NOT_CONVERGED
+
+        ok = error_code == XIRR_OK
+        return {
+            'xirr': np.where(ok, np.expm1(x) * 100, np.nan),
+            'converged': converged,
+            'error_code': error_code
+        }
+
+    @staticmethod
+    def _npv(x, years, amounts):
+        x = np.asarray(x, dtype=np.float64)
+        return (amounts * np.exp(-(x[:, None] if x.ndim else x) * years)).sum(axis=1)
+
+    def _refine(self, years, amounts, low, high, low_value):
+        # Keep `low` on the side where XNPV has the (nonzero) sign of low_value
+        low_positive = low_value > 0
+        x = (low + high) / 2
+        converged = np.zeros(len(x), dtype=bool)
+        active = np.arange(len(x))
+        for _ in range(self.max_iterations):
+            t, a = years[active], amounts[active]
+            weights = a * np.exp(-x[active, None] * t)
+            value = weights.sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = value / -(weights * t).sum(axis=1)
+            # Converged once XNPV is negligible next to the discounted flows;
+            # a collapsed bracket without that ends the row unconverged
+            settled = np.abs(value) <= self.tolerance * np.abs(weights).sum(axis=1)
+            polish = settled & np.isfinite(step) & (np.abs(step) <= self.tolerance)
+            x[active[polish]] -= step[polish]
+            converged[active[settled]] = True
+            done = settled | (high[active] - low[active] <= 1e-14)
+            keep = ~done
+            active, value, step = active[keep], value[keep], step[keep]
+            if not len(active):
+                break
+
+            same_as_low = (value > 0) == low_positive[active]
+            low[active] = np.where(same_as_low, x[active], low[active])
+            high[active] = np.where(same_as_low, high[active], x[active])
+            newton = x[active] - step
+            inside = np.isfinite(newton) & (newton > low[active]) & (newton < high[active])
+            x[active] = np.where(inside, newton, (low[active] + high[active]) / 2)
+        return x, converged